@@ -19,7 +19,7 @@ done like this:
 
 .. code:: python
 
-    with open('sample.nacha', 'w') as fo:
+    with open('sample.nacha', 'wb') as fo:
         writer = nacha.Writer(fo)
         with writer.begin_file(
              ...
@@ -35,7 +35,7 @@ Reading is done by iterating records like this:
 
 .. code:: python
 
-    with open('sample.nacha', 'r') as fo:
+    with open('sample.nacha', 'rb') as fo:
         reader = Reader(fo, include_terminal=True)
         for record, terminal in reader:
             ...
@@ -44,7 +44,7 @@ Or structured like this:
 
 .. code:: python
 
-    with open('sample.nacha', 'r') as fo:
+    with open('sample.nacha', 'rb') as fo:
         reader = Reader(fo)
         reader.file_header()
         for company_batch_header in reader.company_batches():
@@ -62,6 +62,8 @@ __all__ = [
     'CompanyBatchHeader',
     'EntryDetail',
     'EntryDetailAddendum',
+    'EntryDetailChangeAddendum',
+    'EntryDetailReturnAddendum',
     'CompanyBatchControl',
     'FileControl',
     'ServiceClassCodes',
@@ -69,6 +71,9 @@ __all__ = [
     'TransactionCodes',
     'Writer',
     'Reader',
+    'Malformed',
+    'TooManyErrors',
+    'Errors',
 ]
 
 import collections
@@ -76,25 +81,53 @@ import contextlib
 import datetime
 import itertools
 
+from .compat import iteritems, string_types, to_bytes
 from .packages import bryl
+from .trace import Allocator
 
 
 ctx = bryl.ctx(alpha_upper=True)
 
 Numeric = bryl.Numeric
 
-Date = bryl.Date
 
-Time = bryl.Time
+class Date(bryl.Date):
 
-Alphanumeric = bryl.Alphanumeric
+    def load(self, raw):
+        # NOTE: strptime is slow and its first use imports and compiles a lot
+        if self.format == 'YYMMDD' and len(raw) == 6 and raw.isdigit():
+            year = int(raw[:2])
+            return datetime.date(
+                year + (2000 if year < 69 else 1900), int(raw[2:4]), int(raw[4:]),
+            )
+        return super(Date, self).load(raw)
+
+
+class Time(bryl.Time):
+
+    def load(self, raw):
+        if self.format == 'hhmm' and len(raw) == 4 and raw.isdigit():
+            return datetime.time(int(raw[:2]), int(raw[2:]))
+        return super(Time, self).load(raw)
+
+
+class Alphanumeric(bryl.Alphanumeric):
+
+    def validate(self, value):
+        # NOTE: bytes are checked in one pass, the rest (and errors) per char
+        if (isinstance(value, bytes) and
+            not self.enum and
+            len(value) <= self.length and
+            not value.translate(None, to_bytes(self.alphabet))):
+            return None
+        return super(Alphanumeric, self).validate(value)
 
 
 class Enum(dict):
 
     def __init__(self, **kwargs):
         super(Enum, self).__init__(**kwargs)
-        for k, v in kwargs.iteritems():
+        for k, v in iteritems(kwargs):
             setattr(self, k, v)
 
 
@@ -103,7 +136,26 @@ class Record(bryl.Record):
     record_type = Alphanumeric(1)
 
     def copy(self):
-        return type(self)(**self)
+        # NOTE: values are already valid so skip re-validating them
+        other = dict.__new__(type(self))
+        dict.update(other, self)
+        return other
+
+    def reload(self, raw):
+        """
+        Re-populates this record in place from `raw`, a dumped record.
+        """
+        for field in type(self).fields:
+            field.fill(self, field.unpack(raw[field.offset:]))
+        return self
+
+    @classmethod
+    def peek(cls, raw, name):
+        """
+        Unpacks only field `name` from `raw`, a dumped record.
+        """
+        field = getattr(cls, name)
+        return field.unpack(raw[field.offset:])
 
 
 class FileHeader(Record):
@@ -327,12 +379,99 @@ class EntryDetailAddendum(Record):
     entry_detail_sequence_number = Numeric(7)
 
 
+class EntryDetailChangeAddendum(Record):
+    """
+    Notification of change (NOC) addendum, carried by `COR` entries.
+    """
+
+    record_type = Record.record_type.constant('7')
+
+    addenda_type = Numeric(2).constant(98)
+
+    change_code = Alphanumeric(3)
+
+    original_entry_trace_number = Numeric(15)
+
+    reserved = Alphanumeric(6).reserved()
+
+    original_receiving_dfi_id = Numeric(8)
+
+    corrected_data = Alphanumeric(29)
+
+    filler = Alphanumeric(15).reserved()
+
+    trace_number = Numeric(15)
+
+
+class EntryDetailReturnAddendum(Record):
+
+    record_type = Record.record_type.constant('7')
+
+    addenda_type = Numeric(2).constant(99)
+
+    return_reason_code = Alphanumeric(3)
+
+    original_entry_trace_number = Numeric(15)
+
+    # NOTE: YYMMDD but only for death related returns
+    date_of_death = Alphanumeric(6, required=False)
+
+    original_receiving_dfi_id = Numeric(8)
+
+    addenda_information = Alphanumeric(44, required=False)
+
+    trace_number = Numeric(15)
+
+
+def _slice(field):
+    return slice(field.offset, field.offset + field.length)
+
+
+def _with_trace_number(lines, trace_number):
+    # NOTE: lines are an entry detail's followed by those of its addenda
+    detail = lines[0]
+    patched = [
+        detail[:_trace_number.start] +
+        to_bytes('{0:0>15}'.format(trace_number)) +
+        detail[_trace_number.stop:]
+    ]
+    sequence_number = to_bytes('{0:0>7}'.format(trace_number % 10 ** 7))
+    for line in lines[1:]:
+        patched.append(
+            line[:_sequence_number.start] +
+            sequence_number +
+            line[_sequence_number.stop:]
+        )
+    return patched
+
+
+_addenda_type = _slice(EntryDetailAddendum.addenda_type)
+
+_trace_number = _slice(EntryDetail.trace_number)
+
+_no_trace_number = b'0' * EntryDetail.trace_number.length
+
+_sequence_number = _slice(EntryDetailAddendum.entry_detail_sequence_number)
+
+
 class Entry(collections.namedtuple('Entry', ['detail', 'addenda'])):
 
     @property
     def is_rejection(self):
         return self.detail.is_rejection
 
+    @property
+    def return_addendum(self):
+        for addendum in self.addenda:
+            if isinstance(addendum, EntryDetailReturnAddendum):
+                return addendum
+
+    @property
+    def change_addendum(self):
+        for addendum in self.addenda:
+            if isinstance(addendum, EntryDetailChangeAddendum):
+                return addendum
+
     def mask(self):
         self.detail.mask()
         return self
@@ -343,9 +482,12 @@ class Entry(collections.namedtuple('Entry', ['detail', 'addenda'])):
         raw = raw[EntryDetail.length + len(Writer.RECORD_TERMINAL):]
         addenda = []
         while raw:
-            addendum = EntryDetailAddendum.load(raw)
+            addendum_cls = Reader.addenda_types.get(
+                raw[_addenda_type], EntryDetailAddendum,
+            )
+            addendum = addendum_cls.load(raw)
             addenda.append(addendum)
-            raw = raw[EntryDetailAddendum.length + len(Writer.RECORD_TERMINAL):]
+            raw = raw[addendum_cls.length + len(Writer.RECORD_TERMINAL):]
         return cls(detail=detail, addenda=addenda)
 
     def dump(self):
@@ -399,9 +541,13 @@ class FileControl(Record):
     filler = Alphanumeric(39).reserved()
 
 
+# NOTE: pads the last block of a file to a whole number of records
+_filler = b'9' * FileControl.length
+
+
 class Writer(object):
 
-    RECORD_TERMINAL = '\n'
+    RECORD_TERMINAL = b'\n'
 
     HASH_MOD = 10 ** 10
 
@@ -409,8 +555,15 @@ class Writer(object):
 
     entry_addendum_cls = EntryDetailAddendum
 
-    def __init__(self, fo):
+    def __init__(self, fo, trace_numbers=None):
+        """
+        :param fo: Binary file-like object written to.
+        :param trace_numbers:
+            `nacha.trace.Allocator` for entries written without a
+            `trace_number`, a new in memory one by default.
+        """
         self.fo = fo
+        self.trace_numbers = trace_numbers or Allocator()
         self.created_at = None
         self._ctxs = []
         self._batch_numbers = itertools.count(1)
@@ -418,8 +571,7 @@ class Writer(object):
         self._entry_count = 0
 
     def write(self, record):
-        self.fo.write(record.dump())
-        self.fo.write(self.RECORD_TERMINAL)
+        self.fo.write(record.dump() + self.RECORD_TERMINAL)
 
     def begin_file(self,
                    immediate_destination,
@@ -474,7 +626,7 @@ class Writer(object):
                             company_descriptive_date=None,
                             company_discretionary_data=None,
         ):
-        batch_number = self._batch_numbers.next()
+        batch_number = next(self._batch_numbers)
         self._company_batch_header = CompanyBatchHeader(
             service_class_code=service_class_code,
             company_name=company_name,
@@ -529,7 +681,7 @@ class Writer(object):
              ):
             if addenda:
                 for addednum in addenda:
-                    if isinstance(addednum, basestring):
+                    if isinstance(addednum, string_types):
                         addednum = {
                             'payment_related_information': addednum
                         }
@@ -550,16 +702,9 @@ class Writer(object):
         if not self.in_company_batch_context():
             raise Exception('Not in company batch context')
         self._entry_addenda = []
-        if len(str(receiving_dfi_routing_number)) != 9:
-            raise ValueError(
-                'receiving_dfi_routing_number {0} length != 9'
-                .format(receiving_dfi_routing_number)
-            )
-        receiving_dfi_routing_number = str(receiving_dfi_routing_number)
-        self._entry_detail = self.entry_detail_cls(
+        self._entry_detail = self._new_entry_detail(
             transaction_code=transaction_code,
-            receiving_dfi_trn=int(receiving_dfi_routing_number[:8]),
-            receiving_dfi_trn_check_digit=int(receiving_dfi_routing_number[-1]),
+            receiving_dfi_routing_number=receiving_dfi_routing_number,
             receiving_dfi_account_number=receiving_dfi_account_number,
             amount=amount,
             individual_id=individual_id,
@@ -646,11 +791,25 @@ class Writer(object):
 
     # internals
 
+    def _new_entry_detail(self, receiving_dfi_routing_number, **kwargs):
+        if len(str(receiving_dfi_routing_number)) != 9:
+            raise ValueError(
+                'receiving_dfi_routing_number {0} length != 9'
+                .format(receiving_dfi_routing_number)
+            )
+        receiving_dfi_routing_number = str(receiving_dfi_routing_number)
+        return self.entry_detail_cls(
+            receiving_dfi_trn=int(receiving_dfi_routing_number[:8]),
+            receiving_dfi_trn_check_digit=int(receiving_dfi_routing_number[-1]),
+            **kwargs
+        )
+
     def _trace_number(self):
-        return '{0:0>8}{1:0>7}'.format(
+        trace_number, = self.trace_numbers.allocate(
             self._company_batch_header.originating_dfi_id,
-            self._entry_count + 1
+            self.created_at.date(),
         )
+        return trace_number
 
     def _push(self, close):
         self._ctxs.append(close)
@@ -669,7 +828,7 @@ class Writer(object):
     def _close(self, close):
         try:
             yield
-        except Exception, ex:
+        except Exception as ex:
             close(ex)
             raise
         else:
@@ -686,6 +845,70 @@ class Malformed(ValueError):
             "{0} @ {1} - {2}".format(file_name, line_num, reason)
         )
 
+    def __reduce__(self):
+        return type(self), (self.file_name, self.line_num, self.reason)
+
+
+class TooManyErrors(Malformed):
+
+    pass
+
+
+ReadError = collections.namedtuple(
+    'ReadError', ['line_num', 'record_type', 'line', 'reason']
+)
+
+
+class Errors(object):
+    """
+    Collects errors for a lenient `Reader`, which skips lines that fail to
+    parse rather than raising:
+
+    .. code:: python
+
+        errors = nacha.Errors(limit=100, budget=10000)
+        for record in nacha.Reader(fo, errors=errors):
+            ...
+        if errors:
+            for error in errors:
+                print(error.line_num, error.reason)
+
+    :param limit: Maximum number of `ReadError`s kept, the most recent win.
+    :param budget:
+        Maximum number of errors tolerated, `TooManyErrors` is raised once
+        exceeded.
+    :param quarantine: Optional file-like object to which bad lines are written.
+    """
+
+    def __init__(self, limit=1000, budget=None, quarantine=None):
+        self.log = collections.deque(maxlen=limit)
+        self.budget = budget
+        self.quarantine = quarantine
+        self.count = 0
+
+    def add(self, ex, line):
+        self.count += 1
+        self.log.append(ReadError(
+            line_num=ex.line_num,
+            record_type=line[:1],
+            line=line.rstrip(b'\r\n'),
+            reason=ex.reason,
+        ))
+        if self.quarantine is not None:
+            self.quarantine.write(line)
+        if self.budget is not None and self.count > self.budget:
+            raise TooManyErrors(
+                ex.file_name,
+                ex.line_num,
+                'error budget {0} exceeded'.format(self.budget),
+            )
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return iter(self.log)
+
 
 class Reader(bryl.LineReader):
 
@@ -703,29 +926,175 @@ class Reader(bryl.LineReader):
         ]
     )
 
+    addenda_types = dict(
+        (addendum_cls.addenda_type.pack(addendum_cls.addenda_type.value),
+         addendum_cls)
+        for addendum_cls in [
+            EntryDetailAddendum,
+            EntryDetailChangeAddendum,
+            EntryDetailReturnAddendum,
+        ]
+    )
+
     def filter(self, *record_types):
-        for record in self:
-            if any(
-                   isinstance(record, record_type)
-                   for record_type in record_types
-                ):
+        # NOTE: lines for other record types are skipped without being loaded
+        prefixes = set()
+        for record_type in record_types:
+            if record_type.record_type._constant is None:
+                prefixes = None
+                break
+            prefixes.add(to_bytes(record_type.record_type.value))
+        for line, line_no in self.lines():
+            if prefixes is not None and line[:1] not in prefixes:
+                continue
+            try:
+                record = self.load(line, line_no)
+            except Malformed as ex:
+                if self.errors is None:
+                    raise
+                self.errors.add(ex, line)
+                continue
+            if isinstance(record, record_types):
                 yield record
 
+    def lines(self):
+        while True:
+            line, line_no = self.next_line()
+            if line is None:
+                break
+            yield line, line_no
+
+    def load(self, line, line_no):
+        try:
+            return self.as_record(line, line_no)
+        except self.record_type.field_type.error_type as ex:
+            if isinstance(ex, Malformed):
+                raise
+            self.malformed(line_no, str(ex))
+
     # bryl.LineReader
 
+    def __init__(self, fo, *args, **kwargs):
+        """
+        :param fo: File-like object from which to read records.
+        :param errors:
+            Optional `Errors` in which case lines that fail to parse are
+            collected there and skipped.
+        :param reuse:
+            Re-populate one instance per record class for every line rather
+            than constructing a new record, so records are only valid until
+            the next one of their class is read and must be `Record.copy`-ed
+            to be kept.
+        :param line_no:
+            Number of the first line read, e.g. when `fo` is part of a larger
+            stream.
+        """
+        self.errors = kwargs.pop('errors', None)
+        self.reuse = kwargs.pop('reuse', False)
+        self._instances = {}
+        line_no = kwargs.pop('line_no', 1)
+        super(Reader, self).__init__(fo, *args, **kwargs)
+        self.line_no = line_no
+
     record_type = Record
 
+    def malformed(self, offset, reason):
+        raise Malformed(self.name, offset, reason)
+
+    def next_record(self, expected_type=None, default='raise'):
+        if self.errors is None:
+            return super(Reader, self).next_record(expected_type, default)
+        while True:
+            line, line_no = self.next_line()
+            if line is None:
+                if default == 'raise':
+                    self.malformed(line_no, 'unexpected EOF')
+                return default
+            try:
+                record = self.load(line, line_no)
+                break
+            except Malformed as ex:
+                self.errors.add(ex, line)
+        if not isinstance(record, (expected_type or self.record_type)):
+            self.retry = line, line_no
+            if default == 'raise':
+                self.malformed(
+                    line_no, 'unexpected record type {0}'.format(type(record))
+                )
+            return
+        return record
+
+    def next(self):
+        if self.errors is None:
+            return super(Reader, self).next()
+        while True:
+            line, line_no = self.next_line()
+            if line is None:
+                raise StopIteration()
+            try:
+                record = self.load(line, line_no)
+                if not self.include_terminal:
+                    return record
+                record_terminal = line[type(record).length:]
+                if (self.expected_terminal is not None and
+                    record_terminal != self.expected_terminal):
+                    self.malformed(
+                        line_no, 'unexpected EOL "{0}"'.format(record_terminal)
+                    )
+                return record, record_terminal
+            except Malformed as ex:
+                self.errors.add(ex, line)
+
+    __next__ = next
+
+    def as_record(self, line, line_no):
+        if not self.reuse:
+            return super(Reader, self).as_record(line, line_no)
+        record_type = self.as_record_type(self, line, line_no)
+        record = self._instances.get(record_type)
+        if record is None:
+            record = self._instances[record_type] = record_type.load(line)
+            return record
+        return record.reload(line)
+
     @staticmethod
     def as_record_type(reader, data, offset):
-        record_type = reader.record_type.load(data).record_type
+        record_type = reader.record_type.peek(data, 'record_type')
         if record_type in reader.record_types:
-            return reader.record_types[record_type]
+            record_type = reader.record_types[record_type]
+            if record_type is EntryDetailAddendum:
+                record_type = reader.addenda_types.get(
+                    data[_addenda_type], record_type,
+                )
+            return record_type
         raise reader.malformed(
             offset, 'unexpected record_type {0}'.format(record_type),
         )
 
     # structured
 
+    def files(self):
+        """
+        Iterates the `FileHeader` of each file in a stream of concatenated
+        files, each of which is read as a single one would be. Lines of block
+        filler between files are skipped and any other record there is
+        `Malformed`.
+        """
+        while True:
+            self._skip_filler()
+            header = self.next_record(FileHeader, None)
+            if header:
+                yield header
+                continue
+            if not self.retry:
+                break
+            line, line_no = self.retry
+            self.retry = None
+            ex = Malformed(self.name, line_no, 'expected file header')
+            if self.errors is None:
+                raise ex
+            self.errors.add(ex, line)
+
     def file_header(self):
         return self.next_record(FileHeader)
 
@@ -741,6 +1110,9 @@ class Reader(bryl.LineReader):
             detail = self.entry_detail()
             if not detail:
                 break
+            if self.reuse:
+                # NOTE: looking ahead for addenda re-populates the detail
+                detail = detail.copy()
             addenda = self.entry_addenda()
             yield Entry(detail=detail, addenda=addenda)
 
@@ -749,11 +1121,12 @@ class Reader(bryl.LineReader):
 
     def entry_addenda(self, default=None):
         addenda = []
+        addenda_types = tuple(self.addenda_types.values())
         while True:
-            record = self.next_record(EntryDetailAddendum, None)
+            record = self.next_record(addenda_types, None)
             if not record:
                 break
-            addenda.append(record)
+            addenda.append(record.copy() if self.reuse else record)
         return addenda
 
     def company_batch_control(self):
@@ -761,3 +1134,14 @@ class Reader(bryl.LineReader):
 
     def file_control(self):
         return self.next_record(FileControl)
+
+    # internals
+
+    def _skip_filler(self):
+        while True:
+            line, line_no = self.next_line()
+            if line is None:
+                break
+            if line.rstrip(b'\r\n') != _filler:
+                self.retry = line, line_no
+                break
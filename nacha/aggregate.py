@@ -0,0 +1,242 @@
+"""
+Group-by totals of entry amounts, e.g. the daily finance report:
+
+.. code:: python
+
+    import nacha.aggregate
+
+    aggregate = nacha.aggregate.Aggregate(
+        'receiving_dfi_routing_number',
+        'company_id',
+        ('standard_entry_class', 'transaction_code'),
+        'effective_entry_date',
+    )
+    with open('2013-01-16.ach', 'rb') as fo:
+        aggregate.add(nacha.Reader(fo))
+    for company_id, totals in aggregate['company_id'].items():
+        print(company_id, totals.count, totals.debit_amount, totals.credit_amount)
+
+or, for many files in a pool of worker processes:
+
+.. code:: python
+
+    aggregate = nacha.aggregate.paths(
+        '/var/ach/originated/2013-01-*.ach', 'company_id', workers=4,
+    )
+
+Group by fields can be any `CompanyBatchHeader` or `EntryDetail` field, or
+`receiving_dfi_routing_number`. All groupings are computed in one pass over
+raw lines: keys are the raw field slices, so each distinct key is parsed once
+when results are read rather than once per entry, and each group accumulates
+plain integers. Aggregates over different files can be combined with `merge`
+and pickled between processes.
+
+"""
+__all__ = [
+    'Totals',
+    'Aggregate',
+    'paths',
+]
+
+import collections
+import multiprocessing
+
+from . import CompanyBatchHeader, EntryDetail, Reader, _slice
+from .compat import iteritems, string_types, to_bytes
+from .ingest import paths_for
+
+
+Totals = collections.namedtuple('Totals', [
+    'count',
+    'amount',
+    'debit_amount',
+    'credit_amount',
+    'minimum',
+    'maximum',
+])
+
+
+class Aggregate(object):
+
+    def __init__(self, *group_bys):
+        """
+        :param group_bys: Field names or tuples of field names to group by.
+        """
+        self.group_bys = [
+            (group_by,) if isinstance(group_by, string_types) else tuple(group_by)
+            for group_by in group_bys
+        ]
+        self.groups = dict((group_by, {}) for group_by in self.group_bys)
+        self._layouts = self._layout()
+
+    def add(self, reader):
+        """
+        Accumulates every entry read by `reader`.
+        """
+        batch_header = to_bytes(CompanyBatchHeader.record_type.value)
+        entry_detail = to_bytes(EntryDetail.record_type.value)
+        amount = _slice(EntryDetail.amount)
+        kind = EntryDetail.transaction_code.offset + 1
+        batch_keys = None
+        for line, line_no in reader.lines():
+            record_type = line[:1]
+            if record_type == batch_header:
+                batch_keys = [
+                    tuple(line[s:s + n] for s, n in batch_slices)
+                    for _, (batch_slices, _, _) in self._layouts
+                ]
+                continue
+            if record_type != entry_detail:
+                continue
+            if batch_keys is None:
+                reader.malformed(line_no, 'unexpected entry detail')
+            try:
+                value = int(line[amount])
+            except ValueError as ex:
+                reader.malformed(line_no, str(ex))
+            # NOTE: last digit of transaction_code, 1-3 credit and 6-8 debit
+            digit = line[kind:kind + 1]
+            debit = value if digit in b'678' else 0
+            credit = value if digit in b'123' else 0
+            for (groups, (_, entry_slices, _)), batch_key in zip(
+                    self._layouts, batch_keys):
+                key = batch_key + tuple(line[s:s + n] for s, n in entry_slices)
+                totals = groups.get(key)
+                if totals is None:
+                    groups[key] = [1, value, debit, credit, value, value]
+                    continue
+                totals[0] += 1
+                totals[1] += value
+                totals[2] += debit
+                totals[3] += credit
+                if value < totals[4]:
+                    totals[4] = value
+                if value > totals[5]:
+                    totals[5] = value
+        return self
+
+    def merge(self, other):
+        """
+        Adds the totals of `other`, an `Aggregate` with the same group bys.
+        """
+        if other.group_bys != self.group_bys:
+            raise ValueError('Cannot merge aggregates with different group bys')
+        for group_by in self.group_bys:
+            groups = self.groups[group_by]
+            for key, other_totals in iteritems(other.groups[group_by]):
+                totals = groups.get(key)
+                if totals is None:
+                    groups[key] = list(other_totals)
+                    continue
+                for i in range(4):
+                    totals[i] += other_totals[i]
+                totals[4] = min(totals[4], other_totals[4])
+                totals[5] = max(totals[5], other_totals[5])
+        return self
+
+    def __getitem__(self, group_by):
+        """
+        `Totals` for `group_by` keyed by its parsed field value, or by a tuple
+        of them when grouping by several fields.
+        """
+        if isinstance(group_by, string_types):
+            group_by = (group_by,)
+        _, _, names = _layout(group_by)
+        unpacks = [_unpack(name) for name in names]
+        order = [names.index(name) for name in group_by]
+        results = {}
+        for key, totals in iteritems(self.groups[group_by]):
+            values = [unpack(raw) for unpack, raw in zip(unpacks, key)]
+            key = tuple(values[i] for i in order)
+            results[key[0] if len(key) == 1 else key] = Totals(*totals)
+        return results
+
+    def __getstate__(self):
+        return self.group_bys, self.groups
+
+    def __setstate__(self, state):
+        self.group_bys, self.groups = state
+        self._layouts = self._layout()
+
+    # internals
+
+    def _layout(self):
+        return [
+            (self.groups[group_by], _layout(group_by))
+            for group_by in self.group_bys
+        ]
+
+
+def paths(patterns, *group_bys, **kwargs):
+    """
+    Aggregates all NACHA files matching `patterns`.
+
+    :param workers:
+        Number of worker processes, defaults to the number of cores. Use 0 to
+        aggregate in this process.
+    """
+    workers = kwargs.pop('workers', None)
+    if kwargs:
+        raise TypeError('Unexpected arguments {0}'.format(', '.join(kwargs)))
+    if isinstance(patterns, string_types):
+        patterns = [patterns]
+    aggregate = Aggregate(*group_bys)
+    jobs = [(path, group_bys) for path in paths_for(*patterns)]
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    if workers == 0:
+        for job in jobs:
+            aggregate.merge(_aggregate(job))
+        return aggregate
+    pool = multiprocessing.Pool(workers)
+    try:
+        for other in pool.imap_unordered(_aggregate, jobs):
+            aggregate.merge(other)
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+    return aggregate
+
+
+# internals
+
+_routing_number = 'receiving_dfi_routing_number'
+
+
+def _field(name):
+    if name == _routing_number:
+        return EntryDetail, EntryDetail.receiving_dfi_trn.offset, 9
+    for record_type in (CompanyBatchHeader, EntryDetail):
+        for field in record_type.fields:
+            if field.name == name:
+                return record_type, field.offset, field.length
+    raise ValueError('Cannot group by {0}'.format(name))
+
+
+def _layout(group_by):
+    # NOTE: keys are batch field slices followed by entry field slices
+    batch, entry = [], []
+    for name in group_by:
+        record_type, offset, length = _field(name)
+        (batch if record_type is CompanyBatchHeader else entry).append(
+            (name, (offset, length))
+        )
+    return (
+        [s for _, s in batch],
+        [s for _, s in entry],
+        [name for name, _ in batch + entry],
+    )
+
+
+def _unpack(name):
+    if name == _routing_number:
+        return int
+    record_type = _field(name)[0]
+    return getattr(record_type, name).unpack
+
+
+def _aggregate(job):
+    path, group_bys = job
+    with open(path, 'rb') as fo:
+        return Aggregate(*group_bys).add(Reader(fo))
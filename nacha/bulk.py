@@ -0,0 +1,383 @@
+"""
+Bulk construction of NACHA files from tabular data, e.g. a CSV extract:
+
+.. code:: python
+
+    import nacha.bulk
+
+    with open('payouts.csv', 'r') as src, open('payouts.nacha', 'wb') as fo:
+        nacha.bulk.write(
+            fo,
+            nacha.bulk.from_csv(src),
+            file_header=dict(
+                immediate_destination=91000019,
+                immediate_destination_name='WELLS FARGO',
+                immediate_origin=1273720697,
+                immediate_origin_name='ALALALAD PAYMENTS',
+            ),
+            company_batch=dict(
+                service_class_code=nacha.ServiceClassCodes.MIXED_DEBITS_CREDITS,
+                company_name='ALALALAD',
+                company_id=2273720697,
+                standard_entry_class=nacha.StandardEntryClasses.PPD,
+                originating_dfi_id='12737206',
+            ),
+            batch_by=['company_entry_description'],
+        )
+
+Rows are dicts (or a dict of equal length columns) keyed by `Writer.entry`
+arguments and optionally `Writer.begin_company_batch` arguments named in
+`batch_by`, which groups rows into company batches in order of first
+appearance.
+
+Rather than building an `EntryDetail` per row each column is validated and
+converted once and entries are rendered with a single format string. Batch and
+file control totals are summed per column.
+
+"""
+__all__ = [
+    'BulkWriter',
+    'from_csv',
+    'write',
+]
+
+import collections
+import csv
+import itertools
+
+from . import Numeric, Writer
+from .compat import abc, iteritems, itervalues, range, string_types, text_type, zip
+
+
+class BulkWriter(Writer):
+
+    #: Number of entries rendered per `fo.write`.
+    chunk_size = 4096
+
+    def entries(self, columns):
+        """
+        Writes entries for `columns`, a dict of equal length sequences keyed
+        by `Writer.entry` arguments, to the current company batch.
+        """
+        if not self.in_company_batch_context():
+            raise Exception('Not in company batch context')
+        if not any(len(column) for column in itervalues(columns)):
+            return
+        columns = _Columns(self.entry_detail_cls, columns)
+        count = len(columns)
+
+        # trace numbers
+        if columns.trace_number is None:
+            columns.trace_number = list(self.trace_numbers.allocate(
+                self._company_batch_header.originating_dfi_id,
+                self.created_at.date(),
+                count,
+            ))
+
+        # addenda
+        if columns.addenda is None:
+            columns.addenda_record_indicator = [0] * count
+            addenda_count = 0
+        else:
+            columns.addenda_record_indicator = [
+                1 if addenda else 0 for addenda in columns.addenda
+            ]
+            addenda_count = sum(len(addenda) for addenda in columns.addenda)
+
+        # render
+        for start in range(0, count, self.chunk_size):
+            stop = min(start + self.chunk_size, count)
+            rows = zip(*[
+                getattr(columns, name)[start:stop]
+                for name in self.entry_detail_columns
+            ])
+            lines = [self.entry_detail_format % row for row in rows]
+            if columns.addenda is not None:
+                lines = self._with_addenda(
+                    lines,
+                    columns.addenda[start:stop],
+                    columns.trace_number[start:stop],
+                )
+            lines.append('')
+            self.fo.write(self.RECORD_TERMINAL.join(lines))
+
+        # totals
+        debit_amount = sum(
+            amount
+            for code, amount in zip(
+                columns.transaction_code, columns.amount
+            )
+            if code % 10 in (6, 7, 8)
+        )
+        credit_amount = sum(
+            amount
+            for code, amount in zip(
+                columns.transaction_code, columns.amount
+            )
+            if code % 10 in (1, 2, 3)
+        )
+        entry_hash = sum(columns.receiving_dfi_trn)
+
+        self._company_batch_control.total_batch_debit_entry_amount += debit_amount
+        self._company_batch_control.total_batch_credit_entry_amount += credit_amount
+        self._company_batch_control.entry_addenda_count += count + addenda_count
+        self._company_batch_control.entry_hash = (
+            self._company_batch_control.entry_hash + entry_hash
+        ) % self.HASH_MOD
+
+        self.file_control.total_file_debit_entry_amount += debit_amount
+        self.file_control.total_file_credit_entry_amount += credit_amount
+        self.file_control.entry_addenda_record_count += count + addenda_count
+        self.file_control.entry_hash_total = (
+            self.file_control.entry_hash_total + entry_hash
+        ) % self.HASH_MOD
+
+        self._entry_count += count
+
+    # internals
+
+    def _with_addenda(self, lines, addenda, trace_numbers):
+        with_addenda = []
+        for line, entry_addenda, trace_number in zip(
+                lines, addenda, trace_numbers,
+            ):
+            with_addenda.append(line)
+            for i, payment_related_information in enumerate(entry_addenda):
+                with_addenda.append(self.entry_addendum_cls(
+                    payment_related_information=payment_related_information,
+                    addenda_sequence_number=i + 1,
+                    entry_detail_sequence_number=trace_number % 10 ** 7,
+                ).dump())
+        return with_addenda
+
+
+def _format(record_type):
+    parts, names = [], []
+    for field in record_type.fields:
+        if field._constant is not None:
+            parts.append(field.pack(field._constant).replace('%', '%%'))
+            continue
+        if isinstance(field, Numeric):
+            parts.append('%0{0}d'.format(field.length))
+        elif field.align == field.RIGHT:
+            parts.append('%{0}s'.format(field.length))
+        else:
+            parts.append('%-{0}s'.format(field.length))
+        names.append(field.name)
+    return ''.join(parts), names
+
+
+BulkWriter.entry_detail_format, BulkWriter.entry_detail_columns = _format(
+    BulkWriter.entry_detail_cls
+)
+
+
+def from_csv(fo, **kwargs):
+    """
+    Reads rows from CSV file `fo` whose header names `Writer.entry` (and
+    optionally `Writer.begin_company_batch`) arguments.
+    """
+    for row in csv.DictReader(fo, **kwargs):
+        yield dict(
+            (name, value) for name, value in iteritems(row) if value != ''
+        )
+
+
+def write(fo,
+          entries,
+          file_header,
+          company_batch,
+          batch_by=None,
+          writer_cls=BulkWriter,
+    ):
+    """
+    Writes a complete NACHA file to `fo`.
+
+    :param entries: Iterable of row dicts or a dict of equal length columns.
+    :param file_header: `Writer.begin_file` arguments.
+    :param company_batch: Default `Writer.begin_company_batch` arguments.
+    :param batch_by:
+        `Writer.begin_company_batch` argument names present in `entries` by
+        which to group entries into batches.
+    """
+    if not isinstance(entries, abc.Mapping):
+        entries = _to_columns(entries)
+    batch_by = batch_by or []
+    count = len(next(itervalues(entries))) if entries else 0
+
+    # group
+    batches = collections.OrderedDict()
+    keys = zip(*[entries[name] for name in batch_by])
+    for i, key in enumerate(keys if batch_by else itertools.repeat((), count)):
+        batches.setdefault(key, []).append(i)
+
+    writer = writer_cls(fo)
+    with writer.begin_file(**file_header):
+        for key, indices in iteritems(batches):
+            kwargs = dict(company_batch)
+            kwargs.update(zip(batch_by, key))
+            with writer.begin_company_batch(**kwargs):
+                if len(batches) == 1:
+                    columns = dict(entries)
+                else:
+                    columns = dict(
+                        (name, [column[i] for i in indices])
+                        for name, column in iteritems(entries)
+                    )
+                for name in batch_by:
+                    columns.pop(name, None)
+                writer.entries(columns)
+    return writer
+
+
+# internals
+
+def _to_columns(rows):
+    columns = collections.defaultdict(list)
+    count = 0
+    for row in rows:
+        for name, value in iteritems(row):
+            column = columns[name]
+            if len(column) < count:
+                column.extend([None] * (count - len(column)))
+            column.append(value)
+        count += 1
+    for column in itervalues(columns):
+        if len(column) < count:
+            column.extend([None] * (count - len(column)))
+    return dict(columns)
+
+
+class _Columns(object):
+
+    entry_args = [
+        'transaction_code',
+        'receiving_dfi_routing_number',
+        'receiving_dfi_account_number',
+        'amount',
+        'individual_id',
+        'individual_name',
+        'trace_number',
+        'discretionary_data',
+        'addenda',
+    ]
+
+    def __init__(self, record_type, columns):
+        unexpected = set(columns) - set(self.entry_args)
+        if unexpected:
+            raise ValueError(
+                'Unexpected columns {0}'.format(', '.join(sorted(unexpected)))
+            )
+        self.record_type = record_type
+        self.count = len(columns['transaction_code'])
+        for name, column in iteritems(columns):
+            if len(column) != self.count:
+                raise ValueError(
+                    'Column {0} length {1} != {2}'
+                    .format(name, len(column), self.count)
+                )
+
+        routing_numbers = self._routing_numbers(
+            columns['receiving_dfi_routing_number'],
+        )
+        self.receiving_dfi_trn = [value // 10 for value in routing_numbers]
+        self.receiving_dfi_trn_check_digit = [
+            value % 10 for value in routing_numbers
+        ]
+        for name in [
+                'transaction_code',
+                'receiving_dfi_account_number',
+                'amount',
+                'individual_id',
+                'individual_name',
+            ]:
+            setattr(self, name, self._field(name, columns[name]))
+        self.discretionary_data = self._field(
+            'discretionary_data',
+            columns.get('discretionary_data', [None] * self.count),
+        )
+        self.trace_number = None
+        if (columns.get('trace_number') is not None and
+            any(value is not None for value in columns['trace_number'])):
+            self.trace_number = self._field(
+                'trace_number', columns['trace_number'],
+            )
+        self.addenda = None
+        if (columns.get('addenda') is not None and
+            any(columns['addenda'])):
+            self.addenda = [
+                [addendum] if isinstance(addendum, string_types) else (addendum or [])
+                for addendum in columns['addenda']
+            ]
+
+    def __len__(self):
+        return self.count
+
+    def _field(self, name, column):
+        field = getattr(self.record_type, name)
+        if isinstance(field, Numeric):
+            return self._numeric(name, column, field=field)
+        return self._alphanumeric(name, column, field)
+
+    def _routing_numbers(self, column):
+        # NOTE: length as Writer.begin_entry checks it, so leading zeros count
+        if not all(len(str(value)) == 9 for value in column):
+            for i, value in enumerate(column):
+                if len(str(value)) != 9:
+                    self._invalid(
+                        'receiving_dfi_routing_number', i, value, 'length != 9',
+                    )
+        return self._numeric('receiving_dfi_routing_number', column, length=9)
+
+    def _numeric(self, name, column, field=None, length=None):
+        length = field.length if field else length
+        try:
+            values = [int(value) for value in column]
+        except (TypeError, ValueError):
+            values = None
+        else:
+            limit = 10 ** length
+            if (min(values) >= 0 and max(values) < limit and
+                (field is None or not field.enum or
+                 set(values).issubset(field.enum))):
+                return values
+        for i, value in enumerate(column):
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                error = 'must be a whole number'
+            else:
+                error = field.validate(value) if field else (
+                    None if 0 <= value < 10 ** length else
+                    'must be a whole number of at most {0} digits'
+                    .format(length)
+                )
+            if error:
+                self._invalid(name, i, value, error)
+        return values
+
+    def _alphanumeric(self, name, column, field):
+        default = field.default if field.default is not None else ''
+        values = [default if value is None else value for value in column]
+        if field.ctx.alpha_filter or field.ctx.alpha_truncate:
+            values = [field.sanitize(value) for value in values]
+        elif field.ctx.alpha_upper:
+            values = [value.upper() for value in values]
+        joined = ''.join(values)
+        if isinstance(joined, text_type):
+            joined = joined.encode('utf-8')
+        if (not joined.translate(None, field.alphabet.encode('ascii')) and
+            max(len(value) for value in values) <= field.length and
+            (not field.enum or set(values).issubset(field.enum))):
+            return values
+        for i, value in enumerate(values):
+            error = field.validate(value)
+            if error:
+                self._invalid(name, i, value, error)
+        return values
+
+    def _invalid(self, name, i, value, error):
+        raise self.record_type.field_type.error_type(
+            'Invalid {0}.{1} value {2} for row {3} - {4}'
+            .format(self.record_type.__name__, name, value, i, error)
+        )
@@ -0,0 +1,252 @@
+"""
+Opt-in cache of parsed NACHA files keyed by their content hash, for files that
+are read over and over by different jobs:
+
+.. code:: python
+
+    import nacha.cache
+
+    cache = nacha.cache.Cache('/var/cache/nacha', max_size=1024 ** 3)
+
+    with open('sample.nacha', 'rb') as fo:
+        reader = cache.reader(fo)
+        for record in reader:
+            ...
+
+The first read of a file parses it as usual and writes the decoded field values
+of each record to the cache as it goes. Later reads of a file with the same
+content skip parsing altogether and rebuild the records from those values. The
+cache directory is trimmed to `max_size` bytes by evicting the least recently
+read files.
+
+"""
+__all__ = [
+    'Cache',
+    'CachedReader',
+]
+
+import datetime
+import hashlib
+import marshal
+import os
+import tempfile
+
+from . import Date, Time, Reader
+from .compat import string_types
+
+
+class CachedReader(Reader):
+    """
+    Reader yielding records from an iterable of ``(record, terminal)`` rather
+    than parsing lines.
+    """
+
+    def __init__(self, fo, records, **kwargs):
+        super(CachedReader, self).__init__(fo, **kwargs)
+        self.records = iter(records)
+
+    def next_line(self):
+        if self.retry:
+            line, line_no = self.retry
+            self.retry = None
+            return line, line_no
+        try:
+            line = next(self.records)
+        except StopIteration:
+            return None, self.line_no
+        line_no = self.line_no
+        self.line_no += 1
+        return line, line_no
+
+    def as_record(self, line, line_no):
+        return line[0]
+
+    def load(self, line, line_no):
+        if isinstance(line, string_types):
+            return super(CachedReader, self).load(line, line_no)
+        return line[0]
+
+    def lines(self):
+        for (record, terminal), line_no in super(CachedReader, self).lines():
+            yield record.dump() + terminal, line_no
+
+    def filter(self, *record_types):
+        while True:
+            line, line_no = self.next_line()
+            if line is None:
+                break
+            if isinstance(line[0], record_types):
+                yield line[0]
+
+    def next(self):
+        line, line_no = self.next_line()
+        if line is None:
+            raise StopIteration()
+        if not self.include_terminal:
+            return line[0]
+        return line
+
+    __next__ = next
+
+
+class Cache(object):
+
+    EXTENSION = '.records'
+
+    #: Number of records per marshalled chunk.
+    chunk_size = 4096
+
+    def __init__(self, directory, max_size=256 * 1024 ** 2):
+        self.directory = directory
+        self.max_size = max_size
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def key(self, fo):
+        """
+        Content hash of seekable file-like `fo`, which is rewound.
+        """
+        digest = hashlib.sha1(_signature.encode('ascii'))
+        fo.seek(0)
+        for chunk in iter(lambda: fo.read(1024 * 1024), b''):
+            digest.update(chunk)
+        fo.seek(0)
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + self.EXTENSION)
+
+    def reader(self, fo, reader_cls=CachedReader, **kwargs):
+        """
+        Reader for `fo` backed by the cache. Lines that fail to parse are never
+        cached so errors are raised (or collected) as usual.
+        """
+        key = self.key(fo)
+        path = self.path(key)
+        try:
+            os.utime(path, None)
+        except OSError:
+            records = self._parse(
+                Reader(fo, **dict(kwargs, include_terminal=True)), path,
+            )
+        else:
+            records = self._load(path)
+        return reader_cls(fo, records, **kwargs)
+
+    def __contains__(self, fo):
+        return os.path.exists(self.path(self.key(fo)))
+
+    def evict(self):
+        """
+        Removes least recently read entries until under `max_size`.
+        """
+        entries = []
+        for file_name in os.listdir(self.directory):
+            if not file_name.endswith(self.EXTENSION):
+                continue
+            path = os.path.join(self.directory, file_name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_atime, stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        size = sum(entry[2] for entry in entries)
+        for _, _, entry_size, path in entries:
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            size -= entry_size
+
+    # internals
+
+    def _parse(self, reader, path):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory)
+        completed = False
+        try:
+            with os.fdopen(fd, 'wb') as fo:
+                chunk = []
+                for record, terminal in reader:
+                    chunk.append(_encode(record, terminal))
+                    if len(chunk) == self.chunk_size:
+                        marshal.dump(chunk, fo)
+                        del chunk[:]
+                    yield record, terminal
+                if chunk:
+                    marshal.dump(chunk, fo)
+            completed = not reader.errors
+        finally:
+            if completed:
+                os.rename(tmp_path, path)
+                self.evict()
+            else:
+                os.remove(tmp_path)
+
+    def _load(self, path):
+        with open(path, 'rb') as fo:
+            while True:
+                try:
+                    chunk = marshal.load(fo)
+                except EOFError:
+                    break
+                for encoded in chunk:
+                    yield _decode(encoded)
+
+
+def _layout(record_type):
+    names, dates, times = [], [], []
+    for field in record_type.fields:
+        if field._constant is not None:
+            continue
+        if isinstance(field, Time):
+            times.append(len(names))
+        elif isinstance(field, Date):
+            dates.append(len(names))
+        names.append(field.name)
+    return names, dates, times
+
+
+def _encode(record, terminal):
+    record_type = type(record)
+    names, dates, times = _layouts[record_type]
+    values = [record.get(name) for name in names]
+    for i in dates:
+        values[i] = values[i].toordinal()
+    for i in times:
+        value = values[i]
+        values[i] = (value.hour, value.minute, value.second)
+    return _codes[record_type], tuple(values), terminal
+
+
+def _decode(encoded):
+    code, values, terminal = encoded
+    record_type = _types[code]
+    names, dates, times = _layouts[record_type]
+    if dates or times:
+        values = list(values)
+        for i in dates:
+            values[i] = datetime.date.fromordinal(values[i])
+        for i in times:
+            values[i] = datetime.time(*values[i])
+    # NOTE: values were validated when first parsed
+    record = dict.__new__(record_type)
+    dict.update(record, zip(names, values))
+    return record, terminal
+
+
+_types = sorted(
+    set(Reader.record_types.values()) | set(Reader.addenda_types.values()),
+    key=lambda record_type: record_type.__name__,
+)
+
+_codes = dict((record_type, i) for i, record_type in enumerate(_types))
+
+_layouts = dict((record_type, _layout(record_type)) for record_type in _types)
+
+# NOTE: changes to record layouts invalidate existing entries
+_signature = repr([
+    (record_type.__name__, _layouts[record_type]) for record_type in _types
+])
@@ -0,0 +1,411 @@
+"""
+Command line interface, e.g.:
+
+.. code:: bash
+
+    $ nacha summary sample.nacha
+    $ nacha validate *.nacha
+    $ nacha validate --rules *.nacha
+    $ nacha grep --routing-number 112345678 sample.nacha
+    $ nacha split --batches 1 --prefix batch- sample.nacha
+    $ nacha convert --format jsonl sample.nacha > sample.jsonl
+    $ nacha diff ours.nacha theirs.nacha
+
+All commands stream so memory use does not grow with file size.
+
+"""
+__all__ = [
+    'main',
+]
+
+import argparse
+import collections
+import sys
+
+from . import (
+    FileHeader,
+    CompanyBatchHeader,
+    EntryDetail,
+    CompanyBatchControl,
+    FileControl,
+    Writer,
+    Reader,
+)
+from . import export, rules
+from .compat import to_bytes
+from .diff import ADDED, CHANGED, REMOVED, Diff
+
+
+def summary(args, out):
+    for path in args.paths:
+        with open(path, 'rb') as fo:
+            reader = Reader(fo)
+            for record in reader.filter(
+                    FileHeader,
+                    CompanyBatchHeader,
+                    CompanyBatchControl,
+                    FileControl,
+                ):
+                if isinstance(record, FileHeader):
+                    out.write(
+                        '{0}: {1} -> {2} created {3:%Y-%m-%d %H:%M}\n'.format(
+                            path,
+                            record.immediate_origin_name,
+                            record.immediate_destination_name,
+                            record.file_creation,
+                        )
+                    )
+                elif isinstance(record, CompanyBatchHeader):
+                    out.write(
+                        '  batch {0} {1} {2} {3} effective {4:%Y-%m-%d}\n'.format(
+                            record.batch_number,
+                            record.company_name,
+                            record.standard_entry_class,
+                            record.company_entry_description,
+                            record.effective_entry_date,
+                        )
+                    )
+                elif isinstance(record, CompanyBatchControl):
+                    out.write(
+                        '    entries+addenda {0} debit {1} credit {2}\n'.format(
+                            record.entry_addenda_count,
+                            record.total_batch_debit_entry_amount,
+                            record.total_batch_credit_entry_amount,
+                        )
+                    )
+                else:
+                    out.write(
+                        '  batches {0} entries+addenda {1} debit {2} credit {3}\n'.format(
+                            record.batch_count,
+                            record.entry_addenda_record_count,
+                            record.total_file_debit_entry_amount,
+                            record.total_file_credit_entry_amount,
+                        )
+                    )
+    return 0
+
+
+def validate(args, out):
+    status = 0
+    for path in args.paths:
+        with open(path, 'rb') as fo:
+            problems = list(_validate(Reader(fo)))
+        if args.rules and not problems:
+            with open(path, 'rb') as fo:
+                problems = [
+                    'line {0} {1} {2} {3!r}'.format(
+                        violation.offset,
+                        violation.kind,
+                        violation.name,
+                        violation.value,
+                    )
+                    for violation in rules.standard().check(Reader(fo))
+                ]
+        for problem in problems:
+            out.write('{0}: {1}\n'.format(path, problem))
+        if problems:
+            status = 1
+        else:
+            out.write('{0}: ok\n'.format(path))
+    return status
+
+
+def grep(args, out):
+    routing_number = None
+    if args.routing_number is not None:
+        routing_number = to_bytes('{0:0>9}'.format(args.routing_number))
+    matched = 0
+    for path in args.paths:
+        with open(path, 'rb') as fo:
+            reader = Reader(fo)
+            for line, line_no in reader.lines():
+                if line[:1] != _entry_detail:
+                    continue
+                if (args.trace_number is not None and
+                    EntryDetail.peek(line, 'trace_number') != args.trace_number):
+                    continue
+                if (routing_number is not None and
+                    line[_routing_number] != routing_number):
+                    continue
+                if args.min_amount is not None or args.max_amount is not None:
+                    amount = EntryDetail.peek(line, 'amount')
+                    if args.min_amount is not None and amount < args.min_amount:
+                        continue
+                    if args.max_amount is not None and amount > args.max_amount:
+                        continue
+                out.write('{0}:{1}:{2}\n'.format(
+                    path, line_no, line.rstrip(b'\r\n'),
+                ))
+                matched += 1
+    return 0 if matched else 1
+
+
+def split(args, out):
+    with open(args.path, 'rb') as fo:
+        reader = Reader(fo)
+        file_header = None
+        part, part_no, batch_count = None, 0, 0
+        for line, line_no in reader.lines():
+            record_type = line[:1]
+            if record_type == _file_header:
+                file_header = line
+            elif record_type == _file_control:
+                if file_header is None:
+                    reader.malformed(line_no, 'missing file header')
+                break
+            elif record_type == _batch_header:
+                if part is not None and batch_count == args.batches:
+                    _end_part(part)
+                    part = None
+                if part is None:
+                    if file_header is None:
+                        reader.malformed(line_no, 'missing file header')
+                    part_no += 1
+                    path = '{0}{1:0>4}'.format(args.prefix, part_no)
+                    part = _Part(open(path, 'wb'))
+                    part.write(file_header)
+                    out.write('{0}\n'.format(path))
+                    batch_count = 0
+                batch_count += 1
+                part.write(line)
+            elif part is None:
+                reader.malformed(line_no, 'missing company batch header')
+            elif record_type == _batch_control:
+                part.control(reader.load(line, line_no))
+                part.write(line)
+            else:
+                part.write(line)
+        if part is not None:
+            _end_part(part)
+    return 0
+
+
+def convert(args, out):
+    to = {
+        'csv': export.to_csv,
+        'jsonl': export.to_jsonl,
+    }[args.format]
+    for path in args.paths:
+        with open(path, 'rb') as fo:
+            to(Reader(fo), out)
+    return 0
+
+
+def diff(args, out):
+    differences = 0
+    with open(args.left, 'rb') as left, open(args.right, 'rb') as right:
+        with Diff(Reader(left), Reader(right), run_size=args.run_size) as result:
+            for delta in result.controls:
+                out.write('control {0} {1} {2} != {3}\n'.format(
+                    'file' if delta.batch_number is None
+                    else 'batch {0}'.format(delta.batch_number),
+                    delta.name,
+                    delta.left,
+                    delta.right,
+                ))
+                differences += 1
+            for difference in result.entries():
+                out.write('{0} batch {1} trace {2}\n'.format(
+                    _diff_marks[difference.kind],
+                    difference.batch_number,
+                    difference.trace_number,
+                ))
+                for field in difference.fields:
+                    out.write('    {0} {1!r} != {2!r}\n'.format(
+                        field.name, field.left, field.right,
+                    ))
+                differences += 1
+    return 1 if differences else 0
+
+
+def parser():
+    root = argparse.ArgumentParser(prog='nacha')
+    commands = root.add_subparsers(title='commands')
+
+    command = commands.add_parser(
+        'summary', help='file and batch totals from header and control records',
+    )
+    command.add_argument('paths', nargs='+', metavar='path')
+    command.set_defaults(command=summary)
+
+    command = commands.add_parser(
+        'validate', help='check structure and control totals',
+    )
+    command.add_argument(
+        '--rules', action='store_true', help='also check NACHA entry rules',
+    )
+    command.add_argument('paths', nargs='+', metavar='path')
+    command.set_defaults(command=validate)
+
+    command = commands.add_parser('grep', help='find entries')
+    command.add_argument('--trace-number', type=int)
+    command.add_argument('--routing-number', type=int)
+    command.add_argument('--min-amount', type=int, help='in cents')
+    command.add_argument('--max-amount', type=int, help='in cents')
+    command.add_argument('paths', nargs='+', metavar='path')
+    command.set_defaults(command=grep)
+
+    command = commands.add_parser('split', help='split batches into files')
+    command.add_argument(
+        '--batches', type=int, default=1, help='batches per file',
+    )
+    command.add_argument('--prefix', default='part-', help='output path prefix')
+    command.add_argument('path')
+    command.set_defaults(command=split)
+
+    command = commands.add_parser(
+        'convert', help='convert entries to CSV or JSON Lines',
+    )
+    command.add_argument('--format', choices=['csv', 'jsonl'], default='csv')
+    command.add_argument('paths', nargs='+', metavar='path')
+    command.set_defaults(command=convert)
+
+    command = commands.add_parser(
+        'diff', help='entry and control total differences between files',
+    )
+    command.add_argument(
+        '--run-size', type=int, help='entries sorted in memory per run',
+    )
+    command.add_argument('left')
+    command.add_argument('right')
+    command.set_defaults(command=diff)
+
+    return root
+
+
+def main(argv=None, out=None):
+    args = parser().parse_args(argv)
+    try:
+        return args.command(args, out or sys.stdout)
+    except Reader.error_types as ex:
+        sys.stderr.write('{0}\n'.format(ex))
+        return 2
+
+
+# internals
+
+_file_header = to_bytes(FileHeader.record_type.value)
+
+_batch_header = to_bytes(CompanyBatchHeader.record_type.value)
+
+_entry_detail = to_bytes(EntryDetail.record_type.value)
+
+_batch_control = to_bytes(CompanyBatchControl.record_type.value)
+
+_file_control = to_bytes(FileControl.record_type.value)
+
+_routing_number = slice(
+    EntryDetail.receiving_dfi_trn.offset,
+    EntryDetail.receiving_dfi_trn_check_digit.offset +
+    EntryDetail.receiving_dfi_trn_check_digit.length,
+)
+
+_diff_marks = {
+    ADDED: '+',
+    REMOVED: '-',
+    CHANGED: '~',
+}
+
+_Totals = collections.namedtuple('_Totals', [
+    'entry_addenda_count',
+    'entry_hash',
+    'debit_amount',
+    'credit_amount',
+])
+
+
+class _Part(object):
+
+    def __init__(self, fo):
+        self.fo = fo
+        self.lines = 0
+        self.file_control = FileControl(
+            batch_count=0,
+            block_count=0,
+            entry_addenda_record_count=0,
+            entry_hash_total=0,
+            total_file_debit_entry_amount=0,
+            total_file_credit_entry_amount=0,
+        )
+
+    def write(self, line):
+        self.fo.write(line.rstrip(b'\r\n'))
+        self.fo.write(Writer.RECORD_TERMINAL)
+        self.lines += 1
+
+    def control(self, company_batch_control):
+        file_control = self.file_control
+        file_control.batch_count += 1
+        file_control.entry_addenda_record_count += (
+            company_batch_control.entry_addenda_count
+        )
+        file_control.entry_hash_total = (
+            file_control.entry_hash_total + company_batch_control.entry_hash
+        ) % Writer.HASH_MOD
+        file_control.total_file_debit_entry_amount += (
+            company_batch_control.total_batch_debit_entry_amount
+        )
+        file_control.total_file_credit_entry_amount += (
+            company_batch_control.total_batch_credit_entry_amount
+        )
+
+
+def _end_part(part):
+    part.file_control.block_count = (part.lines + 1 + 9) // 10
+    part.write(part.file_control.dump())
+    part.fo.close()
+
+
+def _validate(reader):
+    try:
+        reader.file_header()
+        file_totals = _Totals(0, 0, 0, 0)
+        batch_count = 0
+        for company_batch_header in reader.company_batches():
+            batch_totals = _Totals(0, 0, 0, 0)
+            for entry in reader.entries():
+                batch_totals = _add(batch_totals, entry)
+            control = reader.company_batch_control()
+            batch_count += 1
+            for name, expected in [
+                    ('service_class_code', company_batch_header.service_class_code),
+                    ('company_id', company_batch_header.company_id),
+                    ('originating_dfi_id', company_batch_header.originating_dfi_id),
+                    ('batch_number', company_batch_header.batch_number),
+                    ('entry_addenda_count', batch_totals.entry_addenda_count),
+                    ('entry_hash', batch_totals.entry_hash),
+                    ('total_batch_debit_entry_amount', batch_totals.debit_amount),
+                    ('total_batch_credit_entry_amount', batch_totals.credit_amount),
+                ]:
+                if control[name] != expected:
+                    yield 'batch {0} {1} {2} != {3}'.format(
+                        company_batch_header.batch_number,
+                        name,
+                        control[name],
+                        expected,
+                    )
+            file_totals = _Totals(*[
+                a + b for a, b in zip(file_totals, batch_totals)
+            ])
+        control = reader.file_control()
+        for name, expected in [
+                ('batch_count', batch_count),
+                ('entry_addenda_record_count', file_totals.entry_addenda_count),
+                ('entry_hash_total', file_totals.entry_hash % Writer.HASH_MOD),
+                ('total_file_debit_entry_amount', file_totals.debit_amount),
+                ('total_file_credit_entry_amount', file_totals.credit_amount),
+            ]:
+            if control[name] != expected:
+                yield 'file {0} {1} != {2}'.format(name, control[name], expected)
+    except Reader.error_types as ex:
+        yield str(ex)
+
+
+def _add(totals, entry):
+    detail = entry.detail
+    return _Totals(
+        entry_addenda_count=totals.entry_addenda_count + 1 + len(entry.addenda),
+        entry_hash=(totals.entry_hash + detail.receiving_dfi_trn) % Writer.HASH_MOD,
+        debit_amount=totals.debit_amount + (detail.amount if detail.is_debit else 0),
+        credit_amount=totals.credit_amount + (detail.amount if detail.is_credit else 0),
+    )
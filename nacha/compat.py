@@ -0,0 +1,45 @@
+"""
+Python 2 and 3 compatibility shims.
+"""
+import sys
+
+PY2 = sys.version_info[0] == 2
+
+if PY2:
+    import Queue as queue
+    import collections as abc
+    import itertools
+    from cStringIO import StringIO
+
+    string_types = basestring
+    text_type = unicode
+    range = xrange
+    zip = itertools.izip
+
+    def iteritems(d):
+        return d.iteritems()
+
+    def itervalues(d):
+        return d.itervalues()
+
+else:
+    import collections.abc as abc
+    import queue
+    from io import StringIO
+
+    string_types = (str, bytes)
+    text_type = str
+    range = range
+    zip = zip
+
+    def iteritems(d):
+        return iter(d.items())
+
+    def itervalues(d):
+        return iter(d.values())
+
+
+def to_bytes(value, encoding='ascii'):
+    if isinstance(value, text_type):
+        return value.encode(encoding)
+    return value
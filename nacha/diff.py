@@ -0,0 +1,325 @@
+"""
+Compares two NACHA files, e.g. our copy of a file and the one a bank received:
+
+.. code:: python
+
+    import nacha.diff
+
+    with open('ours.ach', 'rb') as left, open('theirs.ach', 'rb') as right:
+        with nacha.diff.Diff(nacha.Reader(left), nacha.Reader(right)) as diff:
+            for delta in diff.controls:
+                ...
+            for difference in diff.entries():
+                print(difference.kind, difference.trace_number, difference.fields)
+
+Entries are aligned by `batch_number` and `trace_number`. Each file is read
+once up front and its entries are sorted by those keys in runs of `run_size`
+that are spilled to disk, then merged, so memory use is bounded by `run_size`
+rather than by file size. Entries are kept as raw lines and only parsed when
+they differ.
+
+"""
+__all__ = [
+    'Difference',
+    'FieldDifference',
+    'ControlDelta',
+    'Diff',
+]
+
+import collections
+import heapq
+import itertools
+import marshal
+import os
+import shutil
+import tempfile
+
+from . import (
+    CompanyBatchHeader,
+    EntryDetail,
+    EntryDetailAddendum,
+    CompanyBatchControl,
+    FileControl,
+    Entry,
+    Writer,
+)
+from .compat import to_bytes, zip
+
+
+Difference = collections.namedtuple('Difference', [
+    'kind', 'batch_number', 'trace_number', 'left', 'right', 'fields',
+])
+
+FieldDifference = collections.namedtuple('FieldDifference', [
+    'name', 'left', 'right',
+])
+
+ControlDelta = collections.namedtuple('ControlDelta', [
+    'batch_number', 'name', 'left', 'right',
+])
+
+ADDED = 'added'
+
+REMOVED = 'removed'
+
+CHANGED = 'changed'
+
+
+class Diff(object):
+
+    #: Number of entries sorted in memory before spilling a run to disk.
+    run_size = 100000
+
+    #: Number of entries per marshalled chunk of a run.
+    chunk_size = 1024
+
+    batch_control_fields = [
+        'entry_addenda_count',
+        'entry_hash',
+        'total_batch_debit_entry_amount',
+        'total_batch_credit_entry_amount',
+    ]
+
+    file_control_fields = [
+        'batch_count',
+        'entry_addenda_record_count',
+        'entry_hash_total',
+        'total_file_debit_entry_amount',
+        'total_file_credit_entry_amount',
+    ]
+
+    def __init__(self, left, right, run_size=None, directory=None):
+        """
+        :param left: Reader for one file.
+        :param right: Reader for the other.
+        :param run_size: Overrides `Diff.run_size`.
+        :param directory: Where runs are spilled, a temporary one by default.
+        """
+        if run_size is not None:
+            self.run_size = run_size
+        self.directory = tempfile.mkdtemp(dir=directory)
+        try:
+            self.left = self._sort(left, 'left')
+            self.right = self._sort(right, 'right')
+        except Exception:
+            self.close()
+            raise
+        self.controls = self._controls()
+
+    def entries(self):
+        """
+        Iterates `Difference`s ordered by `batch_number` then `trace_number`.
+        """
+        left = itertools.groupby(self._merge(self.left), key=_key)
+        right = itertools.groupby(self._merge(self.right), key=_key)
+        left_key, left_group = next(left, (None, None))
+        right_key, right_group = next(right, (None, None))
+        while left_group is not None or right_group is not None:
+            if right_group is None or (
+                    left_group is not None and left_key < right_key):
+                for item in left_group:
+                    yield self._difference(REMOVED, item, None)
+                left_key, left_group = next(left, (None, None))
+            elif left_group is None or right_key < left_key:
+                for item in right_group:
+                    yield self._difference(ADDED, None, item)
+                right_key, right_group = next(right, (None, None))
+            else:
+                # NOTE: repeated keys are paired up in file order
+                left_items, right_items = list(left_group), list(right_group)
+                for i in range(max(len(left_items), len(right_items))):
+                    left_item = left_items[i] if i < len(left_items) else None
+                    right_item = right_items[i] if i < len(right_items) else None
+                    if left_item is None:
+                        yield self._difference(ADDED, None, right_item)
+                    elif right_item is None:
+                        yield self._difference(REMOVED, left_item, None)
+                    elif left_item[-1] != right_item[-1]:
+                        yield self._difference(CHANGED, left_item, right_item)
+                left_key, left_group = next(left, (None, None))
+                right_key, right_group = next(right, (None, None))
+
+    def close(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+    # internals
+
+    def _sort(self, reader, name):
+        side = _Side(reader.name)
+        run = []
+        batch_number, entry = None, None
+        for line, line_no in reader.lines():
+            line = line.rstrip(b'\r\n')
+            record_type = line[:1]
+            if record_type == _addendum:
+                if entry is None:
+                    reader.malformed(line_no, 'unexpected addendum')
+                entry.append(line)
+                continue
+            if entry is not None:
+                run.append(_item(entry))
+                entry = None
+                if len(run) == self.run_size:
+                    self._spill(side, name, run)
+                    run = []
+            if record_type == _entry_detail:
+                if batch_number is None:
+                    reader.malformed(line_no, 'unexpected entry detail')
+                entry = [
+                    batch_number,
+                    EntryDetail.peek(line, 'trace_number'),
+                    line_no,
+                    line,
+                ]
+            elif record_type == _batch_header:
+                batch_number = CompanyBatchHeader.peek(line, 'batch_number')
+            elif record_type == _batch_control:
+                control = reader.load(line, line_no)
+                side.batch_controls[control.batch_number] = control
+                batch_number = None
+            elif record_type == _file_control:
+                side.file_control = reader.load(line, line_no)
+        if entry is not None:
+            run.append(_item(entry))
+        run.sort()
+        side.tail = run
+        return side
+
+    def _spill(self, side, name, run):
+        run.sort()
+        path = os.path.join(
+            self.directory, '{0}-{1:0>6}'.format(name, len(side.runs)),
+        )
+        with open(path, 'wb') as fo:
+            for i in range(0, len(run), self.chunk_size):
+                marshal.dump(run[i:i + self.chunk_size], fo)
+        side.runs.append(path)
+
+    def _merge(self, side):
+        runs = [_read_run(path) for path in side.runs]
+        if not runs:
+            return iter(side.tail)
+        return heapq.merge(*(runs + [iter(side.tail)]))
+
+    def _difference(self, kind, left, right):
+        item = left or right
+        left = Entry.load(left[-1]) if left else None
+        right = Entry.load(right[-1]) if right else None
+        return Difference(
+            kind=kind,
+            batch_number=item[0],
+            trace_number=item[1],
+            left=left,
+            right=right,
+            fields=_entry_fields(left, right) if kind == CHANGED else [],
+        )
+
+    def _controls(self):
+        deltas = []
+        batch_numbers = sorted(
+            set(self.left.batch_controls) | set(self.right.batch_controls)
+        )
+        for batch_number in batch_numbers:
+            left = self.left.batch_controls.get(batch_number)
+            right = self.right.batch_controls.get(batch_number)
+            for name in self.batch_control_fields:
+                left_value = left[name] if left is not None else None
+                right_value = right[name] if right is not None else None
+                if left_value != right_value:
+                    deltas.append(ControlDelta(
+                        batch_number, name, left_value, right_value,
+                    ))
+        left, right = self.left.file_control, self.right.file_control
+        for name in self.file_control_fields:
+            left_value = left[name] if left is not None else None
+            right_value = right[name] if right is not None else None
+            if left_value != right_value:
+                deltas.append(ControlDelta(None, name, left_value, right_value))
+        return deltas
+
+
+class _Side(object):
+
+    def __init__(self, name):
+        self.name = name
+        self.runs = []
+        self.tail = []
+        self.batch_controls = {}
+        self.file_control = None
+
+
+_batch_header = to_bytes(CompanyBatchHeader.record_type.value)
+
+_entry_detail = to_bytes(EntryDetail.record_type.value)
+
+_addendum = to_bytes(EntryDetailAddendum.record_type.value)
+
+_batch_control = to_bytes(CompanyBatchControl.record_type.value)
+
+_file_control = to_bytes(FileControl.record_type.value)
+
+
+def _key(item):
+    return item[0], item[1]
+
+
+def _item(entry):
+    # NOTE: line number breaks ties so raw lines are never compared
+    batch_number, trace_number, line_no = entry[:3]
+    return (
+        batch_number,
+        trace_number,
+        line_no,
+        Writer.RECORD_TERMINAL.join(entry[3:]),
+    )
+
+
+def _read_run(path):
+    with open(path, 'rb') as fo:
+        while True:
+            try:
+                chunk = marshal.load(fo)
+            except EOFError:
+                break
+            for item in chunk:
+                yield item
+
+
+def _record_fields(prefix, left, right):
+    differences = []
+    for field in type(left).fields:
+        if field._constant is not None:
+            continue
+        if left.get(field.name) != right.get(field.name):
+            differences.append(FieldDifference(
+                prefix + field.name, left.get(field.name), right.get(field.name),
+            ))
+    return differences
+
+
+def _entry_fields(left, right):
+    differences = _record_fields('', left.detail, right.detail)
+    if len(left.addenda) != len(right.addenda):
+        differences.append(FieldDifference(
+            'addenda', len(left.addenda), len(right.addenda),
+        ))
+    for i, (left_addendum, right_addendum) in enumerate(
+            zip(left.addenda, right.addenda)):
+        prefix = 'addenda.{0}.'.format(i)
+        if type(left_addendum) is not type(right_addendum):
+            differences.append(FieldDifference(
+                prefix + 'type',
+                type(left_addendum).__name__,
+                type(right_addendum).__name__,
+            ))
+            continue
+        differences.extend(
+            _record_fields(prefix, left_addendum, right_addendum)
+        )
+    return differences
@@ -0,0 +1,303 @@
+"""
+Detects entries that were already sent in one of the last `window` files,
+typically because a file was accidentally submitted twice:
+
+.. code:: python
+
+    import nacha.duplicates
+
+    detector = nacha.duplicates.Detector('/var/ach/fingerprints', window=30)
+
+    # while reading
+    with open('2013-01-16.ach', 'rb') as fo:
+        for duplicate in detector.scan(nacha.Reader(fo), '2013-01-16.ach'):
+            print(duplicate.entry.detail.trace_number, duplicate.files)
+
+    # or while writing
+    with open('2013-01-17.ach', 'wb') as fo:
+        writer = detector.writer(fo, '2013-01-17.ach')
+        with writer.begin_file(...):
+            ...
+        writer.duplicates
+
+An entry is fingerprinted by its receiving routing and account number, amount,
+`individual_id` and the effective entry date of its company batch. Each file
+gets its own persistent Bloom filter of fingerprints, so matches are suspected
+rather than certain. An entry is checked against every filter in the window,
+so each filter is sized for `error_rate` / (`window` + 1) to keep the chance of
+an entry being falsely reported at most `error_rate`. Memory and disk use is
+then roughly `capacity` * 22 bits per file at the defaults.
+
+"""
+__all__ = [
+    'fingerprint',
+    'BloomFilter',
+    'Duplicate',
+    'Detector',
+    'Session',
+    'DetectingWriter',
+]
+
+import collections
+import hashlib
+import math
+import os
+import re
+import struct
+import tempfile
+
+from . import Entry, Writer
+from .compat import range, text_type
+
+
+def fingerprint(company_batch_header, entry_detail):
+    key = '|'.join([
+        str(entry_detail.receiving_dfi_routing_number),
+        entry_detail.receiving_dfi_account_number,
+        str(entry_detail.amount),
+        entry_detail.individual_id,
+        str(company_batch_header.effective_entry_date),
+    ])
+    if isinstance(key, text_type):
+        key = key.encode('utf-8')
+    return hashlib.md5(key).digest()
+
+
+class BloomFilter(object):
+
+    MAGIC = b'NBF1'
+
+    header = struct.Struct('<4sIQQ')
+
+    def __init__(self, capacity=10 ** 6, error_rate=0.001, size=None, hashes=None):
+        if size is None:
+            size = int(math.ceil(
+                -capacity * math.log(error_rate) / (math.log(2) ** 2)
+            ))
+        if hashes is None:
+            hashes = max(1, int(round(size / float(capacity) * math.log(2))))
+        self.size = size
+        self.hashes = hashes
+        self.count = 0
+        self.bits = bytearray((size + 7) // 8)
+
+    def add(self, fingerprint):
+        bits = self.bits
+        for position in self._positions(fingerprint):
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, fingerprint):
+        bits = self.bits
+        for position in self._positions(fingerprint):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def __len__(self):
+        return self.count
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as fo:
+            magic, hashes, size, count = cls.header.unpack(
+                fo.read(cls.header.size)
+            )
+            if magic != cls.MAGIC:
+                raise ValueError('{0} is not a bloom filter'.format(path))
+            bloom_filter = cls(size=size, hashes=hashes)
+            bloom_filter.count = count
+            fo.readinto(bloom_filter.bits)
+        return bloom_filter
+
+    def save(self, path):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.')
+        try:
+            with os.fdopen(fd, 'wb') as fo:
+                fo.write(self.header.pack(
+                    self.MAGIC, self.hashes, self.size, self.count,
+                ))
+                fo.write(self.bits)
+            os.rename(tmp_path, path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+    # internals
+
+    def _positions(self, fingerprint):
+        h1, h2 = struct.unpack('<QQ', fingerprint[:16])
+        size = self.size
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % size
+
+
+Duplicate = collections.namedtuple(
+    'Duplicate', ['company_batch_header', 'entry', 'files']
+)
+
+
+class Detector(object):
+
+    EXTENSION = '.bloom'
+
+    def __init__(self, directory, window=30, capacity=10 ** 6, error_rate=0.001):
+        """
+        :param directory: Where per-file Bloom filters are persisted.
+        :param window: Number of most recent files checked against.
+        :param capacity: Expected maximum number of entries per file.
+        :param error_rate:
+            Tolerated rate of entries falsely reported as duplicates, across
+            all files in the window.
+        """
+        self.directory = directory
+        self.window = window
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._filters = {}
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    @property
+    def filter_error_rate(self):
+        """
+        False positive rate each file's filter is sized for, an entry being
+        checked against up to `window` of them and its own file's.
+        """
+        return self.error_rate / (self.window + 1)
+
+    def files(self):
+        """
+        Names of files in the window, oldest first.
+        """
+        return [name for _, name, _ in self._paths()[-self.window:]]
+
+    def session(self, name):
+        """
+        Starts checking file `name`, which replaces any earlier file with the
+        same name once committed.
+        """
+        name = re.sub(r'[^\w.-]', '_', name)
+        filters = []
+        for _, other, path in self._paths()[-self.window:]:
+            if other == name:
+                continue
+            if path not in self._filters:
+                self._filters[path] = BloomFilter.load(path)
+            filters.append((other, self._filters[path]))
+        return Session(self, name, filters)
+
+    def scan(self, reader, name):
+        """
+        Iterates `Duplicate`s for entries read by `reader` and commits file
+        `name` once exhausted.
+        """
+        session = self.session(name)
+        reader.file_header()
+        for company_batch_header in reader.company_batches():
+            for entry in reader.entries():
+                files = session.add(company_batch_header, entry.detail)
+                if files:
+                    yield Duplicate(
+                        company_batch_header=company_batch_header,
+                        entry=entry,
+                        files=files,
+                    )
+            reader.company_batch_control()
+        reader.file_control()
+        session.commit()
+
+    def writer(self, fo, name, writer_cls=None, **kwargs):
+        return (writer_cls or DetectingWriter)(fo, self.session(name), **kwargs)
+
+    # internals
+
+    _path_re = re.compile(r'^(\d+)-(.*)' + re.escape(EXTENSION) + '$')
+
+    def _paths(self):
+        paths = []
+        for file_name in os.listdir(self.directory):
+            match = self._path_re.match(file_name)
+            if match:
+                paths.append((
+                    int(match.group(1)),
+                    match.group(2),
+                    os.path.join(self.directory, file_name),
+                ))
+        paths.sort()
+        return paths
+
+    def _commit(self, name, bloom_filter):
+        paths = self._paths()
+        sequence = paths[-1][0] + 1 if paths else 1
+        path = os.path.join(
+            self.directory,
+            '{0:0>8}-{1}{2}'.format(sequence, name, self.EXTENSION),
+        )
+        bloom_filter.save(path)
+        self._filters[path] = bloom_filter
+        for _, other, other_path in paths:
+            if other == name:
+                self._remove(other_path)
+        for _, _, other_path in self._paths()[:-self.window]:
+            self._remove(other_path)
+
+    def _remove(self, path):
+        self._filters.pop(path, None)
+        os.remove(path)
+
+
+class Session(object):
+
+    def __init__(self, detector, name, filters):
+        self.detector = detector
+        self.name = name
+        self.filters = filters
+        self.filter = BloomFilter(detector.capacity, detector.filter_error_rate)
+
+    def add(self, company_batch_header, entry_detail):
+        """
+        Fingerprints an entry and returns the names of files, including this
+        one, in which it was probably already seen.
+        """
+        value = fingerprint(company_batch_header, entry_detail)
+        files = [name for name, other in self.filters if value in other]
+        if value in self.filter:
+            files.append(self.name)
+        self.filter.add(value)
+        return files
+
+    def commit(self):
+        self.detector._commit(self.name, self.filter)
+
+
+class DetectingWriter(Writer):
+    """
+    Writer collecting suspected `Duplicate`s in `duplicates` as entries are
+    written.
+    """
+
+    def __init__(self, fo, session, **kwargs):
+        super(DetectingWriter, self).__init__(fo, **kwargs)
+        self.session = session
+        self.duplicates = []
+
+    def end_entry(self, ex=None):
+        super(DetectingWriter, self).end_entry(ex)
+        if ex is None:
+            files = self.session.add(
+                self._company_batch_header, self._entry_detail,
+            )
+            if files:
+                self.duplicates.append(Duplicate(
+                    company_batch_header=self._company_batch_header,
+                    entry=Entry(
+                        detail=self._entry_detail, addenda=self._entry_addenda,
+                    ),
+                    files=files,
+                ))
+
+    def end_file(self, ex=None):
+        super(DetectingWriter, self).end_file(ex)
+        if ex is None:
+            self.session.commit()
@@ -0,0 +1,219 @@
+"""
+Writer that survives crashes while generating large files:
+
+.. code:: python
+
+    import nacha.durable
+
+    writer = nacha.durable.DurableWriter('payouts.ach')
+    with writer.begin_file(...):
+        for batch in batches[writer.file_control.batch_count:]:
+            with writer.begin_company_batch(...):
+                ...
+
+Records are written to ``payouts.ach.partial`` and after every
+`checkpoint_every` company batches the partial file is fsynced and the writer's
+state saved to ``payouts.ach.state``. If the process dies, constructing a
+`DurableWriter` for the same path again truncates the partial file back to the
+last checkpoint and restores the state, and `begin_file` then continues that
+file rather than starting a new one so only batches after
+``file_control.batch_count`` need to be written again. Its arguments must be
+those the file was begun with, `created_at` aside which may be omitted.
+
+Ending the file fsyncs it and renames it to ``payouts.ach`` so a partial file
+is never seen there, and only then removes the state. A state left behind by a
+crash after that rename is recognized by the partial file being gone and the
+file being in place, and is discarded.
+
+"""
+__all__ = [
+    'DurableWriter',
+]
+
+import datetime
+import itertools
+import json
+import os
+import tempfile
+
+from . import FileHeader, FileControl, Writer
+from .compat import to_bytes
+from .trace import MemorySequence
+
+
+class DurableWriter(Writer):
+
+    PARTIAL_EXTENSION = '.partial'
+
+    STATE_EXTENSION = '.state'
+
+    def __init__(self, path, checkpoint_every=1, **kwargs):
+        """
+        :param path: Where the file ends up once complete.
+        :param checkpoint_every: Number of company batches between checkpoints.
+        """
+        self.path = path
+        self.partial_path = path + self.PARTIAL_EXTENSION
+        self.state_path = path + self.STATE_EXTENSION
+        self.checkpoint_every = checkpoint_every
+        self.state = self._load_state()
+        if self.state is None:
+            fo = open(self.partial_path, 'wb')
+        else:
+            fo = open(self.partial_path, 'r+b')
+            fo.truncate(self.state['offset'])
+            fo.seek(self.state['offset'])
+        super(DurableWriter, self).__init__(fo, **kwargs)
+        self.file_control = None
+        if self.state is not None:
+            self.file_control = FileControl(**self.state['file_control'])
+
+    @property
+    def resumed(self):
+        return self.state is not None
+
+    def begin_file(self,
+                   immediate_destination,
+                   immediate_destination_name,
+                   immediate_origin,
+                   immediate_origin_name,
+                   created_at=None,
+                   file_id_modifier='A',
+                   reference_code=None,
+        ):
+        if self.state is None:
+            ctx = super(DurableWriter, self).begin_file(
+                immediate_destination,
+                immediate_destination_name,
+                immediate_origin,
+                immediate_origin_name,
+                created_at=created_at,
+                file_id_modifier=file_id_modifier,
+                reference_code=reference_code,
+            )
+            self.checkpoint()
+            return ctx
+        if self._ctxs:
+            raise Exception('Cannot be in context')
+        state = self.state
+        self.file_header = FileHeader.load(state['file_header'])
+        self._default_at = self.created_at = datetime.datetime(
+            *state['created_at']
+        )
+        created_at = created_at or self.created_at
+        file_header = FileHeader(
+            file_creation_date=created_at.date(),
+            file_creation_time=created_at.time(),
+            immediate_destination=immediate_destination,
+            immediate_destination_name=immediate_destination_name,
+            immediate_origin=immediate_origin,
+            immediate_origin_name=immediate_origin_name,
+            file_id_modifier=file_id_modifier or 'A',
+            reference_code=reference_code,
+        )
+        if file_header.dump() != self.file_header.dump():
+            raise ValueError(
+                'Resumed file {0} was begun with a different header'
+                .format(self.partial_path)
+            )
+        self._batch_numbers = itertools.count(state['batch_number'])
+        sequence = getattr(self.trace_numbers, 'sequence', None)
+        if isinstance(sequence, MemorySequence):
+            for originating_dfi_id, on, next_sequence in state['trace_sequences']:
+                on = datetime.date.fromordinal(on)
+                sequence.next_sequences[(originating_dfi_id, on)] = next_sequence
+        return self._push(self.end_file)
+
+    def end_company_batch(self, ex=None):
+        super(DurableWriter, self).end_company_batch(ex)
+        if ex is None and self.file_control.batch_count % self.checkpoint_every == 0:
+            self.checkpoint()
+
+    def end_file(self, ex=None):
+        super(DurableWriter, self).end_file(ex)
+        if ex is None:
+            self.fo.flush()
+            os.fsync(self.fo.fileno())
+            self.fo.close()
+            os.rename(self.partial_path, self.path)
+            _fsync_directory(self.path)
+            os.remove(self.state_path)
+            self.state = None
+
+    def checkpoint(self):
+        """
+        Makes everything written so far durable. Only call between company
+        batches.
+        """
+        self.fo.flush()
+        os.fsync(self.fo.fileno())
+        state = {
+            'offset': self.fo.tell(),
+            'file_header': self.file_header.dump(),
+            'created_at': list(self.created_at.timetuple()[:6]) + [
+                self.created_at.microsecond,
+            ],
+            'file_control': dict(self.file_control),
+            'batch_number': self.file_control.batch_count + 1,
+            'trace_sequences': self._trace_sequences(),
+        }
+        fd, tmp_path = tempfile.mkstemp(
+            dir=os.path.dirname(self.state_path) or '.'
+        )
+        try:
+            with os.fdopen(fd, 'w') as fo:
+                json.dump(state, fo)
+                fo.flush()
+                os.fsync(fo.fileno())
+            os.rename(tmp_path, self.state_path)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+    def close(self):
+        self.fo.close()
+
+    # internals
+
+    def _load_state(self):
+        if not os.path.exists(self.state_path):
+            return None
+        if not os.path.exists(self.partial_path):
+            if not os.path.exists(self.path):
+                raise IOError(
+                    'State {0} has neither a partial nor a complete file'
+                    .format(self.state_path)
+                )
+            # NOTE: crashed after renaming the complete file into place
+            os.remove(self.state_path)
+            return None
+        with open(self.state_path, 'r') as fo:
+            state = json.load(fo)
+        state['file_header'] = to_bytes(state['file_header'])
+        state['file_control'] = dict(
+            (str(name), value) for name, value in state['file_control'].items()
+        )
+        return state
+
+    def _trace_sequences(self):
+        # NOTE: persistent sequences need no help, in memory ones resume at
+        # the first number not yet handed out
+        sequence = getattr(self.trace_numbers, 'sequence', None)
+        if not isinstance(sequence, MemorySequence):
+            return []
+        next_sequences = dict(sequence.next_sequences)
+        for key, (start, stop) in self.trace_numbers._blocks.items():
+            if key in next_sequences:
+                next_sequences[key] = start
+        return [
+            [originating_dfi_id, on.toordinal(), next_sequence]
+            for (originating_dfi_id, on), next_sequence in next_sequences.items()
+        ]
+
+
+def _fsync_directory(path):
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
@@ -0,0 +1,273 @@
+"""
+Flattens entries for consumers that do not speak NACHA, e.g.:
+
+.. code:: python
+
+    import nacha.export
+
+    with open('sample.nacha', 'rb') as fo, open('sample.csv', 'wb') as out:
+        nacha.export.to_csv(nacha.Reader(fo), out)
+
+Each entry is emitted as one row carrying its company batch context. Fields
+are sliced directly out of each line at their fixed offsets so no records are
+constructed, and output is written in chunks of `chunk_size` rows.
+
+Parquet is supported if `pyarrow <https://arrow.apache.org/>`_ is installed:
+
+.. code:: bash
+
+    $ pip install nacha[parquet]
+
+"""
+__all__ = [
+    'fields',
+    'rows',
+    'to_csv',
+    'to_jsonl',
+    'to_parquet',
+]
+
+import csv
+import datetime
+import json
+
+from . import (
+    CompanyBatchHeader,
+    EntryDetail,
+    EntryDetailAddendum,
+    EntryDetailChangeAddendum,
+    EntryDetailReturnAddendum,
+    Reader,
+    _addenda_type,
+)
+from .compat import StringIO, to_bytes
+
+
+batch_fields = [
+    'company_id',
+    'company_name',
+    'standard_entry_class',
+    'company_entry_description',
+    'effective_entry_date',
+    'batch_number',
+]
+
+entry_fields = [
+    'transaction_code',
+    'receiving_dfi_routing_number',
+    'receiving_dfi_account_number',
+    'amount',
+    'individual_id',
+    'individual_name',
+    'discretionary_data',
+    'trace_number',
+]
+
+#: Filled from return (99) and notification of change (98) addenda.
+return_fields = [
+    'return_reason_code',
+    'change_code',
+    'original_entry_trace_number',
+    'corrected_data',
+]
+
+fields = batch_fields + entry_fields + return_fields + ['addenda']
+
+chunk_size = 4096
+
+
+def rows(reader):
+    """
+    Iterates flattened entries read by `reader` as dicts keyed by `fields`.
+    """
+    for row in _rows(reader):
+        yield dict(zip(fields, row))
+
+
+def to_csv(reader, fo, chunk_size=chunk_size):
+    buf = StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(fields)
+    for i, row in enumerate(_rows(reader), 1):
+        row[-1] = '|'.join(row[-1])
+        writer.writerow(row)
+        if i % chunk_size == 0:
+            fo.write(buf.getvalue())
+            buf.seek(0)
+            buf.truncate()
+    fo.write(buf.getvalue())
+
+
+def to_jsonl(reader, fo, chunk_size=chunk_size):
+    encoder = json.JSONEncoder(default=_json_default, sort_keys=True)
+    chunk = []
+    for row in _rows(reader):
+        chunk.append(encoder.encode(dict(zip(fields, row))))
+        if len(chunk) == chunk_size:
+            chunk.append('')
+            fo.write('\n'.join(chunk))
+            del chunk[:]
+    if chunk:
+        chunk.append('')
+        fo.write('\n'.join(chunk))
+
+
+def to_parquet(reader, path, chunk_size=64 * 1024):
+    """
+    Writes entries read by `reader` to a Parquet file at `path`, one row group
+    per `chunk_size` entries.
+    """
+    # NOTE: imported here as loading pyarrow would slow every import of this
+    # module, e.g. by nacha.cli
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError(
+            'pyarrow is required for parquet, pip install nacha[parquet]'
+        )
+    arrow_types = _arrow_types(pyarrow)
+    schema = pyarrow.schema([(name, arrow_types[name]) for name in fields])
+    writer = pyarrow.parquet.ParquetWriter(path, schema)
+    try:
+        columns = [[] for _ in fields]
+        for row in _rows(reader):
+            for column, value in zip(columns, row):
+                column.append(value)
+            if len(columns[0]) == chunk_size:
+                writer.write_table(_arrow_table(pyarrow, schema, columns))
+                columns = [[] for _ in fields]
+        if columns[0]:
+            writer.write_table(_arrow_table(pyarrow, schema, columns))
+    finally:
+        writer.close()
+
+
+# internals
+
+def _slicer(record_type, names):
+    return [
+        (name, getattr(record_type, name).offset, getattr(record_type, name).unpack)
+        for name in names
+    ]
+
+
+_batch_slicer = _slicer(CompanyBatchHeader, batch_fields)
+
+_entry_slicer = _slicer(EntryDetail, [
+    'transaction_code',
+    'receiving_dfi_trn',
+    'receiving_dfi_trn_check_digit',
+    'receiving_dfi_account_number',
+    'amount',
+    'individual_id',
+    'individual_name',
+    'discretionary_data',
+    'trace_number',
+])
+
+_addenda_slicers = {
+    EntryDetailAddendum: _slicer(
+        EntryDetailAddendum, ['payment_related_information'],
+    ),
+    EntryDetailChangeAddendum: _slicer(EntryDetailChangeAddendum, [
+        'change_code', 'original_entry_trace_number', 'corrected_data',
+    ]),
+    EntryDetailReturnAddendum: _slicer(EntryDetailReturnAddendum, [
+        'return_reason_code', 'original_entry_trace_number',
+    ]),
+}
+
+_record_types = set(to_bytes(value) for value in Reader.record_types)
+
+_positions = dict((name, i) for i, name in enumerate(fields))
+
+
+def _unpack(reader, line, line_no, slicer):
+    try:
+        return [unpack(line[offset:]) for _, offset, unpack in slicer]
+    except EntryDetail.field_type.error_type as ex:
+        reader.malformed(line_no, str(ex))
+
+
+def _rows(reader):
+    batch_header = to_bytes(CompanyBatchHeader.record_type.value)
+    entry_detail = to_bytes(EntryDetail.record_type.value)
+    entry_addendum = to_bytes(EntryDetailAddendum.record_type.value)
+    batch, row = None, None
+    for line, line_no in reader.lines():
+        record_type = line[:1]
+        if record_type == entry_addendum:
+            if row is None:
+                reader.malformed(line_no, 'unexpected addendum')
+            addendum_cls = Reader.addenda_types.get(line[_addenda_type])
+            if addendum_cls is None:
+                reader.malformed(line_no, 'unexpected addenda_type {0}'.format(
+                    line[_addenda_type],
+                ))
+            slicer = _addenda_slicers[addendum_cls]
+            values = _unpack(reader, line, line_no, slicer)
+            if addendum_cls is EntryDetailAddendum:
+                row[-1].extend(values)
+            else:
+                for (name, _, _), value in zip(slicer, values):
+                    row[_positions[name]] = value
+            continue
+        if row is not None:
+            yield row
+            row = None
+        if record_type == entry_detail:
+            if batch is None:
+                reader.malformed(line_no, 'unexpected entry detail')
+            row = _unpack(reader, line, line_no, _entry_slicer)
+            # NOTE: trn and check digit make up the routing number
+            row[1] = row[1] * 10 + row.pop(2)
+            row = batch + row + [None] * len(return_fields) + [[]]
+        elif record_type == batch_header:
+            batch = _unpack(reader, line, line_no, _batch_slicer)
+        elif record_type not in _record_types:
+            reader.malformed(
+                line_no, 'unexpected record_type {0}'.format(record_type),
+            )
+    if row is not None:
+        yield row
+
+
+def _json_default(value):
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    raise TypeError('{0!r} is not JSON serializable'.format(value))
+
+
+def _arrow_types(pyarrow):
+    return {
+        'company_id': pyarrow.string(),
+        'company_name': pyarrow.string(),
+        'standard_entry_class': pyarrow.string(),
+        'company_entry_description': pyarrow.string(),
+        'effective_entry_date': pyarrow.date32(),
+        'batch_number': pyarrow.int32(),
+        'transaction_code': pyarrow.int8(),
+        'receiving_dfi_routing_number': pyarrow.int32(),
+        'receiving_dfi_account_number': pyarrow.string(),
+        'amount': pyarrow.int64(),
+        'individual_id': pyarrow.string(),
+        'individual_name': pyarrow.string(),
+        'discretionary_data': pyarrow.string(),
+        'trace_number': pyarrow.int64(),
+        'return_reason_code': pyarrow.string(),
+        'change_code': pyarrow.string(),
+        'original_entry_trace_number': pyarrow.int64(),
+        'corrected_data': pyarrow.string(),
+        'addenda': pyarrow.list_(pyarrow.string()),
+    }
+
+
+def _arrow_table(pyarrow, schema, columns):
+    return pyarrow.Table.from_arrays(
+        [
+            pyarrow.array(column, type=field.type)
+            for field, column in zip(schema, columns)
+        ],
+        schema=schema,
+    )
@@ -0,0 +1,331 @@
+"""
+Concurrent parsing of many NACHA files, e.g. a nightly drop from an ODFI:
+
+.. code:: python
+
+    import nacha.ingest
+
+    for result in nacha.ingest.ingest('/var/ach/returns/*.ach', workers=4):
+        if result.errors:
+            ...
+        for company_batch in result.company_batches:
+            for entry in company_batch.entries:
+                ...
+        result.file_control.total_file_debit_entry_amount
+
+Files are parsed in a pool of worker processes. At most `backlog` files are
+in flight at any time so a slow consumer stalls submission rather than
+buffering parsed files without bound. Results are yielded as files finish
+parsing, so a slow file holds back neither finished ones nor the pool, or in
+the order files were matched with `ordered`. Waiting more than `timeout`
+seconds for a result, e.g. because its worker died, raises
+`multiprocessing.TimeoutError` rather than waiting forever.
+
+Entries can also be handed to a sink once their file has been parsed:
+
+.. code:: python
+
+    def sink(result, company_batch_header, entry):
+        ...
+
+    for result in nacha.ingest.ingest('/var/ach/returns', sink=sink):
+        ...
+
+Each file is still parsed whole into its `Result` first, so memory use is
+bounded by the largest file times `backlog` and not by the sink.
+
+A single transmission can also hold several files, each `FileHeader` through
+`FileControl`, concatenated:
+
+.. code:: python
+
+    for result in nacha.ingest.files('/var/ach/inbound/transmission.ach'):
+        ...
+
+It is first scanned for `FileHeader` records without parsing anything and the
+files found are then parsed independently, in worker processes when there are
+several, and yielded in stream order, with `timeout` as above. Line numbers in
+errors are those of the whole stream.
+
+"""
+__all__ = [
+    'CompanyBatch',
+    'Result',
+    'Segment',
+    'parse',
+    'ingest',
+    'scan',
+    'segments',
+    'parse_segment',
+    'files',
+]
+
+import collections
+import glob
+import io
+import multiprocessing
+import os
+import time
+
+from . import FileHeader, Reader
+from .compat import string_types, to_bytes
+
+
+class CompanyBatch(collections.namedtuple(
+        'CompanyBatch', ['header', 'entries', 'control']
+    )):
+
+    pass
+
+
+class Result(collections.namedtuple(
+        'Result', [
+            'path',
+            'file_header',
+            'company_batches',
+            'file_control',
+            'errors',
+        ]
+    )):
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    @property
+    def entries(self):
+        for company_batch in self.company_batches:
+            for entry in company_batch.entries:
+                yield entry
+
+
+class Segment(collections.namedtuple(
+        'Segment', ['offset', 'length', 'line_no']
+    )):
+    """
+    Where one of the files concatenated in a stream is, `line_no` being that
+    of its `FileHeader`.
+    """
+
+
+def parse(path):
+    """
+    Parses the NACHA file at `path` into a `Result`. Parsing stops at the
+    first error which is then recorded in `Result.errors`.
+    """
+    with open(path, 'rb') as fo:
+        return _read(Reader(fo), path)
+
+
+def scan(fo, chunk_size=1024 * 1024):
+    """
+    Yields `(offset, line_no)` of each `FileHeader` record in `fo` by looking
+    only at the first byte of each line.
+    """
+    offset, line_no, previous = 0, 1, b'\n'
+    while True:
+        chunk = fo.read(chunk_size)
+        if not chunk:
+            break
+        # NOTE: data[0] is the byte before offset so data[i + 1] is at offset + i
+        data = previous + chunk
+        start = 1
+        i = data.find(_file_header)
+        while i != -1:
+            line_no += data.count(b'\n', start, i + 1)
+            start = i + 1
+            yield offset + i, line_no
+            i = data.find(_file_header, i + 1)
+        line_no += data.count(b'\n', start)
+        offset += len(chunk)
+        previous = chunk[-1:]
+
+
+def segments(path):
+    """
+    Splits the stream at `path` into a `Segment` per file. Anything before the
+    first `FileHeader` is part of the first segment.
+    """
+    size = os.path.getsize(path)
+    with open(path, 'rb') as fo:
+        starts = list(scan(fo))
+    if not starts or starts[0][0] != 0:
+        starts.insert(0, (0, 1))
+    stops = [offset for offset, _ in starts[1:]] + [size]
+    return [
+        Segment(offset=offset, length=stop - offset, line_no=line_no)
+        for (offset, line_no), stop in zip(starts, stops)
+        if stop > offset
+    ]
+
+
+def files(path, workers=None, timeout=600):
+    """
+    Parses each of the files concatenated in the stream at `path` and yields
+    a `Result` for each in stream order.
+
+    :param workers:
+        Number of worker processes, defaults to the number of cores. Files
+        are parsed in this process if there is only one or `workers` is 0.
+    :param timeout:
+        Seconds to wait for a file's `Result` once it is next to be yielded,
+        or None to wait forever.
+    """
+    parts = segments(path)
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    if workers == 0 or len(parts) < 2:
+        for segment in parts:
+            yield parse_segment(path, segment)
+        return
+    workers = min(workers, len(parts))
+    for result in _parallel(
+            parse_segment,
+            ((path, segment) for segment in parts),
+            workers,
+            2 * workers,
+            timeout,
+            True,
+        ):
+        yield result
+
+
+def parse_segment(path, segment):
+    """
+    Parses the file at `segment` of the stream at `path` into a `Result`.
+    """
+    with open(path, 'rb') as fo:
+        fo.seek(segment.offset)
+        data = fo.read(segment.length)
+    src = io.BytesIO(data)
+    src.name = path
+    return _read(Reader(src, line_no=segment.line_no), path)
+
+
+def paths_for(*patterns):
+    """
+    Expands directories and glob `patterns` to file paths.
+    """
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, '*')
+        for path in sorted(glob.glob(pattern)):
+            if os.path.isfile(path):
+                yield path
+
+
+def ingest(patterns,
+           workers=None,
+           backlog=None,
+           sink=None,
+           timeout=600,
+           ordered=False,
+    ):
+    """
+    Parses files matched by `patterns` concurrently and yields a `Result` for
+    each as it is parsed.
+
+    :param patterns:
+        Directory, glob pattern or file path, or a list of them.
+    :param workers:
+        Number of worker processes, defaults to the number of cores. Use 0 to
+        parse in this process.
+    :param backlog:
+        Maximum number of files submitted but not yet yielded, defaults to
+        twice `workers`.
+    :param sink:
+        Optional callable invoked as ``sink(result, company_batch_header, entry)``
+        for every entry of a file, once parsed, before its `Result` is
+        yielded.
+    :param timeout:
+        Seconds to wait for the next `Result`, or None to wait forever.
+    :param ordered:
+        Yield results in the order files are matched rather than as they are
+        parsed, so `timeout` applies to each file once it is next in order.
+    """
+    if isinstance(patterns, string_types):
+        patterns = [patterns]
+    paths = paths_for(*patterns)
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    if workers == 0:
+        results = (parse(path) for path in paths)
+    else:
+        results = _parallel(
+            parse,
+            ((path,) for path in paths),
+            workers,
+            backlog or 2 * workers,
+            timeout,
+            ordered,
+        )
+    for result in results:
+        if sink is not None:
+            for company_batch in result.company_batches:
+                for entry in company_batch.entries:
+                    sink(result, company_batch.header, entry)
+        yield result
+
+
+# internals
+
+_file_header = b'\n' + to_bytes(FileHeader.record_type.value)
+
+
+def _read(reader, path):
+    file_header, company_batches, file_control, errors = None, [], None, []
+    try:
+        file_header = reader.file_header()
+        for header in reader.company_batches():
+            entries = list(reader.entries())
+            control = reader.company_batch_control()
+            company_batches.append(
+                CompanyBatch(header=header, entries=entries, control=control)
+            )
+        file_control = reader.file_control()
+    except Reader.error_types as ex:
+        errors.append(ex)
+    return Result(
+        path=path,
+        file_header=file_header,
+        company_batches=company_batches,
+        file_control=file_control,
+        errors=errors,
+    )
+
+
+#: Seconds between checks for a completed result when yielding unordered.
+_poll = 0.01
+
+
+def _parallel(func, args, workers, backlog, timeout, ordered):
+    # NOTE: AsyncResult.get raises worker exceptions, including results that
+    # fail to pickle, and timing out covers workers that die
+    pending = collections.deque()
+    pool = multiprocessing.Pool(workers)
+    try:
+        for arg in args:
+            pending.append(pool.apply_async(func, arg))
+            while len(pending) >= backlog:
+                yield _completed(pending, timeout, ordered)
+        while pending:
+            yield _completed(pending, timeout, ordered)
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def _completed(pending, timeout, ordered):
+    if ordered:
+        return pending.popleft().get(timeout)
+    # NOTE: the pool cannot wait on several results so they are polled
+    waited_at = time.time()
+    while True:
+        for result in pending:
+            if result.ready():
+                pending.remove(result)
+                return result.get()
+        if timeout is not None and time.time() - waited_at >= timeout:
+            raise multiprocessing.TimeoutError()
+        pending[0].wait(_poll)
@@ -0,0 +1,223 @@
+"""
+Overlaps building records with writing them to slow sinks, e.g. network
+filesystems or encrypted streams:
+
+.. code:: python
+
+    import nacha.pipeline
+
+    with open('/mnt/ach/payouts.ach', 'wb') as fo:
+        writer = nacha.pipeline.PipelinedWriter(fo, depth=16)
+        with writer.begin_file(...):
+            ...
+        print(writer.stats)
+
+Dumped records are gathered into chunks of `chunk_size` bytes which are handed
+through a queue of at most `depth` chunks to a dedicated I/O thread that
+writes them to `fo`. When the queue is full the producer blocks until the I/O
+thread catches up so memory stays bounded.
+
+Ending the file writes everything still queued to `fo` and stops the I/O
+thread, `fo` itself is left open. A write that fails in the I/O thread is
+raised on the producer's next write or when the file is ended, and again by
+`close`. Anything else queued after the failure is discarded.
+
+`Pipe` is the file-like object doing this and can be given to any writer,
+e.g. a `nacha.bulk.BulkWriter`:
+
+.. code:: python
+
+    with nacha.pipeline.Pipe(fo) as pipe:
+        nacha.bulk.write(pipe, rows, file_header, company_batch)
+
+"""
+__all__ = [
+    'Stats',
+    'Pipe',
+    'PipelinedWriter',
+]
+
+import collections
+import threading
+import time
+
+from . import Writer
+from .compat import queue
+
+
+class Stats(collections.namedtuple('Stats', [
+        'chunks',
+        'bytes',
+        'producer_wait',
+        'io_wait',
+        'io_time',
+    ])):
+    """
+    `producer_wait` is seconds the producer spent blocked on a full queue,
+    `io_wait` seconds the I/O thread spent idle on an empty one and `io_time`
+    seconds it spent in `fo.write`.
+    """
+
+
+class Pipe(object):
+
+    def __init__(self, fo, depth=8, chunk_size=64 * 1024):
+        """
+        :param fo: Binary file-like object written to by the I/O thread.
+        :param depth: Maximum number of chunks queued for the I/O thread.
+        :param chunk_size: Bytes gathered before a chunk is queued.
+        """
+        self.fo = fo
+        self.chunk_size = chunk_size
+        self.closed = False
+        self.error = None
+        self._chunks = queue.Queue(depth)
+        self._buffer = []
+        self._size = 0
+        self._counts = [0, 0]
+        self._producer_wait = 0.0
+        self._io_wait = 0.0
+        self._io_time = 0.0
+        self._thread = threading.Thread(target=self._run, name='nacha-pipe')
+        self._thread.daemon = True
+        self._thread.start()
+
+    @property
+    def stats(self):
+        return Stats(
+            chunks=self._counts[0],
+            bytes=self._counts[1],
+            producer_wait=self._producer_wait,
+            io_wait=self._io_wait,
+            io_time=self._io_time,
+        )
+
+    def write(self, data):
+        if self.closed:
+            raise ValueError('I/O operation on closed pipe')
+        self._raise()
+        self._buffer.append(data)
+        self._size += len(data)
+        if self._size >= self.chunk_size:
+            self._put(b''.join(self._buffer))
+            self._buffer, self._size = [], 0
+
+    def flush(self):
+        """
+        Blocks until everything written so far has been written to `fo`.
+        """
+        if self.closed:
+            return
+        if self._buffer:
+            self._put(b''.join(self._buffer))
+            self._buffer, self._size = [], 0
+        self._chunks.join()
+        self._raise()
+        self.fo.flush()
+
+    def close(self):
+        """
+        Flushes and stops the I/O thread, `fo` is left open.
+        """
+        if self.closed:
+            self._raise()
+            return
+        try:
+            self.flush()
+        finally:
+            self.closed = True
+            self._chunks.put(None)
+            self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        if type is None:
+            self.close()
+            return
+        # NOTE: do not mask the original exception
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    # internals
+
+    def _put(self, chunk):
+        try:
+            self._chunks.put_nowait(chunk)
+        except queue.Full:
+            started_at = time.time()
+            self._chunks.put(chunk)
+            self._producer_wait += time.time() - started_at
+
+    def _raise(self):
+        if self.error is not None:
+            raise self.error
+
+    def _run(self):
+        while True:
+            try:
+                chunk = self._chunks.get_nowait()
+            except queue.Empty:
+                started_at = time.time()
+                chunk = self._chunks.get()
+                self._io_wait += time.time() - started_at
+            try:
+                if chunk is None:
+                    break
+                if self.error is not None:
+                    continue
+                started_at = time.time()
+                try:
+                    self.fo.write(chunk)
+                except Exception as ex:
+                    self.error = ex
+                    continue
+                finally:
+                    self._io_time += time.time() - started_at
+                self._counts[0] += 1
+                self._counts[1] += len(chunk)
+            finally:
+                self._chunks.task_done()
+
+
+class PipelinedWriter(Writer):
+
+    def __init__(self, fo, depth=8, chunk_size=64 * 1024, **kwargs):
+        """
+        :param fo: Binary file-like object written to by the I/O thread.
+        :param depth: Maximum number of chunks queued for the I/O thread.
+        :param chunk_size: Bytes gathered before a chunk is queued.
+        """
+        super(PipelinedWriter, self).__init__(
+            Pipe(fo, depth=depth, chunk_size=chunk_size), **kwargs
+        )
+
+    @property
+    def stats(self):
+        return self.fo.stats
+
+    def end_file(self, ex=None):
+        try:
+            super(PipelinedWriter, self).end_file(ex)
+        except Exception:
+            self._stop()
+            raise
+        if ex is None:
+            self.fo.close()
+        else:
+            self._stop()
+
+    def close(self):
+        self.fo.close()
+
+    # internals
+
+    def _stop(self):
+        # NOTE: do not mask the original exception
+        try:
+            self.fo.close()
+        except Exception:
+            pass
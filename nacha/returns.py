@@ -0,0 +1,148 @@
+"""
+Matches returned and notification of change (NOC) entries back to the entries
+we originated:
+
+.. code:: python
+
+    import nacha.returns
+
+    index = nacha.returns.Index()
+    index.add('/var/ach/originated/2013-01-16.ach')
+    index.add('/var/ach/originated/2013-01-17.ach')
+
+    with open('/var/ach/returns/2013-01-18.ach', 'rb') as fo:
+        for original, returned, reason_code in index.match(nacha.Reader(fo)):
+            ...
+
+The index only holds the location of each originated entry keyed by its
+`trace_number` so it stays small, and the originated entry is re-read when
+matched. Matching a return file is then a single pass over it.
+
+"""
+__all__ = [
+    'Index',
+    'Match',
+]
+
+import collections
+
+from . import EntryDetail, Entry, Reader
+from .compat import itervalues, to_bytes
+
+
+Match = collections.namedtuple('Match', ['original', 'returned', 'reason_code'])
+
+
+class Index(object):
+
+    #: Locations pack a file's number into their low 16 bits.
+    max_files = 1 << 16
+
+    def __init__(self):
+        self.paths = []
+        self.locations = {}
+        self._fos = {}
+
+    def add(self, path):
+        """
+        Indexes entries originated in the NACHA file at `path`.
+        """
+        file_no = len(self.paths)
+        if file_no >= self.max_files:
+            raise ValueError(
+                'Cannot index more than {0} files'.format(self.max_files)
+            )
+        self.paths.append(path)
+        entry_detail = to_bytes(EntryDetail.record_type.value)
+        trace_number = EntryDetail.trace_number
+        with open(path, 'rb') as fo:
+            offset = 0
+            for line in iter(fo.readline, b''):
+                if line[:1] == entry_detail:
+                    key = trace_number.unpack(line[trace_number.offset:])
+                    location = (offset << 16) | file_no
+                    existing = self.locations.get(key)
+                    if existing is None:
+                        self.locations[key] = location
+                    elif isinstance(existing, list):
+                        existing.append(location)
+                    else:
+                        # NOTE: trace numbers can repeat across batches
+                        self.locations[key] = [existing, location]
+                offset += len(line)
+
+    def __len__(self):
+        return len(self.locations)
+
+    def __contains__(self, trace_number):
+        return trace_number in self.locations
+
+    def lookup(self, trace_number, receiving_dfi_trn=None):
+        """
+        Loads the originated `Entry` for `trace_number`, if any. If given,
+        `receiving_dfi_trn` must match too and picks between entries sharing
+        the trace number, which are otherwise ambiguous and not matched.
+        """
+        locations = self.locations.get(trace_number)
+        if locations is None:
+            return None
+        if not isinstance(locations, list):
+            locations = [locations]
+        elif receiving_dfi_trn is None:
+            return None
+        for location in locations:
+            entry = self._load(location)
+            if (receiving_dfi_trn is None or
+                entry.detail.receiving_dfi_trn == receiving_dfi_trn):
+                return entry
+        return None
+
+    def match(self, reader):
+        """
+        Iterates `Match`es for returned and NOC entries read by `reader`.
+        Entries that cannot be matched have an `original` of None.
+        """
+        reader.file_header()
+        for _ in reader.company_batches():
+            for entry in reader.entries():
+                addendum = entry.return_addendum
+                if addendum is not None:
+                    reason_code = addendum.return_reason_code
+                else:
+                    addendum = entry.change_addendum
+                    if addendum is None:
+                        continue
+                    reason_code = addendum.change_code
+                original = self.lookup(
+                    addendum.original_entry_trace_number,
+                    addendum.original_receiving_dfi_id,
+                )
+                yield Match(
+                    original=original, returned=entry, reason_code=reason_code,
+                )
+            reader.company_batch_control()
+        reader.file_control()
+
+    def close(self):
+        for fo in itervalues(self._fos):
+            fo.close()
+        self._fos.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
+
+    # internals
+
+    def _load(self, location):
+        offset, file_no = location >> 16, location & 0xffff
+        fo = self._fos.get(file_no)
+        if fo is None:
+            fo = self._fos[file_no] = open(self.paths[file_no], 'rb')
+        fo.seek(offset)
+        reader = Reader(fo)
+        detail = reader.entry_detail()
+        addenda = reader.entry_addenda()
+        return Entry(detail=detail, addenda=addenda)
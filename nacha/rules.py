@@ -0,0 +1,444 @@
+"""
+Cross-field and standard entry class (SEC) specific rules that records alone
+do not check:
+
+.. code:: python
+
+    import nacha.rules
+
+    rules = nacha.rules.standard()
+    with open('payouts.ach', 'rb') as fo:
+        for violation in rules.check(nacha.Reader(fo)):
+            print(violation.offset, violation.kind, violation.name, violation.value)
+
+Rules are declared on `Rules` and each applies to entries in batches of a
+`standard_entry_class`, a `service_class_code`, both or all batches:
+
+.. code:: python
+
+    rules = (
+        nacha.rules.Rules()
+        .transaction_codes(
+            nacha.rules.DEBIT_CODES,
+            service_class_code=nacha.ServiceClassCodes.DEBITS,
+        )
+        .require(['individual_id'], standard_entry_class='ARC')
+        .allow('discretionary_data', ['R', 'S'], standard_entry_class='WEB')
+        .max_amount(250000, standard_entry_class='RCK')
+        .max_addenda(1)
+    )
+
+An amount or addenda limit declared for a `standard_entry_class` or
+`service_class_code` overrides one declared for all batches, e.g. CTX entries
+above may have up to 9999 addenda while others may have only 1:
+
+.. code:: python
+
+    rules.max_addenda(9999, standard_entry_class='CTX')
+
+The rules for each distinct batch header are compiled once into a flat `Plan`
+(allowed transaction codes, amount limits, required and restricted fields) and
+entries are then checked against it as raw lines, without loading records, so
+every violation in a file is reported in one pass. Entries that have not been
+written yet, as a dict of equal length columns keyed by `Writer.entry`
+arguments (see `nacha.bulk`), are checked a column at a time by
+`check_columns`.
+
+"""
+__all__ = [
+    'Rule',
+    'Plan',
+    'Violation',
+    'Rules',
+    'standard',
+]
+
+import collections
+
+from . import (
+    CompanyBatchHeader,
+    EntryDetail,
+    EntryDetailAddendum,
+    CompanyBatchControl,
+    ServiceClassCodes,
+    StandardEntryClasses,
+    TransactionCodes,
+    _slice,
+)
+from .compat import string_types, to_bytes
+
+
+REQUIRED = 'required'
+
+ALLOWED = 'allowed'
+
+TRANSACTION_CODE = 'transaction_code'
+
+ZERO_AMOUNT = 'zero_amount'
+
+MAX_AMOUNT = 'max_amount'
+
+MAX_ADDENDA = 'max_addenda'
+
+
+CREDIT_CODES = frozenset(
+    code for code in TransactionCodes.values() if code % 10 in (1, 2, 3)
+)
+
+DEBIT_CODES = frozenset(
+    code for code in TransactionCodes.values() if code % 10 in (6, 7, 8)
+)
+
+PRENOTE_CODES = frozenset(
+    code for code in TransactionCodes.values() if code % 10 in (3, 8)
+)
+
+
+Rule = collections.namedtuple('Rule', [
+    'kind', 'name', 'value', 'standard_entry_class', 'service_class_code',
+])
+
+Plan = collections.namedtuple('Plan', [
+    'transaction_codes',
+    'zero_amount',
+    'max_amount',
+    'max_addenda',
+    'required',
+    'allowed',
+])
+
+Violation = collections.namedtuple('Violation', [
+    'kind', 'offset', 'batch_number', 'name', 'value',
+])
+
+
+class Rules(object):
+
+    def __init__(self, rules=None):
+        """
+        :param rules: Optional `Rule`s to start with.
+        """
+        self.rules = list(rules or [])
+        self._plans = {}
+
+    def require(self, names, **kwargs):
+        """
+        Entries must have a non-blank value for each of `names`.
+        """
+        for name in names:
+            self._add(REQUIRED, name, None, **kwargs)
+        return self
+
+    def allow(self, name, values, **kwargs):
+        """
+        Entries must have one of `values` for `name`.
+        """
+        return self._add(
+            ALLOWED, name, frozenset(_normalize(value) for value in values),
+            **kwargs
+        )
+
+    def transaction_codes(self, codes, **kwargs):
+        """
+        Entries must have one of these transaction `codes`.
+        """
+        return self._add(
+            TRANSACTION_CODE, 'transaction_code', frozenset(codes), **kwargs
+        )
+
+    def zero_amount(self, codes, **kwargs):
+        """
+        Entries with one of these transaction `codes`, e.g. prenotes, must
+        have an amount of 0.
+        """
+        return self._add(ZERO_AMOUNT, 'amount', frozenset(codes), **kwargs)
+
+    def max_amount(self, amount, **kwargs):
+        """
+        Entries must have an amount of at most `amount` cents.
+        """
+        return self._add(MAX_AMOUNT, 'amount', amount, **kwargs)
+
+    def max_addenda(self, count, **kwargs):
+        """
+        Entries must have at most `count` addenda.
+        """
+        return self._add(MAX_ADDENDA, 'addenda', count, **kwargs)
+
+    def plan(self, standard_entry_class, service_class_code):
+        """
+        `Plan` compiled from rules that apply to entries in batches with this
+        `standard_entry_class` and `service_class_code`.
+        """
+        key = _normalize(standard_entry_class), int(service_class_code)
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = self._plans[key] = self._compile(*key)
+        return plan
+
+    def check(self, reader):
+        """
+        Yields a `Violation` for every broken rule in the entries read by
+        `reader`, `offset` being the line number of the entry.
+        """
+        plan, batch_number, entry_line_no, addenda = None, None, None, 0
+        for line, line_no in reader.lines():
+            record_type = line[:1]
+            if record_type == _addendum:
+                addenda += 1
+                continue
+            if entry_line_no is not None:
+                if plan.max_addenda is not None and addenda > plan.max_addenda:
+                    yield Violation(
+                        MAX_ADDENDA, entry_line_no, batch_number, 'addenda', addenda,
+                    )
+                entry_line_no = None
+            if record_type == _entry_detail:
+                if plan is None:
+                    reader.malformed(line_no, 'unexpected entry detail')
+                entry_line_no, addenda = line_no, 0
+                try:
+                    code = int(line[_transaction_code])
+                    amount = int(line[_amount])
+                except ValueError as ex:
+                    reader.malformed(line_no, str(ex))
+                if (plan.transaction_codes is not None and
+                    code not in plan.transaction_codes):
+                    yield Violation(
+                        TRANSACTION_CODE, line_no, batch_number,
+                        'transaction_code', code,
+                    )
+                if amount and code in plan.zero_amount:
+                    yield Violation(
+                        ZERO_AMOUNT, line_no, batch_number, 'amount', amount,
+                    )
+                if plan.max_amount is not None and amount > plan.max_amount:
+                    yield Violation(
+                        MAX_AMOUNT, line_no, batch_number, 'amount', amount,
+                    )
+                for name in plan.required:
+                    if not line[_slices[name]].strip():
+                        yield Violation(
+                            REQUIRED, line_no, batch_number, name, b'',
+                        )
+                for name, values in plan.allowed:
+                    value = line[_slices[name]].strip()
+                    if value not in values:
+                        yield Violation(
+                            ALLOWED, line_no, batch_number, name, value,
+                        )
+            elif record_type == _batch_header:
+                try:
+                    plan = self.plan(
+                        line[_standard_entry_class].strip(),
+                        int(line[_service_class_code]),
+                    )
+                    batch_number = int(line[_batch_number])
+                except ValueError as ex:
+                    reader.malformed(line_no, str(ex))
+            elif record_type == _batch_control:
+                plan, batch_number = None, None
+        if (entry_line_no is not None and
+            plan.max_addenda is not None and
+            addenda > plan.max_addenda):
+            yield Violation(
+                MAX_ADDENDA, entry_line_no, batch_number, 'addenda', addenda,
+            )
+
+    def check_columns(self, columns, standard_entry_class, service_class_code):
+        """
+        `Violation`s for entries given as a dict of equal length sequences
+        keyed by `Writer.entry` arguments, `offset` being the index of the
+        entry.
+        """
+        plan = self.plan(standard_entry_class, service_class_code)
+        count = len(columns['transaction_code'])
+        codes = [int(code) for code in columns['transaction_code']]
+        violations = []
+        if plan.transaction_codes is not None:
+            violations.extend(
+                Violation(TRANSACTION_CODE, i, None, 'transaction_code', code)
+                for i, code in enumerate(codes)
+                if code not in plan.transaction_codes
+            )
+        if plan.zero_amount or plan.max_amount is not None:
+            amounts = [int(amount) for amount in columns['amount']]
+            if plan.zero_amount:
+                violations.extend(
+                    Violation(ZERO_AMOUNT, i, None, 'amount', amount)
+                    for i, (code, amount) in enumerate(zip(codes, amounts))
+                    if amount and code in plan.zero_amount
+                )
+            if plan.max_amount is not None:
+                violations.extend(
+                    Violation(MAX_AMOUNT, i, None, 'amount', amount)
+                    for i, amount in enumerate(amounts)
+                    if amount > plan.max_amount
+                )
+        for name in plan.required:
+            violations.extend(
+                Violation(REQUIRED, i, None, name, value)
+                for i, value in enumerate(columns.get(name) or [None] * count)
+                if not _normalize(value)
+            )
+        for name, values in plan.allowed:
+            violations.extend(
+                Violation(ALLOWED, i, None, name, value)
+                for i, value in enumerate(columns.get(name) or [None] * count)
+                if _normalize(value) not in values
+            )
+        if plan.max_addenda is not None and columns.get('addenda'):
+            violations.extend(
+                Violation(MAX_ADDENDA, i, None, 'addenda', len(addenda))
+                for i, addenda in enumerate(
+                    [addenda] if isinstance(addenda, string_types) else (addenda or [])
+                    for addenda in columns['addenda']
+                )
+                if len(addenda) > plan.max_addenda
+            )
+        violations.sort(key=lambda violation: violation.offset)
+        return violations
+
+    # internals
+
+    def _add(self, kind, name, value,
+             standard_entry_class=None,
+             service_class_code=None,
+        ):
+        if name != 'addenda' and name not in _slices:
+            raise ValueError('Unknown EntryDetail field {0}'.format(name))
+        self.rules.append(Rule(
+            kind=kind,
+            name=name,
+            value=value,
+            standard_entry_class=(
+                None if standard_entry_class is None else
+                _normalize(standard_entry_class)
+            ),
+            service_class_code=(
+                None if service_class_code is None else int(service_class_code)
+            ),
+        ))
+        self._plans.clear()
+        return self
+
+    def _compile(self, standard_entry_class, service_class_code):
+        transaction_codes, zero_amount = None, set()
+        max_amount, max_addenda = None, None
+        required, allowed = [], []
+        for rule in self.rules:
+            if (rule.standard_entry_class not in (None, standard_entry_class) or
+                rule.service_class_code not in (None, service_class_code)):
+                continue
+            if rule.kind == TRANSACTION_CODE:
+                transaction_codes = (
+                    rule.value if transaction_codes is None else
+                    transaction_codes & rule.value
+                )
+            elif rule.kind == ZERO_AMOUNT:
+                zero_amount |= rule.value
+            elif rule.kind == MAX_AMOUNT:
+                max_amount = _limit(max_amount, rule)
+            elif rule.kind == MAX_ADDENDA:
+                max_addenda = _limit(max_addenda, rule)
+            elif rule.kind == REQUIRED:
+                if rule.name not in required:
+                    required.append(rule.name)
+            elif rule.kind == ALLOWED:
+                allowed.append((rule.name, rule.value))
+        return Plan(
+            transaction_codes=transaction_codes,
+            zero_amount=frozenset(zero_amount),
+            max_amount=None if max_amount is None else max_amount[1],
+            max_addenda=None if max_addenda is None else max_addenda[1],
+            required=required,
+            allowed=allowed,
+        )
+
+
+def standard():
+    """
+    `Rules` from the NACHA operating rules for the SEC codes we originate.
+    """
+    secs = StandardEntryClasses
+    rules = (
+        Rules()
+        # service class
+        .transaction_codes(
+            CREDIT_CODES, service_class_code=ServiceClassCodes.CREDITS,
+        )
+        .transaction_codes(
+            DEBIT_CODES, service_class_code=ServiceClassCodes.DEBITS,
+        )
+        # prenotes carry no money
+        .zero_amount(PRENOTE_CODES)
+        # addenda
+        .max_addenda(1)
+        .max_addenda(9999, standard_entry_class=secs.CTX)
+    )
+    for sec in [secs.PPD, secs.CCD, secs.CTX, secs.WEB, secs.TEL]:
+        rules.require(['individual_name'], standard_entry_class=sec)
+    # NOTE: payment type code, recurring or single
+    rules.allow('discretionary_data', ['R', 'S'], standard_entry_class=secs.WEB)
+    rules.allow('discretionary_data', ['R', 'S', ''], standard_entry_class=secs.TEL)
+    # check conversions are debits carrying the check serial number, no addenda
+    for sec, max_amount in [
+            (secs.ARC, 2500000),
+            (secs.POP, 2500000),
+            (secs.RCK, 250000),
+        ]:
+        rules.transaction_codes(DEBIT_CODES, standard_entry_class=sec)
+        rules.require(['individual_id'], standard_entry_class=sec)
+        rules.max_amount(max_amount, standard_entry_class=sec)
+        rules.max_addenda(0, standard_entry_class=sec)
+    rules.max_addenda(0, standard_entry_class=secs.TEL)
+    return rules
+
+
+# internals
+
+def _normalize(value):
+    if value is None:
+        return b''
+    if not isinstance(value, string_types):
+        value = str(value)
+    return to_bytes(value).strip().upper()
+
+
+def _limit(limit, rule):
+    # NOTE: limit is (scope, value), a more specific scope overrides and the
+    # same scope takes the strictest value
+    scope = (
+        (rule.standard_entry_class is not None) +
+        (rule.service_class_code is not None)
+    )
+    if limit is None or scope > limit[0]:
+        return scope, rule.value
+    if scope == limit[0]:
+        return scope, min(limit[1], rule.value)
+    return limit
+
+
+_slices = dict(
+    (field.name, _slice(field))
+    for field in EntryDetail.fields
+    if field._constant is None
+)
+
+_batch_header = to_bytes(CompanyBatchHeader.record_type.value)
+
+_entry_detail = to_bytes(EntryDetail.record_type.value)
+
+_addendum = to_bytes(EntryDetailAddendum.record_type.value)
+
+_batch_control = to_bytes(CompanyBatchControl.record_type.value)
+
+_transaction_code = _slice(EntryDetail.transaction_code)
+
+_amount = _slice(EntryDetail.amount)
+
+_standard_entry_class = _slice(CompanyBatchHeader.standard_entry_class)
+
+_service_class_code = _slice(CompanyBatchHeader.service_class_code)
+
+_batch_number = _slice(CompanyBatchHeader.batch_number)
@@ -0,0 +1,189 @@
+"""
+Writes the entries of each company batch sorted rather than in call order,
+e.g. by receiving routing number then amount as some ODFIs prefer:
+
+.. code:: python
+
+    import nacha.sort
+
+    writer = nacha.sort.SortingWriter(fo, keys=['receiving_dfi_trn', 'amount'])
+    with writer.begin_file(...):
+        with writer.begin_company_batch(...):
+            for payout in payouts:
+                writer.entry(...)
+
+Entries are validated as they are added but only written, sorted by the
+`EntryDetail` fields named by `keys`, when their company batch ends. Ties keep
+call order. Each entry is held as its raw 94 byte records and once `run_size`
+of them are buffered they are sorted and spilled as a run to a file in
+`directory`. The runs are then merged when the batch ends, so memory use is
+bounded by `run_size` rather than by batch size.
+
+Entries given without a `trace_number` are assigned one as they are written,
+so trace numbers ascend in sorted order. Until then the `EntryDetail` returned
+by `entry` has a `trace_number` of 0.
+
+"""
+__all__ = [
+    'SortingWriter',
+]
+
+import heapq
+import operator
+import os
+import shutil
+import tempfile
+
+from . import (
+    EntryDetail,
+    EntryDetailAddendum,
+    Writer,
+    _no_trace_number,
+    _slice,
+    _trace_number,
+    _with_trace_number,
+)
+from .compat import range, to_bytes
+
+
+class SortingWriter(Writer):
+
+    #: Number of entries sorted in memory before spilling a run to disk.
+    run_size = 100000
+
+    #: `EntryDetail` fields by which entries are sorted.
+    keys = ['receiving_dfi_trn', 'receiving_dfi_trn_check_digit', 'amount']
+
+    def __init__(self, fo, keys=None, run_size=None, directory=None, **kwargs):
+        """
+        :param fo: Binary file-like object written to.
+        :param keys: Overrides `SortingWriter.keys`.
+        :param run_size: Overrides `SortingWriter.run_size`.
+        :param directory: Where runs are spilled, the system's by default.
+        """
+        super(SortingWriter, self).__init__(fo, **kwargs)
+        if keys is not None:
+            self.keys = keys
+        if run_size is not None:
+            self.run_size = run_size
+        self.directory = directory
+        self._key = _key(self.entry_detail_cls, self.keys)
+        self._run = []
+        self._runs = []
+        self._runs_directory = None
+        self._pending = None
+
+    def write(self, record):
+        if self._pending is None:
+            return super(SortingWriter, self).write(record)
+        self._pending.append(record.dump())
+
+    def end_entry(self, ex=None):
+        self._pending = []
+        try:
+            super(SortingWriter, self).end_entry(ex)
+            if ex is None:
+                self._run.append(b''.join(self._pending))
+                if len(self._run) >= self.run_size:
+                    self._spill()
+        finally:
+            self._pending = None
+
+    def end_company_batch(self, ex=None):
+        try:
+            if ex is None:
+                self._write_entries()
+        except Exception as error:
+            super(SortingWriter, self).end_company_batch(error)
+            raise
+        finally:
+            self._discard()
+        super(SortingWriter, self).end_company_batch(ex)
+
+    # internals
+
+    def _trace_number(self):
+        # NOTE: assigned by _write_entries once sorted
+        return 0
+
+    def _spill(self):
+        self._run.sort(key=self._key)
+        if self._runs_directory is None:
+            self._runs_directory = tempfile.mkdtemp(dir=self.directory)
+        path = os.path.join(
+            self._runs_directory, '{0:0>6}'.format(len(self._runs)),
+        )
+        with open(path, 'wb') as fo:
+            fo.writelines(self._run)
+        self._runs.append(path)
+        self._run = []
+
+    def _sorted(self):
+        self._run.sort(key=self._key)
+        if not self._runs:
+            return iter(self._run)
+        # NOTE: run index breaks ties so merging is stable
+        runs = [
+            _keyed(self._key, i, _read_run(path))
+            for i, path in enumerate(self._runs)
+        ]
+        runs.append(_keyed(self._key, len(runs), self._run))
+        return (item for _, _, item in heapq.merge(*runs))
+
+    def _write_entries(self):
+        for item in self._sorted():
+            lines = [
+                item[offset:offset + _length]
+                for offset in range(0, len(item), _length)
+            ]
+            if lines[0][_trace_number] == _no_trace_number:
+                lines = _with_trace_number(
+                    lines, super(SortingWriter, self)._trace_number(),
+                )
+            for line in lines:
+                self.fo.write(line + self.RECORD_TERMINAL)
+
+    def _discard(self):
+        self._run = []
+        self._runs = []
+        if self._runs_directory is not None:
+            shutil.rmtree(self._runs_directory, ignore_errors=True)
+            self._runs_directory = None
+
+
+def _key(record_type, names):
+    # NOTE: numeric fields are zero padded so raw bytes sort as values do
+    slices = []
+    for name in names:
+        field = getattr(record_type, name, None)
+        if field not in record_type.fields:
+            raise ValueError(
+                'Unknown {0} field {1}'.format(record_type.__name__, name)
+            )
+        slices.append(_slice(field))
+    return operator.itemgetter(*slices)
+
+
+def _keyed(key, i, items):
+    for item in items:
+        yield key(item), i, item
+
+
+def _read_run(path):
+    with open(path, 'rb') as fo:
+        item = []
+        while True:
+            line = fo.read(_length)
+            if not line:
+                break
+            if line[:1] != _addendum and item:
+                yield b''.join(item)
+                item = []
+            item.append(line)
+        if item:
+            yield b''.join(item)
+
+
+_length = EntryDetail.length
+
+_addendum = to_bytes(EntryDetailAddendum.record_type.value)
@@ -0,0 +1,234 @@
+"""
+Writes company batches produced concurrently, e.g. by worker threads each
+paying out for a different company:
+
+.. code:: python
+
+    import nacha.staging
+
+    writer = nacha.staging.StagingWriter(fo)
+    with writer.begin_file(...):
+
+        def produce(company):
+            with writer.batch(...) as batch:
+                for payout in company.payouts:
+                    batch.entry(...)
+
+        threads = [threading.Thread(target=produce, args=(company,)) for ...]
+        ...
+
+Each `Batch` handle stages its entries, already validated and dumped, behind
+its own lock, so producers adding to different batches never wait on each
+other. Closing a batch commits it to the file once every batch opened before
+it has been closed too, so batches appear in the order they were opened
+whatever order they are closed in. `batch_number`, trace numbers for entries
+given without one and `FileControl` totals are assigned as batches are
+committed, so the file is the same however producers were scheduled. A batch
+closed by an exception is discarded.
+
+A batch's entries are held in memory until it is committed.
+
+"""
+__all__ = [
+    'Batch',
+    'StagingWriter',
+]
+
+import collections
+import threading
+
+from . import (
+    CompanyBatchHeader,
+    CompanyBatchControl,
+    Writer,
+    _no_trace_number,
+    _trace_number,
+    _with_trace_number,
+)
+from .compat import string_types
+
+
+class Batch(object):
+
+    def __init__(self, writer, header):
+        self.writer = writer
+        self.header = header
+        self.closed = False
+        self.discarded = False
+        self.entries = []
+        self.missing_trace_numbers = 0
+        self.entry_addenda_count = 0
+        self.entry_hash = 0
+        self.debit_amount = 0
+        self.credit_amount = 0
+        self._lock = threading.Lock()
+
+    def entry(self,
+              transaction_code,
+              receiving_dfi_routing_number,
+              receiving_dfi_account_number,
+              amount,
+              individual_id,
+              individual_name,
+              trace_number=None,
+              discretionary_data=None,
+              addenda=None,
+        ):
+        """
+        Stages an entry, arguments are those of `Writer.entry`. Returns its
+        `EntryDetail` whose `trace_number` is 0 until committed if not given.
+        """
+        addenda = [
+            addendum if isinstance(addendum, string_types) else
+            addendum['payment_related_information']
+            for addendum in addenda or []
+        ]
+        detail = self.writer._new_entry_detail(
+            transaction_code=transaction_code,
+            receiving_dfi_routing_number=receiving_dfi_routing_number,
+            receiving_dfi_account_number=receiving_dfi_account_number,
+            amount=amount,
+            individual_id=individual_id,
+            individual_name=individual_name,
+            trace_number=trace_number or 0,
+            discretionary_data=discretionary_data,
+            addenda_record_indicator=1 if addenda else 0,
+        )
+        lines = [detail.dump()]
+        for i, payment_related_information in enumerate(addenda):
+            lines.append(self.writer.entry_addendum_cls(
+                payment_related_information=payment_related_information,
+                addenda_sequence_number=i + 1,
+                entry_detail_sequence_number=detail.trace_number % 10 ** 7,
+            ).dump())
+        with self._lock:
+            if self.closed:
+                raise Exception('Batch closed')
+            self.entries.append(lines)
+            if not detail.trace_number:
+                self.missing_trace_numbers += 1
+            self.entry_addenda_count += len(lines)
+            self.entry_hash = (
+                self.entry_hash + detail.receiving_dfi_trn
+            ) % Writer.HASH_MOD
+            if detail.is_debit:
+                self.debit_amount += detail.amount
+            elif detail.is_credit:
+                self.credit_amount += detail.amount
+        return detail
+
+    def close(self, ex=None):
+        """
+        Closes this batch, discarding it if `ex` is given.
+        """
+        with self._lock:
+            if self.closed:
+                raise Exception('Batch closed')
+            self.closed = True
+            self.discarded = ex is not None
+        self.writer._commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close(value)
+
+
+class StagingWriter(Writer):
+
+    batch_cls = Batch
+
+    def __init__(self, fo, **kwargs):
+        super(StagingWriter, self).__init__(fo, **kwargs)
+        self._batches = collections.deque()
+        self._lock = threading.Lock()
+
+    def batch(self,
+              service_class_code,
+              company_name,
+              company_id,
+              standard_entry_class,
+              company_entry_description,
+              originating_dfi_id,
+              effective_entry_date=None,
+              company_descriptive_date=None,
+              company_discretionary_data=None,
+        ):
+        """
+        Opens a `Batch`, arguments are those of `Writer.begin_company_batch`.
+        Safe to call from any thread.
+        """
+        if not self.in_file_context():
+            raise Exception('Not in file context')
+        header = CompanyBatchHeader(
+            service_class_code=service_class_code,
+            company_name=company_name,
+            company_id=company_id,
+            standard_entry_class=standard_entry_class,
+            company_entry_description=company_entry_description,
+            originating_dfi_id=originating_dfi_id,
+            effective_entry_date=effective_entry_date or self._default_at.date(),
+            company_descriptive_date=company_descriptive_date,
+            company_discretionary_data=company_discretionary_data,
+            batch_number=0,
+        )
+        batch = self.batch_cls(self, header)
+        with self._lock:
+            self._batches.append(batch)
+        return batch
+
+    def end_file(self, ex=None):
+        if ex is None:
+            with self._lock:
+                pending = len(self._batches)
+            if pending:
+                ex = Exception('{0} batches not closed'.format(pending))
+                super(StagingWriter, self).end_file(ex)
+                raise ex
+        super(StagingWriter, self).end_file(ex)
+
+    # internals
+
+    def _commit(self):
+        with self._lock:
+            while self._batches and self._batches[0].closed:
+                batch = self._batches.popleft()
+                if not batch.discarded:
+                    self._write_batch(batch)
+
+    def _write_batch(self, batch):
+        header = batch.header
+        header.batch_number = next(self._batch_numbers)
+        self.write(header)
+        trace_numbers = iter(self.trace_numbers.allocate(
+            header.originating_dfi_id,
+            self.created_at.date(),
+            batch.missing_trace_numbers,
+        ) if batch.missing_trace_numbers else [])
+        for lines in batch.entries:
+            if lines[0][_trace_number] == _no_trace_number:
+                lines = _with_trace_number(lines, next(trace_numbers))
+            for line in lines:
+                self.fo.write(line + self.RECORD_TERMINAL)
+        self.write(CompanyBatchControl(
+            service_class_code=header.service_class_code,
+            entry_addenda_count=batch.entry_addenda_count,
+            entry_hash=batch.entry_hash,
+            total_batch_debit_entry_amount=batch.debit_amount,
+            total_batch_credit_entry_amount=batch.credit_amount,
+            company_id=header.company_id,
+            originating_dfi_id=header.originating_dfi_id,
+            batch_number=header.batch_number,
+        ))
+        batch.entries = []
+
+        # file control
+        self.file_control.batch_count += 1
+        self.file_control.entry_addenda_record_count += batch.entry_addenda_count
+        self.file_control.entry_hash_total = (
+            self.file_control.entry_hash_total + batch.entry_hash
+        ) % self.HASH_MOD
+        self.file_control.total_file_debit_entry_amount += batch.debit_amount
+        self.file_control.total_file_credit_entry_amount += batch.credit_amount
+
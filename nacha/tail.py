@@ -0,0 +1,255 @@
+"""
+Reads NACHA files that are still arriving and resumes reading after a restart:
+
+.. code:: python
+
+    import nacha.tail
+
+    checkpoint = None
+    if os.path.exists('inbound.ach.checkpoint'):
+        with open('inbound.ach.checkpoint', 'r') as fo:
+            checkpoint = nacha.tail.Checkpoint.loads(fo.read())
+
+    with open('inbound.ach', 'rb') as fo:
+        reader = nacha.tail.TailReader(
+            fo, checkpoint=checkpoint, follow=True, timeout=60 * 60,
+        )
+        for record in reader:
+            ...
+            with open('inbound.ach.checkpoint', 'w') as cp:
+                cp.write(reader.checkpoint().dumps())
+
+A `Checkpoint` holds the byte offset and line number of the next unread
+record along with the raw file and company batch headers in effect and the
+running control totals, so resuming seeks straight to the next record rather
+than re-reading what came before. A record only counts towards the checkpoint
+once it has been loaded, so a malformed line raises `Malformed` and is read
+again on resume, unless reading leniently with `errors` in which case it is
+skipped like any other reader would.
+
+When following, an incomplete last line or the end of the file waits for more
+bytes, polling every `poll` seconds, until the `FileControl` record has been
+read or `timeout` seconds pass without the file growing.
+
+"""
+__all__ = [
+    'Checkpoint',
+    'TailReader',
+]
+
+import collections
+import json
+import time
+
+from . import (
+    FileHeader,
+    CompanyBatchHeader,
+    EntryDetail,
+    CompanyBatchControl,
+    FileControl,
+    Reader,
+    Writer,
+)
+from .compat import to_bytes
+
+
+class Checkpoint(collections.namedtuple('Checkpoint', [
+        'offset',
+        'line_no',
+        'file_header_line',
+        'company_batch_header_line',
+        'batch_totals',
+        'file_totals',
+        'complete',
+    ])):
+    """
+    Where `TailReader` left off. `batch_totals` are `(entry_addenda_count,
+    entry_hash, debit_amount, credit_amount)` of the current company batch and
+    `file_totals` are `(batch_count, entry_addenda_count, entry_hash,
+    debit_amount, credit_amount)` of completed ones. `complete` is set once
+    the `FileControl` record has been read.
+    """
+
+    @property
+    def file_header(self):
+        if self.file_header_line is None:
+            return None
+        return FileHeader.load(self.file_header_line)
+
+    @property
+    def company_batch_header(self):
+        if self.company_batch_header_line is None:
+            return None
+        return CompanyBatchHeader.load(self.company_batch_header_line)
+
+    def dumps(self):
+        return json.dumps(self._asdict())
+
+    @classmethod
+    def loads(cls, raw):
+        values = json.loads(raw)
+        for name in ['file_header_line', 'company_batch_header_line']:
+            if values[name] is not None:
+                values[name] = to_bytes(values[name])
+        for name in ['batch_totals', 'file_totals']:
+            values[name] = tuple(values[name])
+        return cls(**values)
+
+
+class TailReader(Reader):
+
+    def __init__(self, fo, *args, **kwargs):
+        """
+        :param checkpoint:
+            `Checkpoint` at which to resume, `fo` is sought to its offset.
+        :param follow: Wait for `fo` to grow until the file is complete.
+        :param poll: Seconds between checks for growth.
+        :param timeout:
+            Seconds without growth after which to give up following, by
+            default never.
+        """
+        checkpoint = kwargs.pop('checkpoint', None)
+        self.follow = kwargs.pop('follow', False)
+        self.poll = kwargs.pop('poll', 1.0)
+        self.timeout = kwargs.pop('timeout', None)
+        super(TailReader, self).__init__(fo, *args, **kwargs)
+        self.complete = False
+        self._previous = None
+        if checkpoint is None:
+            try:
+                self.offset = fo.tell()
+            except (AttributeError, IOError):
+                self.offset = 0
+            self.file_header_line = None
+            self.company_batch_header_line = None
+            self.batch_totals = [0, 0, 0, 0]
+            self.file_totals = [0, 0, 0, 0, 0]
+        else:
+            fo.seek(checkpoint.offset)
+            self.offset = checkpoint.offset
+            self.line_no = checkpoint.line_no
+            self.file_header_line = checkpoint.file_header_line
+            self.company_batch_header_line = checkpoint.company_batch_header_line
+            self.batch_totals = list(checkpoint.batch_totals)
+            self.file_totals = list(checkpoint.file_totals)
+            self.complete = checkpoint.complete
+        # NOTE: number of the next line to be consumed, self.line_no is that
+        # of the next to be read
+        self.consumed_line_no = self.line_no
+
+    def checkpoint(self):
+        """
+        `Checkpoint` for the next record not yet consumed.
+        """
+        if self.retry and self.retry[1] < self.consumed_line_no:
+            # NOTE: line to be retried has been consumed but not returned
+            return self._previous
+        return self._checkpoint()
+
+    def wait(self):
+        time.sleep(self.poll)
+
+    def filter(self, *record_types):
+        # NOTE: every line is loaded so that checkpoints account for it
+        for record in self:
+            if isinstance(record, record_types):
+                yield record
+
+    # bryl.LineReader
+
+    def next_line(self):
+        if self.retry:
+            line, line_no = self.retry
+            self.retry = None
+            return line, line_no
+        line = self._readline()
+        if not line:
+            return None, self.line_no
+        line_no = self.line_no
+        self.line_no += 1
+        return line, line_no
+
+    def as_record(self, line, line_no):
+        try:
+            record = super(TailReader, self).as_record(line, line_no)
+        except self.error_types:
+            if self.errors is not None and line_no == self.consumed_line_no:
+                # NOTE: lenient reading skips it
+                self._advance(line)
+            raise
+        if line_no == self.consumed_line_no:
+            self._previous = self._checkpoint()
+            self._consume(line, record)
+            self._advance(line)
+        return record
+
+    # internals
+
+    def _checkpoint(self):
+        return Checkpoint(
+            offset=self.offset,
+            line_no=self.consumed_line_no,
+            file_header_line=self.file_header_line,
+            company_batch_header_line=self.company_batch_header_line,
+            batch_totals=tuple(self.batch_totals),
+            file_totals=tuple(self.file_totals),
+            complete=self.complete,
+        )
+
+    def _readline(self):
+        waited_at, size = None, None
+        while True:
+            if self.follow:
+                position = self.fo.tell()
+            line = self.fo.readline()
+            if not self.follow or self.complete:
+                return line
+            if line.endswith(b'\n') or (
+                    line[:1] == _file_control and
+                    len(line) >= FileControl.length):
+                return line
+            # NOTE: incomplete, rewind and wait for the rest
+            if line:
+                self.fo.seek(position)
+            now = time.time()
+            if len(line) != size:
+                waited_at, size = now, len(line)
+            elif self.timeout is not None and now - waited_at >= self.timeout:
+                return b''
+            self.wait()
+
+    def _advance(self, line):
+        self.offset += len(line)
+        self.consumed_line_no += 1
+
+    def _consume(self, line, record):
+        if isinstance(record, EntryDetail):
+            totals = self.batch_totals
+            totals[0] += 1
+            totals[1] = (totals[1] + record.receiving_dfi_trn) % Writer.HASH_MOD
+            if record.is_debit:
+                totals[2] += record.amount
+            elif record.is_credit:
+                totals[3] += record.amount
+        elif isinstance(record, CompanyBatchHeader):
+            self.company_batch_header_line = line.rstrip(b'\r\n')
+            self.batch_totals = [0, 0, 0, 0]
+        elif isinstance(record, CompanyBatchControl):
+            totals = self.file_totals
+            totals[0] += 1
+            totals[1] += self.batch_totals[0]
+            totals[2] = (totals[2] + self.batch_totals[1]) % Writer.HASH_MOD
+            totals[3] += self.batch_totals[2]
+            totals[4] += self.batch_totals[3]
+            self.company_batch_header_line = None
+            self.batch_totals = [0, 0, 0, 0]
+        elif isinstance(record, FileHeader):
+            self.file_header_line = line.rstrip(b'\r\n')
+        elif isinstance(record, FileControl):
+            self.complete = True
+        else:
+            # NOTE: addenda of any type
+            self.batch_totals[0] += 1
+
+
+_file_control = to_bytes(FileControl.record_type.value)
@@ -0,0 +1,204 @@
+"""
+Allocates trace numbers, an originating DFI's 8 digit id followed by a 7 digit
+sequence number that must be unique per originating DFI per day.
+
+By default a `Writer` numbers entries from its own in memory `MemorySequence`
+so trace numbers are unique across the batches of a file. To keep them unique
+across files and processes share a persistent sequence:
+
+.. code:: python
+
+    import nacha.trace
+
+    trace_numbers = nacha.trace.Allocator(
+        nacha.trace.SQLiteSequence('/var/ach/trace-numbers.db'),
+        block_size=1000,
+    )
+
+    with open('2013-01-16.ach', 'wb') as fo:
+        writer = nacha.Writer(fo, trace_numbers=trace_numbers)
+        ...
+
+The allocator reserves `block_size` sequence numbers at a time so writers only
+touch the shared sequence once per block rather than once per entry. Numbers
+left in a block when a process exits are skipped, not reused.
+
+"""
+__all__ = [
+    'MAX_SEQUENCE',
+    'Exhausted',
+    'trace_number',
+    'MemorySequence',
+    'SQLiteSequence',
+    'Allocator',
+]
+
+import itertools
+import os
+import threading
+
+from .compat import range
+
+
+#: Largest sequence number allowed per originating DFI per day.
+MAX_SEQUENCE = 10 ** 7 - 1
+
+
+class Exhausted(Exception):
+
+    pass
+
+
+def trace_number(originating_dfi_id, sequence):
+    return int(originating_dfi_id) * 10 ** 7 + sequence
+
+
+class MemorySequence(object):
+    """
+    Sequence local to this process.
+    """
+
+    def __init__(self):
+        self.next_sequences = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, originating_dfi_id, on, count):
+        """
+        Reserves up to `count` sequence numbers for `originating_dfi_id` on
+        date `on` and returns them as a `(start, stop)` range.
+        """
+        key = (int(originating_dfi_id), on)
+        with self._lock:
+            start = self.next_sequences.get(key, 1)
+            stop = _stop(originating_dfi_id, on, start, count)
+            self.next_sequences[key] = stop
+        return start, stop
+
+
+class SQLiteSequence(object):
+    """
+    Sequence persisted to a SQLite database at `path`, safe to share between
+    threads and processes.
+    """
+
+    def __init__(self, path, timeout=30):
+        self.path = path
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._pid = None
+        self._connection = None
+
+    def reserve(self, originating_dfi_id, on, count):
+        key = (int(originating_dfi_id), on.isoformat())
+        with self._lock:
+            connection = self._connect()
+            # NOTE: takes the write lock up front so readers cannot interleave
+            connection.execute('BEGIN IMMEDIATE')
+            try:
+                row = connection.execute(
+                    'SELECT next_sequence FROM trace_sequences '
+                    'WHERE originating_dfi_id = ? AND day = ?',
+                    key,
+                ).fetchone()
+                start = row[0] if row else 1
+                stop = _stop(originating_dfi_id, on, start, count)
+                connection.execute(
+                    'INSERT OR REPLACE INTO trace_sequences '
+                    '(originating_dfi_id, day, next_sequence) VALUES (?, ?, ?)',
+                    key + (stop,),
+                )
+            except Exception:
+                connection.execute('ROLLBACK')
+                raise
+            connection.execute('COMMIT')
+        return start, stop
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    # internals
+
+    def _connect(self):
+        # NOTE: connections must not be shared with forked children
+        if self._connection is None or self._pid != os.getpid():
+            # NOTE: imported here so importing nacha does not pay for it
+            import sqlite3
+
+            self._connection = sqlite3.connect(
+                self.path,
+                timeout=self.timeout,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS trace_sequences ('
+                'originating_dfi_id INTEGER NOT NULL, '
+                'day TEXT NOT NULL, '
+                'next_sequence INTEGER NOT NULL, '
+                'PRIMARY KEY (originating_dfi_id, day))'
+            )
+            self._pid = os.getpid()
+        return self._connection
+
+
+class Allocator(object):
+    """
+    Hands out trace numbers as integers from blocks of `block_size` reserved
+    from `sequence`, a `MemorySequence` by default.
+    """
+
+    def __init__(self, sequence=None, block_size=1000):
+        self.sequence = sequence if sequence is not None else MemorySequence()
+        self.block_size = block_size
+        self._blocks = {}
+        self._lock = threading.Lock()
+
+    def allocate(self, originating_dfi_id, on, count=1):
+        """
+        Allocates `count` trace numbers for `originating_dfi_id` on date `on`,
+        returned as a sequence of ints.
+        """
+        key = (int(originating_dfi_id), on)
+        with self._lock:
+            start, stop = self._blocks.get(key, (1, 1))
+            if stop - start >= count:
+                self._blocks[key] = (start + count, stop)
+                return range(
+                    trace_number(key[0], start), trace_number(key[0], start + count)
+                )
+            # NOTE: left over block is used first, then a fresh one
+            needed = count - (stop - start)
+            fresh, fresh_stop = self.sequence.reserve(
+                key[0], on, max(self.block_size, needed),
+            )
+            if fresh_stop - fresh < needed:
+                self._blocks[key] = (fresh, fresh_stop)
+                raise _exhausted(originating_dfi_id, on)
+            self._blocks[key] = (fresh + needed, fresh_stop)
+            numbers = range(
+                trace_number(key[0], fresh), trace_number(key[0], fresh + needed)
+            )
+            if stop == start:
+                return numbers
+            return list(itertools.chain(
+                range(trace_number(key[0], start), trace_number(key[0], stop)),
+                numbers,
+            ))
+
+
+# internals
+
+def _stop(originating_dfi_id, on, start, count):
+    if start > MAX_SEQUENCE:
+        raise _exhausted(originating_dfi_id, on)
+    return min(start + count, MAX_SEQUENCE + 1)
+
+
+def _exhausted(originating_dfi_id, on):
+    return Exhausted(
+        'Trace numbers for originating DFI {0} on {1} exhausted'
+        .format(originating_dfi_id, on)
+    )
@@ -0,0 +1,261 @@
+"""
+Rewrites fields of a NACHA file directly on its raw lines, e.g. to produce a
+redacted copy for support or a reversal of a file:
+
+.. code:: python
+
+    import nacha.transform
+
+    transform = nacha.transform.Transform().mask().redact_names()
+
+    with open('2013-01-16.ach', 'rb') as src, open('redacted.ach', 'wb') as dst:
+        transform.apply(src, dst)
+
+    # or in place
+    nacha.transform.Transform().reverse().apply_in_place('2013-01-16.ach')
+
+Fields sit at fixed offsets so each is replaced by slicing rather than parsing
+and dumping records. Lines are processed `chunk_size` bytes at a time when
+streaming, or through an ``mmap`` when rewriting in place, where only lines
+that change are written. If a transform touches fields that control records
+total (`transaction_code`, `amount`, `receiving_dfi_trn`) then batch and file
+control totals are recomputed as the file goes by, which works because control
+records follow the entries they total.
+
+"""
+__all__ = [
+    'Transform',
+]
+
+import mmap
+
+from . import (
+    CompanyBatchHeader,
+    EntryDetail,
+    EntryDetailAddendum,
+    CompanyBatchControl,
+    FileControl,
+    Writer,
+    _addenda_type,
+    _slice,
+)
+from .compat import to_bytes
+
+
+class Transform(object):
+
+    #: Bytes read per chunk by `apply`.
+    chunk_size = 1024 * 1024
+
+    #: `EntryDetail` fields whose changes require control totals be recomputed.
+    totaled_fields = ['transaction_code', 'amount', 'receiving_dfi_trn']
+
+    # NOTE: last digit of transaction_code, credits 1-4 and debits 6-9
+    reversed_codes = {1: 6, 2: 7, 3: 8, 4: 9, 6: 1, 7: 2, 8: 3, 9: 4}
+
+    reversed_service_class_codes = {220: 225, 225: 220}
+
+    def __init__(self):
+        self.rules = {}
+        self.recompute = False
+
+    def field(self, record_type, name, value):
+        """
+        Rewrites field `name` of every `record_type` record to `value`, which is
+        either a constant or a callable taking and returning the field's raw
+        bytes.
+        """
+        field = getattr(record_type, name)
+        if callable(value):
+            func = value
+        else:
+            raw = to_bytes(field.pack(value))
+            func = lambda _: raw
+        addenda_type = None
+        if record_type.record_type.value == _addendum:
+            addenda_type = to_bytes(
+                record_type.addenda_type.pack(record_type.addenda_type._constant)
+            )
+        self.rules.setdefault(to_bytes(record_type.record_type.value), []).append(
+            (addenda_type, field.offset, field.length, func)
+        )
+        if record_type is EntryDetail and name in self.totaled_fields:
+            self.recompute = True
+        return self
+
+    def mask(self):
+        return self.field(
+            EntryDetail,
+            'receiving_dfi_account_number',
+            b'X' * EntryDetail.receiving_dfi_account_number.length,
+        )
+
+    def redact_names(self, replacement='REDACTED'):
+        return self.field(EntryDetail, 'individual_name', replacement)
+
+    def effective_entry_date(self, date):
+        return self.field(CompanyBatchHeader, 'effective_entry_date', date)
+
+    def reverse(self):
+        """
+        Flips credits to debits and vice versa.
+        """
+        codes = dict(
+            (to_bytes(str(k)), to_bytes(str(v)))
+            for k, v in self.reversed_codes.items()
+        )
+        service_class_codes = dict(
+            (to_bytes(str(k)), to_bytes(str(v)))
+            for k, v in self.reversed_service_class_codes.items()
+        )
+        self.field(
+            EntryDetail,
+            'transaction_code',
+            lambda raw: raw[:1] + codes.get(raw[1:], raw[1:]),
+        )
+        for record_type in (CompanyBatchHeader, CompanyBatchControl):
+            self.field(
+                record_type,
+                'service_class_code',
+                lambda raw: service_class_codes.get(raw, raw),
+            )
+        return self
+
+    def apply(self, src, dst, chunk_size=None):
+        """
+        Writes a transformed copy of binary file-like `src` to `dst`.
+        """
+        chunk_size = chunk_size or self.chunk_size
+        state = _State()
+        while True:
+            lines = src.readlines(chunk_size)
+            if not lines:
+                break
+            for i, line in enumerate(lines):
+                record = line.rstrip(b'\r\n')
+                transformed = self._line(record, state)
+                if transformed is not record:
+                    lines[i] = transformed + line[len(record):]
+            dst.write(b''.join(lines))
+
+    def apply_in_place(self, path):
+        """
+        Transforms the file at `path` in place.
+        """
+        state = _State()
+        with open(path, 'r+b') as fo:
+            fo.seek(0, 2)
+            if not fo.tell():
+                return
+            mm = mmap.mmap(fo.fileno(), 0)
+            try:
+                size, offset = len(mm), 0
+                while offset < size:
+                    end = mm.find(b'\n', offset)
+                    if end == -1:
+                        end = size
+                    record = mm[offset:end].rstrip(b'\r')
+                    transformed = self._line(record, state)
+                    if transformed is not record:
+                        mm[offset:offset + len(transformed)] = transformed
+                    offset = end + 1
+                mm.flush()
+            finally:
+                mm.close()
+
+    # internals
+
+    def _line(self, line, state):
+        rules = self.rules.get(line[:1])
+        transformed = line
+        if rules:
+            for addenda_type, offset, length, func in rules:
+                if (addenda_type is not None and
+                    line[_addenda_type] != addenda_type):
+                    continue
+                raw = func(transformed[offset:offset + length])
+                if len(raw) != length:
+                    raise ValueError(
+                        'Transformed field at {0} has length {1} != {2}'
+                        .format(offset, len(raw), length)
+                    )
+                transformed = (
+                    transformed[:offset] + raw + transformed[offset + length:]
+                )
+        if not self.recompute:
+            return transformed
+        record_type = transformed[:1]
+        if record_type == _entry_detail:
+            state.add(transformed)
+        elif record_type == _batch_control:
+            transformed = state.batch_control(transformed)
+        elif record_type == _file_control:
+            transformed = state.file_control(transformed)
+        if transformed == line:
+            return line
+        return transformed
+
+
+class _State(object):
+
+    def __init__(self):
+        self.batch = [0, 0, 0]
+        self.file = [0, 0, 0]
+
+    def add(self, line):
+        amount = int(line[_amount])
+        digit = line[_transaction_kind]
+        if digit in b'6789':
+            self.batch[0] += amount
+        elif digit in b'1234':
+            self.batch[1] += amount
+        self.batch[2] += int(line[_receiving_dfi_trn])
+
+    def batch_control(self, line):
+        debit, credit, entry_hash = self.batch
+        self.batch = [0, 0, 0]
+        self.file[0] += debit
+        self.file[1] += credit
+        self.file[2] += entry_hash
+        return _replace(line, CompanyBatchControl, [
+            ('total_batch_debit_entry_amount', debit),
+            ('total_batch_credit_entry_amount', credit),
+            ('entry_hash', entry_hash % Writer.HASH_MOD),
+        ])
+
+    def file_control(self, line):
+        debit, credit, entry_hash = self.file
+        return _replace(line, FileControl, [
+            ('total_file_debit_entry_amount', debit),
+            ('total_file_credit_entry_amount', credit),
+            ('entry_hash_total', entry_hash % Writer.HASH_MOD),
+        ])
+
+
+def _replace(line, record_type, values):
+    for name, value in values:
+        field = getattr(record_type, name)
+        line = (
+            line[:field.offset] +
+            to_bytes(field.pack(value)) +
+            line[field.offset + field.length:]
+        )
+    return line
+
+
+_addendum = EntryDetailAddendum.record_type.value
+
+_entry_detail = to_bytes(EntryDetail.record_type.value)
+
+_batch_control = to_bytes(CompanyBatchControl.record_type.value)
+
+_file_control = to_bytes(FileControl.record_type.value)
+
+_amount = _slice(EntryDetail.amount)
+
+_receiving_dfi_trn = _slice(EntryDetail.receiving_dfi_trn)
+
+_transaction_kind = slice(
+    EntryDetail.transaction_code.offset + 1,
+    EntryDetail.transaction_code.offset + 2,
+)
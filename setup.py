@@ -16,6 +16,9 @@ class PyTest(setuptools.command.test.test):
 
 
 extras_require = {
+    'parquet': [
+        'pyarrow',
+    ],
     'tests': [
         'pytest >=2.5,<3.0',
         'pytest-cov >=1.7,<2.0',
@@ -43,6 +46,11 @@ setuptools.setup(
     tests_require=extras_require['tests'],
     packages=setuptools.find_packages('.', exclude=('tests', 'tests.*')),
     cmdclass={'test': PyTest},
+    entry_points={
+        'console_scripts': [
+            'nacha = nacha.cli:main',
+        ],
+    },
     classifiers=[
         'Development Status :: 4 - Beta',
         'Intended Audience :: Developers',
@@ -1,3 +1,4 @@
+import datetime
 import os
 
 try:
@@ -5,6 +6,64 @@ try:
 except ImportError:
     import unittest
 
+import nacha
+
+
+# NOTE: written with these the sample fixture is reproduced
+
+credits = [
+    {
+        'transaction_code': nacha.EntryDetail.transaction_code.CHECKING_CREDIT,
+        'receiving_dfi_routing_number': 112345678,
+        'receiving_dfi_account_number': '1123456789',
+        'individual_name': 'Test Credit 1',
+        'individual_id': '98789789',
+        'amount': 12345,
+
+    },
+    {
+        'transaction_code': nacha.EntryDetail.transaction_code.CHECKING_CREDIT,
+        'receiving_dfi_routing_number': 131541348,
+        'receiving_dfi_account_number': '1312545400',
+        'individual_name': 'Test Credit 2',
+        'individual_id': '12312312',
+        'amount': 145,
+    },
+]
+
+file_header = dict(
+    immediate_destination=91000019,
+    immediate_destination_name='WELLS FARGO',
+    immediate_origin=1273720697,
+    immediate_origin_name='ALALALAD PAYMENTS',
+    created_at=datetime.datetime(
+        year=2013, month=1, day=16, hour=15, minute=5
+    ),
+)
+
+company_batch = dict(
+    service_class_code=nacha.ServiceClassCodes.MIXED_DEBITS_CREDITS,
+    company_name='ALALALAD',
+    company_id=2273720697,
+    standard_entry_class=nacha.StandardEntryClasses.PPD,
+    company_entry_description='payouts',
+    originating_dfi_id='12737206',
+    company_discretionary_data='ACH SETTLEMENT',
+)
+
+
+def write(writer, batches=1, entries=None):
+    """
+    Writes a file of `batches` company batches each holding `entries`, by
+    default `credits`, using `writer`.
+    """
+    with writer.begin_file(**file_header):
+        for _ in range(batches):
+            with writer.begin_company_batch(**company_batch):
+                for entry in entries or credits:
+                    writer.entry(**entry)
+    return writer
+
 
 class TestCase(unittest.TestCase):
 
@@ -0,0 +1,126 @@
+import datetime
+import os
+import pickle
+import shutil
+import tempfile
+
+import nacha
+import nacha.aggregate
+
+from . import TestCase
+
+
+class TestAggregate(TestCase):
+
+    def _add(self, aggregate, *fixture):
+        with self.open_fixture(*fixture) as fo:
+            return aggregate.add(nacha.Reader(fo))
+
+    def _expected(self, key, *fixture):
+        expected = {}
+        with self.open_fixture(*fixture) as fo:
+            reader = nacha.Reader(fo)
+            reader.file_header()
+            for header in reader.company_batches():
+                for entry in reader.entries():
+                    expected.setdefault(key(header, entry.detail), []).append(
+                        entry.detail
+                    )
+                reader.company_batch_control()
+        return dict(
+            (k, nacha.aggregate.Totals(
+                count=len(details),
+                amount=sum(d.amount for d in details),
+                debit_amount=sum(d.amount for d in details if d.is_debit),
+                credit_amount=sum(d.amount for d in details if d.is_credit),
+                minimum=min(d.amount for d in details),
+                maximum=max(d.amount for d in details),
+            ))
+            for k, details in expected.items()
+        )
+
+    def test_it(self):
+        aggregate = self._add(
+            nacha.aggregate.Aggregate(
+                'receiving_dfi_routing_number',
+                'company_entry_description',
+                ('transaction_code', 'effective_entry_date'),
+            ),
+            'sample_batched_by_descriptor',
+        )
+        self.assertEqual(
+            aggregate['receiving_dfi_routing_number'],
+            self._expected(
+                lambda header, detail: (
+                    detail.receiving_dfi_trn * 10 +
+                    detail.receiving_dfi_trn_check_digit
+                ),
+                'sample_batched_by_descriptor',
+            ),
+        )
+        self.assertEqual(
+            aggregate['company_entry_description'],
+            self._expected(
+                lambda header, detail: header.company_entry_description,
+                'sample_batched_by_descriptor',
+            ),
+        )
+        self.assertEqual(
+            aggregate['transaction_code', 'effective_entry_date'],
+            self._expected(
+                lambda header, detail: (
+                    detail.transaction_code, header.effective_entry_date,
+                ),
+                'sample_batched_by_descriptor',
+            ),
+        )
+        self.assertEqual(
+            aggregate['company_entry_description'].keys(), ['PAYOUTS'],
+        )
+        self.assertEqual(
+            aggregate['transaction_code', 'effective_entry_date'].keys(),
+            [(27, datetime.date(2013, 4, 16))],
+        )
+
+    def test_merge(self):
+        aggregate = nacha.aggregate.Aggregate('company_id')
+        for fixture in ['sample', 'sample_with_addenda']:
+            other = pickle.loads(pickle.dumps(
+                self._add(nacha.aggregate.Aggregate('company_id'), fixture)
+            ))
+            aggregate.merge(other)
+        totals, = aggregate['company_id'].values()
+        expected = [
+            self._expected(lambda header, detail: None, fixture)[None]
+            for fixture in ['sample', 'sample_with_addenda']
+        ]
+        self.assertEqual(totals.count, sum(t.count for t in expected))
+        self.assertEqual(
+            totals.credit_amount, sum(t.credit_amount for t in expected),
+        )
+        self.assertEqual(totals.minimum, min(t.minimum for t in expected))
+        with self.assertRaises(ValueError):
+            aggregate.merge(nacha.aggregate.Aggregate('company_name'))
+
+    def test_paths(self):
+        path = tempfile.mkdtemp()
+        try:
+            for fixture in ['sample', 'sample_batched_by_descriptor']:
+                shutil.copy(self.fixture_path(fixture), path)
+            for workers in [0, 2]:
+                aggregate = nacha.aggregate.paths(
+                    path, 'standard_entry_class', workers=workers,
+                )
+                totals, = aggregate['standard_entry_class'].values()
+                self.assertEqual(
+                    totals.count, sum(
+                        self._expected(lambda header, detail: None, fixture)[None].count
+                        for fixture in os.listdir(path)
+                    ),
+                )
+        finally:
+            shutil.rmtree(path)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            nacha.aggregate.Aggregate('nope')
@@ -0,0 +1,114 @@
+import StringIO
+
+import nacha
+import nacha.bulk
+
+from . import TestCase, company_batch, credits, file_header
+
+
+class TestBulk(TestCase):
+
+    def _write(self, entries, **kwargs):
+        io = StringIO.StringIO()
+        nacha.bulk.write(io, entries, file_header, company_batch, **kwargs)
+        return io.getvalue()
+
+    def test_rows(self):
+        expected = self.read_fixture('sample')
+        self.assertEqual(self._write(credits).strip('\n'), expected)
+
+    def test_columns(self):
+        columns = dict(
+            (name, [credit[name] for credit in credits])
+            for name in credits[0]
+        )
+        expected = self.read_fixture('sample')
+        self.assertEqual(self._write(columns).strip('\n'), expected)
+
+    def test_csv(self):
+        src = StringIO.StringIO('\n'.join([
+            'transaction_code,receiving_dfi_routing_number,receiving_dfi_account_number,amount,individual_id,individual_name,company_entry_description',
+            '22,112345678,1123456789,12345,98789789,Test Credit 1,payouts',
+            '27,131541348,1312545400,145,12312312,Test Debit 1,refunds',
+            '22,131541348,1312545400,100,12312312,Test Credit 2,payouts',
+        ]))
+        raw = self._write(
+            nacha.bulk.from_csv(src), batch_by=['company_entry_description'],
+        )
+        records = list(nacha.Reader(StringIO.StringIO(raw)))
+        self.assertEqual(
+            [type(record).__name__ for record in records], [
+                'FileHeader',
+                'CompanyBatchHeader',
+                'EntryDetail',
+                'EntryDetail',
+                'CompanyBatchControl',
+                'CompanyBatchHeader',
+                'EntryDetail',
+                'CompanyBatchControl',
+                'FileControl',
+            ],
+        )
+        self.assertEqual(records[1].company_entry_description, 'PAYOUTS')
+        self.assertEqual(records[5].company_entry_description, 'REFUNDS')
+        self.assertEqual(records[5].batch_number, 2)
+        self.assertEqual(records[4].total_batch_credit_entry_amount, 12445)
+        self.assertEqual(records[7].total_batch_debit_entry_amount, 145)
+        self.assertEqual(records[-1].batch_count, 2)
+        self.assertEqual(records[-1].entry_addenda_record_count, 3)
+        self.assertEqual(records[-1].total_file_credit_entry_amount, 12445)
+        self.assertEqual(records[-1].total_file_debit_entry_amount, 145)
+        self.assertEqual(
+            records[-1].entry_hash_total, 11234567 + 13154134 + 13154134,
+        )
+
+    def test_addenda(self):
+        entries = [dict(credit) for credit in credits]
+        entries[1]['addenda'] = ['hello', 'world']
+        raw = self._write(entries)
+        records = list(nacha.Reader(StringIO.StringIO(raw)))
+        self.assertEqual(records[3].addenda_record_indicator, 1)
+        self.assertEqual(
+            [(record.payment_related_information, record.addenda_sequence_number)
+             for record in records[4:6]],
+            [('HELLO', 1), ('WORLD', 2)],
+        )
+        self.assertEqual(records[-1].entry_addenda_record_count, 4)
+
+    def test_invalid(self):
+        entries = [dict(credit) for credit in credits]
+        entries[1]['individual_name'] = 'X' * 23
+        with self.assertRaises(nacha.Alphanumeric.error_type) as exc:
+            self._write(entries)
+        self.assertIn('EntryDetail.individual_name', str(exc.exception))
+        self.assertIn('row 1', str(exc.exception))
+        entries[1]['individual_name'] = 'X'
+        entries[0]['transaction_code'] = 99
+        with self.assertRaises(nacha.Numeric.error_type) as exc:
+            self._write(entries)
+        self.assertIn('EntryDetail.transaction_code value 99 for row 0', str(exc.exception))
+
+    def test_routing_number(self):
+        for value in [123, '12345678', 1123456789, '-12345678']:
+            entries = [dict(credit) for credit in credits]
+            entries[1]['receiving_dfi_routing_number'] = value
+            with self.assertRaises(nacha.Numeric.error_type) as exc:
+                self._write(entries)
+            self.assertIn(
+                'EntryDetail.receiving_dfi_routing_number value {0} for row 1'
+                .format(value),
+                str(exc.exception),
+            )
+        entries[1]['receiving_dfi_routing_number'] = '012345678'
+        records = list(nacha.Reader(StringIO.StringIO(self._write(entries))))
+        self.assertEqual(records[3].receiving_dfi_trn, 1234567)
+        self.assertEqual(records[3].receiving_dfi_trn_check_digit, 8)
+
+    def test_empty(self):
+        io = StringIO.StringIO()
+        writer = nacha.bulk.BulkWriter(io)
+        with writer.begin_file(**file_header):
+            with writer.begin_company_batch(**company_batch):
+                writer.entries(dict((name, []) for name in credits[0]))
+        records = list(nacha.Reader(StringIO.StringIO(io.getvalue())))
+        self.assertEqual(records[-1].entry_addenda_record_count, 0)
@@ -0,0 +1,89 @@
+import os
+import shutil
+import StringIO
+import tempfile
+
+import nacha
+import nacha.cache
+
+from . import TestCase
+
+
+class TestCache(TestCase):
+
+    fixtures = [
+        'sample',
+        'sample_with_addenda',
+        'sample_batched_by_descriptor',
+        'sample_returns',
+    ]
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.cache = nacha.cache.Cache(self.dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_iterate(self):
+        for fixture in self.fixtures:
+            expected = list(nacha.Reader(self.open_fixture(fixture)))
+            with self.open_fixture(fixture) as fo:
+                self.assertNotIn(fo, self.cache)
+                self.assertEqual(list(self.cache.reader(fo)), expected)
+                self.assertIn(fo, self.cache)
+                records = list(self.cache.reader(fo))
+            self.assertEqual(records, expected)
+            self.assertEqual(
+                [type(record) for record in records],
+                [type(record) for record in expected],
+            )
+            self.assertEqual(
+                [record.dump() for record in records],
+                [record.dump() for record in expected],
+            )
+
+    def test_structured(self):
+        with self.open_fixture('sample_with_addenda') as fo:
+            list(self.cache.reader(fo))
+            reader = self.cache.reader(fo)
+            self.assertIsInstance(reader.file_header(), nacha.FileHeader)
+            entries = []
+            for _ in reader.company_batches():
+                entries.extend(reader.entries())
+                reader.company_batch_control()
+            reader.file_control()
+        self.assertEqual(len(entries), 2)
+        self.assertEqual(len(entries[1].addenda), 1)
+
+    def test_include_terminal(self):
+        with self.open_fixture('sample') as fo:
+            list(self.cache.reader(fo))
+            records = list(self.cache.reader(fo, include_terminal=True))
+        self.assertEqual([terminal for _, terminal in records], ['\n'] * 5 + [''])
+
+    def test_partial_read_not_cached(self):
+        with self.open_fixture('sample') as fo:
+            reader = self.cache.reader(fo)
+            reader.file_header()
+            del reader
+            self.assertNotIn(fo, self.cache)
+        self.assertEqual(os.listdir(self.dir), [])
+
+    def test_malformed_not_cached(self):
+        lines = list(self.fixture_lines('sample'))
+        lines[2] = 'X' + lines[2][1:]
+        fo = StringIO.StringIO(''.join(lines))
+        with self.assertRaises(nacha.Malformed):
+            list(self.cache.reader(fo))
+        self.assertNotIn(fo, self.cache)
+        errors = nacha.Errors()
+        self.assertEqual(len(list(self.cache.reader(fo, errors=errors))), 5)
+        self.assertEqual(len(errors), 1)
+        self.assertNotIn(fo, self.cache)
+
+    def test_evict(self):
+        self.cache.max_size = 1
+        with self.open_fixture('sample') as fo:
+            list(self.cache.reader(fo))
+            self.assertNotIn(fo, self.cache)
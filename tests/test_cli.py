@@ -0,0 +1,122 @@
+import json
+import os
+import shutil
+import StringIO
+import tempfile
+
+import nacha
+import nacha.cli
+
+from . import TestCase
+
+
+class TestCLI(TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _main(self, *argv):
+        out = StringIO.StringIO()
+        status = nacha.cli.main(list(argv), out)
+        return status, out.getvalue().splitlines()
+
+    def test_summary(self):
+        status, lines = self._main('summary', self.fixture_path('sample'))
+        self.assertEqual(status, 0)
+        self.assertEqual(len(lines), 4)
+        self.assertIn('batch 1 ALALALAD PPD PAYOUTS effective 2013-01-16', lines[1])
+        self.assertIn('debit 0 credit 12490', lines[2])
+        self.assertIn('batches 1 entries+addenda 2 debit 0 credit 12490', lines[3])
+
+    def test_validate(self):
+        path = self.fixture_path('sample')
+        status, lines = self._main('validate', path)
+        self.assertEqual(status, 0)
+        self.assertEqual(lines, [path + ': ok'])
+
+    def test_validate_bad_totals(self):
+        path = os.path.join(self.dir, 'sample')
+        lines = list(self.fixture_lines('sample'))
+        lines[2] = lines[2][:29] + '0000099999' + lines[2][39:]
+        with open(path, 'w') as fo:
+            fo.writelines(lines)
+        status, lines = self._main('validate', path)
+        self.assertEqual(status, 1)
+        self.assertEqual(lines, [
+            path + ': batch 1 total_batch_credit_entry_amount 12490 != 100144',
+            path + ': file total_file_credit_entry_amount 12490 != 100144',
+        ])
+
+    def test_grep(self):
+        path = self.fixture_path('sample')
+        status, lines = self._main('grep', '--routing-number', '131541348', path)
+        self.assertEqual(status, 0)
+        self.assertEqual(len(lines), 1)
+        self.assertTrue(lines[0].startswith(path + ':4:6221315413'))
+        status, lines = self._main(
+            'grep', '--trace-number', '127372060000001', path,
+        )
+        self.assertEqual(len(lines), 1)
+        status, lines = self._main('grep', '--min-amount', '1000', path)
+        self.assertEqual(len(lines), 1)
+        status, lines = self._main('grep', '--max-amount', '10', path)
+        self.assertEqual(status, 1)
+        self.assertEqual(lines, [])
+
+    def test_split(self):
+        prefix = os.path.join(self.dir, 'part-')
+        status, paths = self._main(
+            'split',
+            '--batches', '4',
+            '--prefix', prefix,
+            self.fixture_path('sample_batched_by_descriptor'),
+        )
+        self.assertEqual(status, 0)
+        self.assertEqual(paths, [prefix + '0001', prefix + '0002'])
+        batch_counts, total = [], 0
+        for path in paths:
+            with open(path, 'r') as fo:
+                file_control = list(nacha.Reader(fo))[-1]
+            batch_counts.append(file_control.batch_count)
+            total += file_control.total_file_debit_entry_amount
+        self.assertEqual(batch_counts, [4, 2])
+        with self.open_fixture('sample_batched_by_descriptor') as fo:
+            file_control = list(nacha.Reader(fo))[-1]
+        self.assertEqual(total, file_control.total_file_debit_entry_amount)
+
+    def test_split_malformed(self):
+        prefix = os.path.join(self.dir, 'part-')
+        lines = list(self.fixture_lines('sample'))
+        for broken, line_no in [
+                (lines[:1] + lines[4:], 2),
+                (lines[:1] + lines[2:3], 2),
+                (lines[-1:], 1),
+            ]:
+            path = os.path.join(self.dir, 'broken')
+            with open(path, 'w') as fo:
+                fo.writelines(broken)
+            args = nacha.cli.parser().parse_args(['split', '--prefix', prefix, path])
+            with self.assertRaises(nacha.Malformed) as ctx:
+                nacha.cli.split(args, StringIO.StringIO())
+            self.assertEqual(ctx.exception.line_num, line_no)
+            self.assertEqual(os.listdir(self.dir), ['broken'])
+
+    def test_convert(self):
+        status, lines = self._main(
+            'convert', '--format', 'jsonl', self.fixture_path('sample_with_addenda'),
+        )
+        self.assertEqual(status, 0)
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1]['company_id'], '2273720697')
+        self.assertEqual(rows[1]['effective_entry_date'], '2013-01-16')
+        self.assertEqual(rows[1]['receiving_dfi_routing_number'], 131541348)
+        self.assertEqual(len(rows[1]['addenda']), 1)
+        status, lines = self._main(
+            'convert', '--format', 'csv', self.fixture_path('sample'),
+        )
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines[0].split(','), nacha.export.fields)
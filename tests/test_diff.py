@@ -0,0 +1,94 @@
+import os
+import shutil
+import StringIO
+import tempfile
+
+import nacha
+import nacha.cli
+import nacha.diff
+
+from . import TestCase
+
+
+class TestDiff(TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _diff(self, left, right, **kwargs):
+        return nacha.diff.Diff(
+            nacha.Reader(StringIO.StringIO(left)),
+            nacha.Reader(StringIO.StringIO(right)),
+            directory=self.dir,
+            **kwargs
+        )
+
+    def _changed(self):
+        lines = self.read_fixture('sample_batched_by_descriptor').split('\n')
+        # amount of 2nd entry in 1st batch
+        lines[3] = lines[3][:29] + '0000000001' + lines[3][39:]
+        # drop 1st entry of 2nd batch
+        i = [j for j, line in enumerate(lines) if line.startswith('5')][1]
+        del lines[i + 1]
+        return '\n'.join(lines)
+
+    def test_same(self):
+        raw = self.read_fixture('sample_batched_by_descriptor')
+        with self._diff(raw, raw) as diff:
+            self.assertEqual(diff.controls, [])
+            self.assertEqual(list(diff.entries()), [])
+
+    def test_it(self):
+        left = self.read_fixture('sample_batched_by_descriptor')
+        right = self._changed()
+        for run_size in [None, 3]:
+            with self._diff(left, right, run_size=run_size) as diff:
+                differences = list(diff.entries())
+                self.assertEqual(
+                    [(d.kind, d.batch_number, d.trace_number) for d in differences],
+                    [
+                        ('changed', 1, 91000010000002),
+                        ('removed', 2, 91000010000001),
+                    ],
+                )
+                self.assertEqual(
+                    differences[0].fields,
+                    [nacha.diff.FieldDifference('amount', 714194, 1)],
+                )
+                self.assertIsNone(differences[1].right)
+                self.assertEqual(differences[1].left.detail.trace_number, 91000010000001)
+                self.assertEqual(diff.controls, [])
+                if run_size:
+                    self.assertTrue(diff.left.runs)
+
+    def test_controls(self):
+        left = self.read_fixture('sample')
+        lines = left.split('\n')
+        lines[-1] = lines[-1][:43] + '000000012491' + lines[-1][55:]
+        with self._diff(left, '\n'.join(lines)) as diff:
+            self.assertEqual(diff.controls, [
+                nacha.diff.ControlDelta(
+                    None, 'total_file_credit_entry_amount', 12490, 12491,
+                ),
+            ])
+            self.assertEqual(list(diff.entries()), [])
+        self.assertFalse(os.listdir(self.dir))
+
+    def test_cli(self):
+        left = self.fixture_path('sample_batched_by_descriptor')
+        right = os.path.join(self.dir, 'right')
+        with open(right, 'wb') as fo:
+            fo.write(self._changed())
+        out = StringIO.StringIO()
+        status = nacha.cli.main(['diff', left, right], out)
+        self.assertEqual(status, 1)
+        self.assertEqual(out.getvalue().splitlines(), [
+            '~ batch 1 trace 91000010000002',
+            '    amount 714194 != 1',
+            '- batch 2 trace 91000010000001',
+        ])
+        out = StringIO.StringIO()
+        self.assertEqual(nacha.cli.main(['diff', left, left], out), 0)
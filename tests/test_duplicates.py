@@ -0,0 +1,97 @@
+import os
+import shutil
+import StringIO
+import tempfile
+
+import nacha
+import nacha.duplicates
+
+from . import TestCase, company_batch, credits, file_header
+
+
+class TestBloomFilter(TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_it(self):
+        bloom_filter = nacha.duplicates.BloomFilter(capacity=1000, error_rate=0.01)
+        values = [str(i) * 16 for i in range(10)]
+        for value in values:
+            bloom_filter.add(value)
+        self.assertTrue(all(value in bloom_filter for value in values))
+        self.assertNotIn('x' * 16, bloom_filter)
+        path = os.path.join(self.dir, 'filter.bloom')
+        bloom_filter.save(path)
+        loaded = nacha.duplicates.BloomFilter.load(path)
+        self.assertEqual(len(loaded), 10)
+        self.assertEqual(loaded.bits, bloom_filter.bits)
+
+
+class TestDetector(TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.detector = nacha.duplicates.Detector(
+            self.dir, window=2, capacity=1000,
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _scan(self, name, *fixture):
+        return list(self.detector.scan(
+            nacha.Reader(self.open_fixture(*fixture)), name,
+        ))
+
+    def test_error_rate(self):
+        detector = nacha.duplicates.Detector(self.dir, capacity=10 ** 6)
+        self.assertAlmostEqual(detector.filter_error_rate, 0.001 / 31)
+        session = detector.session('a')
+        self.assertEqual(session.filter.size, 21524983)
+        self.assertEqual(session.filter.hashes, 15)
+
+    def test_scan(self):
+        self.assertEqual(self._scan('a', 'sample'), [])
+        self.assertEqual(self._scan('b', 'sample_returns'), [])
+        duplicates = self._scan('c', 'sample')
+        self.assertEqual(len(duplicates), 2)
+        self.assertEqual(duplicates[0].files, ['a'])
+        self.assertEqual(
+            duplicates[0].entry.detail.trace_number, 127372060000001,
+        )
+        self.assertEqual(self.detector.files(), ['b', 'c'])
+
+    def test_rescan_same_file(self):
+        self.assertEqual(self._scan('a', 'sample'), [])
+        self.assertEqual(self._scan('a', 'sample'), [])
+        self.assertEqual(self.detector.files(), ['a'])
+
+    def test_window(self):
+        self._scan('a', 'sample')
+        self._scan('b', 'sample_returns')
+        self._scan('c', 'sample_with_addenda')
+        self.assertEqual(self.detector.files(), ['b', 'c'])
+        duplicates = self._scan('d', 'sample')
+        self.assertEqual(
+            [(duplicate.entry.detail.individual_name, duplicate.files)
+             for duplicate in duplicates],
+            [('TEST CREDIT 2', ['c'])],
+        )
+
+    def test_writer(self):
+        self._scan('a', 'sample')
+        writer = self.detector.writer(StringIO.StringIO(), 'b')
+        with writer.begin_file(**file_header):
+            with writer.begin_company_batch(**company_batch):
+                for credit in credits:
+                    writer.entry(**credit)
+                writer.entry(**credits[0])
+        self.assertEqual(
+            [duplicate.files for duplicate in writer.duplicates],
+            [['a'], ['a'], ['a', 'b']],
+        )
+        self.assertEqual(self.detector.files(), ['a', 'b'])
@@ -0,0 +1,125 @@
+import os
+import shutil
+import StringIO
+import tempfile
+
+import nacha
+import nacha.durable
+
+from . import TestCase, company_batch, credits, file_header
+
+
+class Crash(Exception):
+
+    pass
+
+
+class TestDurableWriter(TestCase):
+
+    descriptions = ['payouts', 'refunds', 'fees', 'rebates']
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'payouts.ach')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _write(self, writer, crash_at=None):
+        with writer.begin_file(**file_header):
+            for i, description in enumerate(self.descriptions):
+                if i < writer.file_control.batch_count:
+                    continue
+                with writer.begin_company_batch(**dict(
+                        company_batch,
+                        company_entry_description=description,
+                    )):
+                    for credit in credits:
+                        if i == crash_at:
+                            raise Crash()
+                        writer.entry(**credit)
+        return writer
+
+    def _expected(self):
+        io = StringIO.StringIO()
+        self._write(nacha.Writer(io))
+        return io.getvalue()
+
+    def test_it(self):
+        writer = self._write(nacha.durable.DurableWriter(self.path))
+        self.assertFalse(writer.resumed)
+        self.assertEqual(os.listdir(self.dir), ['payouts.ach'])
+        with open(self.path, 'rb') as fo:
+            self.assertEqual(fo.read(), self._expected())
+
+    def test_resume(self):
+        writer = nacha.durable.DurableWriter(self.path)
+        with self.assertRaises(Crash):
+            self._write(writer, crash_at=2)
+        writer.close()
+        self.assertFalse(os.path.exists(self.path))
+        self.assertTrue(os.path.exists(self.path + '.partial'))
+
+        writer = nacha.durable.DurableWriter(self.path)
+        self.assertTrue(writer.resumed)
+        self.assertEqual(writer.file_control.batch_count, 2)
+        self._write(writer)
+        self.assertEqual(os.listdir(self.dir), ['payouts.ach'])
+        with open(self.path, 'rb') as fo:
+            raw = fo.read()
+        self.assertEqual(raw, self._expected())
+        trace_numbers = [
+            record.trace_number
+            for record in nacha.Reader(StringIO.StringIO(raw))
+            if isinstance(record, nacha.EntryDetail)
+        ]
+        self.assertEqual(len(set(trace_numbers)), 8)
+
+    def test_checkpoint_every(self):
+        writer = nacha.durable.DurableWriter(self.path, checkpoint_every=2)
+        with self.assertRaises(Crash):
+            self._write(writer, crash_at=3)
+        writer.close()
+        writer = nacha.durable.DurableWriter(self.path)
+        self.assertEqual(writer.file_control.batch_count, 2)
+        self._write(writer)
+        with open(self.path, 'rb') as fo:
+            self.assertEqual(fo.read(), self._expected())
+
+    def test_resume_different_header(self):
+        writer = nacha.durable.DurableWriter(self.path)
+        with self.assertRaises(Crash):
+            self._write(writer, crash_at=2)
+        writer.close()
+        writer = nacha.durable.DurableWriter(self.path)
+        with self.assertRaises(ValueError):
+            writer.begin_file(**dict(file_header, immediate_origin_name='OTHER'))
+        kwargs = dict(file_header)
+        kwargs.pop('created_at')
+        writer.begin_file(**kwargs)
+        self.assertEqual(writer.created_at, file_header['created_at'])
+        writer.close()
+
+    def test_crash_after_rename(self):
+        writer = nacha.durable.DurableWriter(self.path)
+        with self.assertRaises(Crash):
+            self._write(writer, crash_at=2)
+        writer.close()
+        state_path = self.path + '.state'
+        with open(state_path, 'rb') as fo:
+            state = fo.read()
+        writer = self._write(nacha.durable.DurableWriter(self.path))
+        with open(state_path, 'wb') as fo:
+            fo.write(state)
+
+        writer = nacha.durable.DurableWriter(self.path)
+        self.assertFalse(writer.resumed)
+        self.assertFalse(os.path.exists(state_path))
+        writer.close()
+
+        os.remove(self.path)
+        os.remove(self.path + '.partial')
+        with open(state_path, 'wb') as fo:
+            fo.write(state)
+        with self.assertRaises(IOError):
+            nacha.durable.DurableWriter(self.path)
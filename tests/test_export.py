@@ -0,0 +1,108 @@
+import json
+import os
+import StringIO
+import tempfile
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+import nacha
+import nacha.export
+
+from . import TestCase, unittest
+
+
+class TestExport(TestCase):
+
+    def _expected(self, *fixture):
+        reader = nacha.Reader(self.open_fixture(*fixture))
+        reader.file_header()
+        for header in reader.company_batches():
+            for entry in reader.entries():
+                yield header, entry
+            reader.company_batch_control()
+
+    def test_rows(self):
+        for fixture in ['sample', 'sample_with_addenda', 'sample_batched_by_descriptor']:
+            rows = list(nacha.export.rows(nacha.Reader(self.open_fixture(fixture))))
+            expected = list(self._expected(fixture))
+            self.assertEqual(len(rows), len(expected))
+            for row, (header, entry) in zip(rows, expected):
+                for name in nacha.export.batch_fields:
+                    self.assertEqual(row[name], getattr(header, name))
+                for name in nacha.export.entry_fields:
+                    self.assertEqual(row[name], getattr(entry.detail, name))
+                self.assertEqual(row['addenda'], [
+                    addendum.payment_related_information
+                    for addendum in entry.addenda
+                ])
+
+    def test_returns(self):
+        rows = list(nacha.export.rows(nacha.Reader(self.open_fixture('sample_returns'))))
+        self.assertEqual(
+            [(row['return_reason_code'],
+              row['change_code'],
+              row['original_entry_trace_number'],
+              row['corrected_data'],
+              row['addenda'])
+             for row in rows],
+            [('R01', None, 127372060000001, None, []),
+             ('R03', None, 127372060000099, None, []),
+             (None, 'C01', 127372060000002, '1312545401', [])],
+        )
+
+    def test_csv(self):
+        io = StringIO.StringIO()
+        nacha.export.to_csv(
+            nacha.Reader(self.open_fixture('sample_batched_by_descriptor')),
+            io,
+            chunk_size=7,
+        )
+        lines = io.getvalue().splitlines()
+        self.assertEqual(lines[0].split(','), nacha.export.fields)
+        self.assertEqual(len(lines), 61)
+
+    def test_jsonl(self):
+        io = StringIO.StringIO()
+        nacha.export.to_jsonl(
+            nacha.Reader(self.open_fixture('sample_with_addenda')),
+            io,
+            chunk_size=1,
+        )
+        rows = [json.loads(line) for line in io.getvalue().splitlines()]
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[0]['standard_entry_class'], 'PPD')
+        self.assertEqual(rows[0]['effective_entry_date'], '2013-01-16')
+        self.assertEqual(rows[0]['trace_number'], 91000010000001)
+        self.assertEqual(rows[1]['addenda'], [
+            '0*U*00307*000000183*0*P*:\\GS*RA*9133131313*6126127272*20000888*0830*183*T*002010',
+        ])
+
+    def test_malformed(self):
+        lines = list(self.fixture_lines('sample'))
+        lines[2] = lines[2][:29] + 'X' + lines[2][30:]
+        with self.assertRaises(nacha.Malformed) as exc:
+            list(nacha.export.rows(nacha.Reader(StringIO.StringIO(''.join(lines)))))
+        self.assertEqual(exc.exception.line_num, 3)
+        for offset, line_no in [(3, 3), (11, 3), (1, 4)]:
+            lines = list(self.fixture_lines('sample_with_addenda'))
+            line = lines[line_no - 1]
+            lines[line_no - 1] = line[:offset] + 'X' + line[offset + 1:]
+            with self.assertRaises(nacha.Malformed) as exc:
+                list(nacha.export.rows(nacha.Reader(StringIO.StringIO(''.join(lines)))))
+            self.assertEqual(exc.exception.line_num, line_no)
+
+    @unittest.skipIf(pyarrow is None, 'pyarrow not installed')
+    def test_parquet(self):
+        path = os.path.join(tempfile.mkdtemp(), 'sample.parquet')
+        nacha.export.to_parquet(
+            nacha.Reader(self.open_fixture('sample_batched_by_descriptor')),
+            path,
+            chunk_size=16,
+        )
+        table = pyarrow.parquet.read_table(path)
+        self.assertEqual(table.num_rows, 60)
+        self.assertEqual(table.schema.names, nacha.export.fields)
@@ -1,6 +1,8 @@
 # coding: utf-8
 from __future__ import unicode_literals
 
+import datetime
+
 import nacha
 
 from . import TestCase
@@ -44,3 +46,36 @@ class TestNumeric(TestCase):
 
     def test_attributes(self):
         self.assertEqual(self.field.length, 9)
+
+
+class TestDate(TestCase):
+
+    def setUp(self):
+        self.field = nacha.Date('YYMMDD')
+
+    def test_expectations(self):
+        for raw in [b'130116', b'000229', b'681231', b'690101', b'991231']:
+            self.assertEqual(
+                self.field.unpack(raw),
+                datetime.datetime.strptime(raw, b'%y%m%d').date(),
+            )
+
+    def test_when_doesnt_validate(self):
+        for raw in [b'130230', b'131301', b'      ']:
+            with self.assertRaises(nacha.Date.error_type):
+                self.field.unpack(raw)
+
+
+class TestTime(TestCase):
+
+    def setUp(self):
+        self.field = nacha.Time('hhmm')
+
+    def test_expectations(self):
+        self.assertEqual(self.field.unpack(b'1505'), datetime.time(15, 5))
+        self.assertEqual(self.field.unpack(b'0000'), datetime.time(0, 0))
+
+    def test_when_doesnt_validate(self):
+        for raw in [b'2400', b'1260', b'15 5']:
+            with self.assertRaises(nacha.Time.error_type):
+                self.field.unpack(raw)
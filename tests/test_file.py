@@ -3,31 +3,11 @@ import StringIO
 
 import nacha
 
-from . import TestCase
+from . import TestCase, credits
 
 
 class TestWriter(TestCase):
 
-    credits = [
-        {
-            'transaction_code': nacha.EntryDetail.transaction_code.CHECKING_CREDIT,
-            'receiving_dfi_routing_number': 112345678,
-            'receiving_dfi_account_number': '1123456789',
-            'individual_name': 'Test Credit 1',
-            'individual_id': '98789789',
-            'amount': 12345,
-
-        },
-        {
-            'transaction_code': nacha.EntryDetail.transaction_code.CHECKING_CREDIT,
-            'receiving_dfi_routing_number': 131541348,
-            'receiving_dfi_account_number': '1312545400',
-            'individual_name': 'Test Credit 2',
-            'individual_id': '12312312',
-            'amount': 145,
-        },
-    ]
-
     def test_it(self):
         created_at = datetime.datetime(
             year=2013, month=1, day=16, hour=15, minute=5
@@ -51,7 +31,7 @@ class TestWriter(TestCase):
                      effective_entry_date=None,
                      company_discretionary_data='ACH SETTLEMENT',
                  ):
-                for credit in self.credits:
+                for credit in credits:
                     writer.entry(**credit)
 
         self.maxDiff = None
@@ -108,3 +88,169 @@ class TestReader(TestCase):
             if isinstance(record, nacha.CompanyBatchHeader)
         ]
         self.assertItemsEqual(company_ids, ['2273720697'] * 6)
+
+    def test_files(self):
+        fixtures = ['sample', 'sample_with_addenda']
+        reader = nacha.Reader(StringIO.StringIO(
+            '\n'.join(self.read_fixture(name) for name in fixtures)
+        ))
+        results = []
+        for file_header in reader.files():
+            entries = []
+            for _ in reader.company_batches():
+                entries.extend(reader.entries())
+                reader.company_batch_control()
+            results.append((file_header, entries, reader.file_control()))
+        self.assertEqual(len(results), 2)
+        for (_, entries, file_control), name in zip(results, fixtures):
+            self.assertEqual(
+                sum(entry.detail.amount for entry in entries),
+                file_control.total_file_credit_entry_amount,
+            )
+        self.assertEqual(len(results[1][1][1].addenda), 1)
+
+    def test_files_filler(self):
+        fixtures = ['sample', 'sample_with_addenda']
+        filler = '9' * nacha.FileControl.length
+        reader = nacha.Reader(StringIO.StringIO('\n'.join([
+            self.read_fixture(fixtures[0]), filler, filler,
+            self.read_fixture(fixtures[1]), filler,
+        ])))
+        file_controls = []
+        for _ in reader.files():
+            for _ in reader.company_batches():
+                list(reader.entries())
+                reader.company_batch_control()
+            file_controls.append(reader.file_control())
+        self.assertEqual(len(file_controls), 2)
+        self.assertEqual(
+            [file_control.batch_count for file_control in file_controls],
+            [1, 1],
+        )
+
+    def test_files_stray(self):
+        lines = self.read_fixture('sample').split('\n')
+        raw = '\n'.join(
+            lines + lines[2:3] + self.read_fixture('sample_with_addenda').split('\n')
+        )
+
+        def read(reader):
+            file_controls = []
+            for _ in reader.files():
+                for _ in reader.company_batches():
+                    list(reader.entries())
+                    reader.company_batch_control()
+                file_controls.append(reader.file_control())
+            return file_controls
+
+        with self.assertRaises(nacha.Malformed) as ctx:
+            read(nacha.Reader(StringIO.StringIO(raw)))
+        self.assertEqual(ctx.exception.line_num, len(lines) + 1)
+        errors = nacha.Errors()
+        self.assertEqual(
+            len(read(nacha.Reader(StringIO.StringIO(raw), errors=errors))), 2,
+        )
+        self.assertEqual([error.line_num for error in errors], [len(lines) + 1])
+
+    def test_reuse(self):
+        for fixture in ['sample_with_addenda', 'sample_batched_by_descriptor']:
+            expected = list(nacha.Reader(self.open_fixture(fixture)))
+            records, copies = [], []
+            for record in nacha.Reader(self.open_fixture(fixture), reuse=True):
+                records.append(record)
+                copies.append(record.copy())
+            self.assertEqual(copies, expected)
+            self.assertEqual(
+                len(set(id(record) for record in records)),
+                len(set(type(record) for record in records)),
+            )
+            self.assertEqual(
+                [type(record) for record in copies],
+                [type(record) for record in expected],
+            )
+
+    def test_reuse_allocations(self):
+        loads = []
+        load = nacha.Record.load.__func__
+
+        def counted(cls, raw):
+            loads.append(cls)
+            return load(cls, raw)
+
+        nacha.Record.load = classmethod(counted)
+        try:
+            records = list(nacha.Reader(
+                self.open_fixture('sample_batched_by_descriptor'), reuse=True,
+            ))
+        finally:
+            del nacha.Record.load
+        self.assertEqual(len(records), 74)
+        self.assertEqual(len(loads), 5)
+
+    def test_reuse_structured(self):
+        reader = nacha.Reader(self.open_fixture('sample_with_addenda'), reuse=True)
+        reader.file_header()
+        for _ in reader.company_batches():
+            entries = [
+                (entry.detail.copy(), entry.addenda) for entry in reader.entries()
+            ]
+            reader.company_batch_control()
+        reader.file_control()
+        self.assertEqual(
+            [len(addenda) for _, addenda in entries], [0, 1],
+        )
+        self.assertNotEqual(entries[0][0], entries[1][0])
+
+
+class TestLenientReader(TestCase):
+
+    def _fixture(self, *fixture):
+        lines = list(self.fixture_lines(*fixture))
+        lines[2] = lines[2][:29] + 'X' + lines[2][30:]
+        lines[4] = 'Z' + lines[4][1:]
+        return StringIO.StringIO(''.join(lines))
+
+    def test_strict(self):
+        with self.assertRaises(nacha.Malformed) as exc:
+            list(nacha.Reader(self._fixture('sample_batched_by_descriptor')))
+        self.assertEqual(exc.exception.line_num, 3)
+
+    def test_it(self):
+        quarantine = StringIO.StringIO()
+        errors = nacha.Errors(quarantine=quarantine)
+        records = list(nacha.Reader(
+            self._fixture('sample_batched_by_descriptor'), errors=errors,
+        ))
+        self.assertEqual(len(records), 72)
+        self.assertEqual(len(errors), 2)
+        self.assertEqual(
+            [(error.line_num, error.record_type) for error in errors],
+            [(3, '6'), (5, 'Z')],
+        )
+        self.assertIn('invalid literal', list(errors)[0].reason)
+        self.assertEqual(len(quarantine.getvalue().splitlines()), 2)
+
+    def test_structured(self):
+        errors = nacha.Errors()
+        reader = nacha.Reader(
+            self._fixture('sample_batched_by_descriptor'), errors=errors,
+        )
+        reader.file_header()
+        entry_counts = []
+        for _ in reader.company_batches():
+            entry_counts.append(len(list(reader.entries())))
+            reader.company_batch_control()
+        file_control = reader.file_control()
+        self.assertEqual(len(entry_counts), file_control.batch_count)
+        self.assertEqual(sum(entry_counts), 58)
+        self.assertEqual(len(errors), 2)
+
+    def test_limit_and_budget(self):
+        errors = nacha.Errors(limit=1, budget=2)
+        list(nacha.Reader(self._fixture('sample'), errors=errors))
+        self.assertEqual(len(errors), 2)
+        self.assertEqual([error.line_num for error in errors], [5])
+        errors = nacha.Errors(budget=1)
+        with self.assertRaises(nacha.TooManyErrors) as exc:
+            list(nacha.Reader(self._fixture('sample'), errors=errors))
+        self.assertEqual(exc.exception.line_num, 5)
@@ -0,0 +1,75 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from . import TestCase
+
+
+SCRIPT = '''
+import json
+import sys
+import time
+
+started_at = time.time()
+import nacha
+imported_at = time.time()
+with open(sys.argv[1], 'rb') as fo:
+    file_header = nacha.Reader(fo).file_header()
+read_at = time.time()
+
+print(json.dumps({
+    'import': imported_at - started_at,
+    'read': read_at - imported_at,
+    'immediate_origin_name': file_header.immediate_origin_name,
+    'modules': sorted(
+        name for name, module in sys.modules.items() if module is not None
+    ),
+}))
+'''
+
+
+class TestImport(TestCase):
+
+    #: Seconds `import nacha` and reading a file header may take, generous as
+    #: wall clock time depends on the machine, e.g. NACHA_IMPORT_BUDGET=0.25
+    #: overrides it.
+    budget = float(os.environ.get('NACHA_IMPORT_BUDGET', 1.0))
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        # NOTE: sparse so it costs no disk
+        self.path = os.path.join(self.dir, 'large')
+        with open(self.path, 'wb') as fo:
+            fo.write(self.read_fixture('sample') + '\n')
+            fo.truncate(1024 ** 3)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _run(self):
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        out = subprocess.check_output(
+            [sys.executable, '-c', SCRIPT, self.path], cwd=root,
+        )
+        return json.loads(out.decode('utf-8'))
+
+    def test_modules(self):
+        result = self._run()
+        self.assertEqual(result['immediate_origin_name'], 'ALALALAD PAYMENTS')
+        modules = set(result['modules'])
+        for name in ['sqlite3', '_strptime', 'multiprocessing', 'argparse']:
+            self.assertNotIn(name, modules)
+        self.assertEqual(
+            sorted(name for name in modules if name.startswith('nacha.')),
+            ['nacha.compat', 'nacha.packages', 'nacha.packages.bryl', 'nacha.trace'],
+        )
+
+    def test_budget(self):
+        elapsed = min(
+            result['import'] + result['read']
+            for result in [self._run() for _ in range(3)]
+        )
+        self.assertLess(elapsed, self.budget)
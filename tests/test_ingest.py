@@ -0,0 +1,201 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+
+import nacha
+import nacha.ingest
+
+from . import TestCase
+
+
+_parse = nacha.ingest.parse
+
+
+def _die(*args):
+    os._exit(1)
+
+
+def _slow(path):
+    if os.path.basename(path) == 'sample':
+        time.sleep(0.5)
+    return _parse(path)
+
+
+class TestIngest(TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        for name in ['sample', 'sample_with_addenda', 'sample_batched_by_descriptor']:
+            shutil.copy(self.fixture_path(name), self.dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_it(self):
+        results = list(nacha.ingest.ingest(self.dir, workers=2, backlog=1))
+        self.assertItemsEqual(
+            [os.path.basename(result.path) for result in results],
+            ['sample', 'sample_with_addenda', 'sample_batched_by_descriptor'],
+        )
+        for result in results:
+            self.assertTrue(result.ok)
+            self.assertIsInstance(result.file_header, nacha.FileHeader)
+            self.assertEqual(
+                len(result.company_batches), result.file_control.batch_count,
+            )
+            self.assertEqual(
+                sum(company_batch.control.total_batch_credit_entry_amount
+                    for company_batch in result.company_batches),
+                result.file_control.total_file_credit_entry_amount,
+            )
+
+    def test_in_process(self):
+        results = list(nacha.ingest.ingest(
+            os.path.join(self.dir, 'sample*'), workers=0,
+        ))
+        self.assertEqual(len(results), 3)
+        self.assertEqual(
+            [os.path.basename(result.path) for result in results],
+            ['sample', 'sample_batched_by_descriptor', 'sample_with_addenda'],
+        )
+
+    def test_malformed(self):
+        path = os.path.join(self.dir, 'sample')
+        with open(path, 'r') as fo:
+            lines = fo.readlines()
+        lines[2] = 'X' + lines[2][1:]
+        with open(path, 'w') as fo:
+            fo.writelines(lines)
+        results = dict(
+            (os.path.basename(result.path), result)
+            for result in nacha.ingest.ingest(self.dir, workers=2)
+        )
+        self.assertFalse(results['sample'].ok)
+        error = results['sample'].errors[0]
+        self.assertIsInstance(error, nacha.Malformed)
+        self.assertEqual(error.line_num, 3)
+        self.assertTrue(results['sample_with_addenda'].ok)
+
+    def test_worker_died(self):
+        parse = nacha.ingest.parse
+        nacha.ingest.parse = _die
+        try:
+            with self.assertRaises(multiprocessing.TimeoutError):
+                list(nacha.ingest.ingest(self.dir, workers=1, timeout=1))
+        finally:
+            nacha.ingest.parse = parse
+
+    def test_worker_died_ordered(self):
+        parse = nacha.ingest.parse
+        nacha.ingest.parse = _die
+        try:
+            with self.assertRaises(multiprocessing.TimeoutError):
+                list(nacha.ingest.ingest(
+                    self.dir, workers=2, timeout=1, ordered=True,
+                ))
+        finally:
+            nacha.ingest.parse = parse
+
+    def test_completion_order(self):
+        parse = nacha.ingest.parse
+        nacha.ingest.parse = _slow
+        try:
+            names = [
+                [os.path.basename(result.path) for result in nacha.ingest.ingest(
+                    self.dir, workers=2, ordered=ordered,
+                )]
+                for ordered in [False, True]
+            ]
+        finally:
+            nacha.ingest.parse = parse
+        self.assertEqual(names[0][-1], 'sample')
+        self.assertEqual(
+            names[1],
+            ['sample', 'sample_batched_by_descriptor', 'sample_with_addenda'],
+        )
+
+    def test_sink(self):
+        entries = []
+
+        def sink(result, company_batch_header, entry):
+            entries.append((company_batch_header.batch_number, entry))
+
+        results = list(nacha.ingest.ingest(
+            self.fixture_path('sample_batched_by_descriptor'),
+            workers=1,
+            sink=sink,
+        ))
+        self.assertEqual(len(entries), len(list(results[0].entries)))
+        self.assertEqual(
+            sorted(set(batch_number for batch_number, _ in entries)),
+            range(1, 7),
+        )
+
+
+class TestFiles(TestCase):
+
+    fixtures = ['sample', 'sample_with_addenda', 'sample_batched_by_descriptor']
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'transmission')
+        with open(self.path, 'wb') as fo:
+            fo.write('\n'.join(self.read_fixture(name) for name in self.fixtures))
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_scan(self):
+        line_nos = [1, 7, 14]
+        for chunk_size in [1, 7, 94, 95, 1024 * 1024]:
+            with open(self.path, 'rb') as fo:
+                starts = list(nacha.ingest.scan(fo, chunk_size=chunk_size))
+            self.assertEqual([line_no for _, line_no in starts], line_nos)
+            self.assertEqual(
+                [offset for offset, _ in starts],
+                [(line_no - 1) * 95 for line_no in line_nos],
+            )
+        segments = nacha.ingest.segments(self.path)
+        self.assertEqual(
+            [segment.length for segment in segments],
+            [len(self.read_fixture(name)) + 1 for name in self.fixtures[:-1]] +
+            [len(self.read_fixture(self.fixtures[-1]))],
+        )
+
+    def test_it(self):
+        expected = [
+            nacha.ingest.parse(self.fixture_path(name)) for name in self.fixtures
+        ]
+        for workers in [0, 2]:
+            results = list(nacha.ingest.files(self.path, workers=workers))
+            self.assertEqual(len(results), 3)
+            for result, other in zip(results, expected):
+                self.assertTrue(result.ok)
+                self.assertEqual(result.path, self.path)
+                self.assertEqual(result.file_header, other.file_header)
+                self.assertEqual(result.file_control, other.file_control)
+                self.assertEqual(list(result.entries), list(other.entries))
+
+    def test_malformed(self):
+        with open(self.path, 'rb') as fo:
+            lines = fo.readlines()
+        lines[9] = 'X' + lines[9][1:]
+        with open(self.path, 'wb') as fo:
+            fo.writelines(lines)
+        results = list(nacha.ingest.files(self.path, workers=2))
+        self.assertEqual([result.ok for result in results], [True, False, True])
+        error = results[1].errors[0]
+        self.assertIsInstance(error, nacha.Malformed)
+        self.assertEqual(error.line_num, 10)
+        self.assertEqual(error.file_name, self.path)
+
+    def test_worker_died(self):
+        parse_segment = nacha.ingest.parse_segment
+        nacha.ingest.parse_segment = _die
+        try:
+            with self.assertRaises(multiprocessing.TimeoutError):
+                list(nacha.ingest.files(self.path, workers=2, timeout=1))
+        finally:
+            nacha.ingest.parse_segment = parse_segment
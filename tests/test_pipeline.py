@@ -0,0 +1,81 @@
+import StringIO
+import time
+
+import nacha
+import nacha.bulk
+import nacha.pipeline
+
+from . import TestCase, company_batch, credits, file_header, write
+
+
+class Slow(StringIO.StringIO):
+
+    def write(self, data):
+        time.sleep(0.01)
+        StringIO.StringIO.write(self, data)
+
+
+class Broken(StringIO.StringIO):
+
+    def write(self, data):
+        raise IOError('disk full')
+
+
+class TestPipelinedWriter(TestCase):
+
+    def test_it(self):
+        io = StringIO.StringIO()
+        writer = write(
+            nacha.pipeline.PipelinedWriter(io, depth=1, chunk_size=100),
+        )
+        self.assertEqual(io.getvalue().strip('\n'), self.read_fixture('sample'))
+        stats = writer.stats
+        self.assertEqual(stats.bytes, len(io.getvalue()))
+        self.assertEqual(stats.chunks, 3)
+        self.assertTrue(writer.fo.closed)
+        self.assertFalse(writer.fo._thread.is_alive())
+        writer.close()
+        self.assertFalse(io.closed)
+
+    def test_backpressure(self):
+        io = Slow()
+        writer = write(
+            nacha.pipeline.PipelinedWriter(io, depth=1, chunk_size=1),
+            batches=3,
+        )
+        writer.close()
+        self.assertGreater(writer.stats.producer_wait, 0)
+
+        expected = StringIO.StringIO()
+        write(nacha.Writer(expected), batches=3)
+        self.assertEqual(io.getvalue(), expected.getvalue())
+
+    def test_error(self):
+        writer = nacha.pipeline.PipelinedWriter(Broken(), chunk_size=1)
+        with self.assertRaises(IOError):
+            write(writer, batches=3)
+        self.assertEqual(writer.stats.chunks, 0)
+        self.assertFalse(writer.fo._thread.is_alive())
+        with self.assertRaises(IOError):
+            writer.close()
+        with self.assertRaises(ValueError):
+            writer.fo.write(b'more')
+
+    def test_error_on_end_file(self):
+        # everything is buffered until the file is ended
+        writer = nacha.pipeline.PipelinedWriter(Broken(), chunk_size=10 ** 6)
+        with self.assertRaises(IOError):
+            write(writer)
+        self.assertEqual(writer.file_control.block_count, 1)
+        self.assertEqual(writer._ctxs, [])
+
+    def test_bulk(self):
+        io = StringIO.StringIO()
+        with nacha.pipeline.Pipe(io, chunk_size=10) as pipe:
+            nacha.bulk.write(
+                pipe,
+                credits,
+                file_header,
+                company_batch,
+            )
+        self.assertEqual(io.getvalue().strip('\n'), self.read_fixture('sample'))
@@ -0,0 +1,74 @@
+import nacha
+import nacha.returns
+
+from . import TestCase
+
+
+class TestReturns(TestCase):
+
+    def test_records(self):
+        records = list(nacha.Reader(self.open_fixture('sample_returns')))
+        self.assertIsInstance(records[3], nacha.EntryDetailReturnAddendum)
+        self.assertEqual(records[3].return_reason_code, 'R01')
+        self.assertEqual(records[3].original_entry_trace_number, 127372060000001)
+        self.assertEqual(records[3].original_receiving_dfi_id, 11234567)
+        self.assertIsInstance(records[9], nacha.EntryDetailChangeAddendum)
+        self.assertEqual(records[9].change_code, 'C01')
+        self.assertEqual(records[9].corrected_data, '1312545401')
+        expected = [l.rstrip('\n') for l in self.fixture_lines('sample_returns')]
+        self.assertEqual([record.dump() for record in records], expected)
+
+    def test_entry_load(self):
+        lines = list(self.fixture_lines('sample_returns'))
+        entry = nacha.Entry.load(''.join(lines[2:4]).rstrip('\n'))
+        self.assertEqual(entry.return_addendum.return_reason_code, 'R01')
+        self.assertIsNone(entry.change_addendum)
+
+    def test_match(self):
+        with nacha.returns.Index() as index:
+            index.add(self.fixture_path('sample'))
+            index.add(self.fixture_path('sample_with_addenda'))
+            self.assertEqual(len(index), 4)
+            matches = list(index.match(
+                nacha.Reader(self.open_fixture('sample_returns'))
+            ))
+        self.assertEqual(
+            [match.reason_code for match in matches], ['R01', 'R03', 'C01'],
+        )
+        self.assertEqual(matches[0].original.detail.trace_number, 127372060000001)
+        self.assertEqual(matches[0].original.detail.amount, 12345)
+        self.assertEqual(matches[0].returned.detail.amount, 12345)
+        self.assertIsNone(matches[1].original)
+        self.assertEqual(matches[2].original.detail.individual_name, 'TEST CREDIT 2')
+
+    def test_ambiguous_trace_number(self):
+        with nacha.returns.Index() as index:
+            index.add(self.fixture_path('sample_batched_by_descriptor'))
+            entry = index.lookup(91000010000001, 1234567)
+            self.assertEqual(entry.detail.receiving_dfi_trn, 1234567)
+            entry = index.lookup(91000010000001, 12345678)
+            self.assertEqual(entry.detail.receiving_dfi_trn, 12345678)
+            self.assertIsNone(index.lookup(91000010000001, 99999999))
+            self.assertIsNone(index.lookup(91000010000001))
+
+    def test_receiving_dfi_mismatch(self):
+        with nacha.returns.Index() as index:
+            index.add(self.fixture_path('sample'))
+            entry = index.lookup(127372060000001)
+            self.assertEqual(entry.detail.receiving_dfi_trn, 11234567)
+            self.assertEqual(
+                index.lookup(127372060000001, 11234567).detail.amount, 12345,
+            )
+            self.assertIsNone(index.lookup(127372060000001, 99999999))
+
+    def test_max_files(self):
+        with nacha.returns.Index() as index:
+            index.paths = [self.fixture_path('sample')] * (index.max_files - 1)
+            index.add(self.fixture_path('sample_with_addenda'))
+            self.assertEqual(
+                index.lookup(91000010000002).detail.individual_name,
+                'TEST CREDIT 2',
+            )
+            with self.assertRaises(ValueError):
+                index.add(self.fixture_path('sample'))
+            self.assertEqual(len(index.paths), index.max_files)
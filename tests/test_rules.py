@@ -0,0 +1,136 @@
+import StringIO
+
+import nacha
+import nacha.cli
+import nacha.rules
+
+from . import TestCase, company_batch, credits, file_header
+
+
+class TestRules(TestCase):
+
+    def _check(self, raw, rules=None):
+        rules = rules or nacha.rules.standard()
+        return list(rules.check(nacha.Reader(StringIO.StringIO(raw))))
+
+    def _write(self, batches):
+        io = StringIO.StringIO()
+        writer = nacha.Writer(io)
+        with writer.begin_file(**file_header):
+            for overrides, entries in batches:
+                with writer.begin_company_batch(**dict(
+                        company_batch, **overrides)):
+                    for entry in entries:
+                        writer.entry(**dict(credits[0], **entry))
+        return io.getvalue()
+
+    def test_fixtures(self):
+        for fixture in [
+                'sample',
+                'sample_with_addenda',
+                'sample_batched_by_descriptor',
+                'sample_returns',
+            ]:
+            self.assertEqual(self._check(self.read_fixture(fixture)), [])
+
+    def test_it(self):
+        codes = nacha.TransactionCodes
+        raw = self._write([
+            (dict(service_class_code=nacha.ServiceClassCodes.DEBITS), [
+                dict(transaction_code=codes.CHECKING_DEBIT),
+                dict(transaction_code=codes.CHECKING_CREDIT),
+                dict(transaction_code=codes.CHECKING_PRE_NOTE_DEBIT),
+                dict(transaction_code=codes.CHECKING_PRE_NOTE_DEBIT, amount=0),
+            ]),
+            (dict(standard_entry_class='WEB'), [
+                dict(discretionary_data='S'),
+                dict(discretionary_data='X'),
+                dict(),
+            ]),
+            (dict(standard_entry_class='RCK'), [
+                dict(transaction_code=codes.CHECKING_DEBIT, amount=250000),
+                dict(
+                    transaction_code=codes.CHECKING_DEBIT,
+                    amount=250001,
+                    individual_id='',
+                ),
+                dict(transaction_code=codes.CHECKING_CREDIT),
+            ]),
+        ])
+        self.assertEqual(self._check(raw), [
+            ('transaction_code', 4, 1, 'transaction_code', 22),
+            ('zero_amount', 5, 1, 'amount', 12345),
+            ('allowed', 10, 2, 'discretionary_data', 'X'),
+            ('allowed', 11, 2, 'discretionary_data', ''),
+            ('max_amount', 15, 3, 'amount', 250001),
+            ('required', 15, 3, 'individual_id', ''),
+            ('transaction_code', 16, 3, 'transaction_code', 22),
+        ])
+
+    def test_max_addenda(self):
+        lines = self.read_fixture('sample_with_addenda').split('\n')
+        raw = '\n'.join(lines[:5] + lines[4:])
+        self.assertEqual(self._check(raw), [
+            ('max_addenda', 4, 1, 'addenda', 2),
+        ])
+        rules = nacha.rules.Rules().max_addenda(0)
+        self.assertEqual(self._check(self.read_fixture('sample_with_addenda'), rules), [
+            ('max_addenda', 4, 1, 'addenda', 1),
+        ])
+
+    def test_max_addenda_ctx(self):
+        lines = self.read_fixture('sample_with_addenda').split('\n')
+        raw = '\n'.join(lines[:5] + lines[4:5] * 2 + lines[5:])
+        self.assertEqual(self._check(raw), [
+            ('max_addenda', 4, 1, 'addenda', 3),
+        ])
+        lines[1] = lines[1].replace('PPD', 'CTX')
+        raw = '\n'.join(lines[:5] + lines[4:5] * 2 + lines[5:])
+        self.assertEqual(self._check(raw), [])
+        rules = nacha.rules.standard()
+        credits = nacha.ServiceClassCodes.CREDITS
+        self.assertEqual(rules.plan('CTX', credits).max_addenda, 9999)
+        self.assertEqual(rules.plan('PPD', credits).max_addenda, 1)
+        rules.max_addenda(2, standard_entry_class='CTX')
+        self.assertEqual(rules.plan('CTX', credits).max_addenda, 2)
+        rules.max_addenda(0)
+        self.assertEqual(rules.plan('CTX', credits).max_addenda, 2)
+
+    def test_plan(self):
+        rules = nacha.rules.standard()
+        plan = rules.plan('RCK', nacha.ServiceClassCodes.CREDITS)
+        self.assertEqual(plan.transaction_codes, frozenset())
+        self.assertEqual(plan.max_amount, 250000)
+        self.assertEqual(plan.max_addenda, 0)
+        self.assertIs(rules.plan('rck', '220'), plan)
+        plan = rules.plan('PPD', nacha.ServiceClassCodes.MIXED_DEBITS_CREDITS)
+        self.assertEqual(plan.transaction_codes, None)
+        self.assertEqual(plan.required, ['individual_name'])
+        with self.assertRaises(ValueError):
+            rules.require(['nope'])
+
+    def test_columns(self):
+        columns = {
+            'transaction_code': [22, 28, 22, 23],
+            'amount': [100, 0, 200, 1],
+            'individual_name': ['A', 'B', None, 'D'],
+            'discretionary_data': ['R', 'S', 'R', None],
+            'addenda': [None, ['a', 'b'], 'c', None],
+        }
+        violations = nacha.rules.standard().check_columns(
+            columns, 'WEB', nacha.ServiceClassCodes.CREDITS,
+        )
+        self.assertEqual(violations, [
+            ('transaction_code', 1, None, 'transaction_code', 28),
+            ('max_addenda', 1, None, 'addenda', 2),
+            ('required', 2, None, 'individual_name', None),
+            ('zero_amount', 3, None, 'amount', 1),
+            ('allowed', 3, None, 'discretionary_data', None),
+        ])
+
+    def test_cli(self):
+        out = StringIO.StringIO()
+        path = self.fixture_path('sample')
+        status = nacha.cli.main(['validate', '--rules', path], out)
+        self.assertEqual(status, 0)
+        self.assertEqual(out.getvalue(), path + ': ok\n')
@@ -0,0 +1,104 @@
+import os
+import shutil
+import StringIO
+import tempfile
+
+import nacha
+import nacha.cli
+import nacha.sort
+
+from . import TestCase, write
+
+
+class TestSortingWriter(TestCase):
+
+    credits = [
+        dict(
+            transaction_code=nacha.TransactionCodes.CHECKING_CREDIT,
+            receiving_dfi_routing_number=routing_number,
+            receiving_dfi_account_number='1123456789',
+            amount=amount,
+            individual_id='98789789',
+            individual_name=individual_name,
+        )
+        for routing_number, amount, individual_name in [
+            (131541348, 300, 'D'),
+            (112345678, 200, 'A'),
+            (131541348, 100, 'C'),
+            (121000358, 500, 'B'),
+            (112345678, 200, 'E'),
+            (112345678, 100, 'F'),
+            (121000358, 400, 'G'),
+        ]
+    ]
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _write(self, writer, credits=None):
+        return write(writer, batches=2, entries=credits or self.credits)
+
+    def _records(self, writer):
+        return list(nacha.Reader(StringIO.StringIO(writer.fo.getvalue())))
+
+    def _details(self, records):
+        return [
+            record for record in records
+            if isinstance(record, nacha.EntryDetail)
+        ]
+
+    def test_it(self):
+        for run_size in [2, 3, 100]:
+            writer = self._write(nacha.sort.SortingWriter(
+                StringIO.StringIO(), run_size=run_size, directory=self.dir,
+            ))
+            self.assertEqual(os.listdir(self.dir), [])
+            records = self._records(writer)
+            details = self._details(records)
+            self.assertEqual(
+                [detail.individual_name for detail in details],
+                list('FAEGBCD') * 2,
+            )
+            trace_numbers = [detail.trace_number for detail in details]
+            self.assertEqual(trace_numbers, sorted(trace_numbers))
+            self.assertEqual(len(set(trace_numbers)), len(trace_numbers))
+            self.assertEqual(list(nacha.cli._validate(
+                nacha.Reader(StringIO.StringIO(writer.fo.getvalue()))
+            )), [])
+
+            unsorted = self._write(nacha.Writer(StringIO.StringIO()))
+            expected = self._records(unsorted)
+            self.assertEqual(records[-1], expected[-1])
+            self.assertEqual(
+                [type(record) for record in records],
+                [type(record) for record in expected],
+            )
+
+    def test_keys(self):
+        writer = self._write(nacha.sort.SortingWriter(
+            StringIO.StringIO(), keys=['amount'], run_size=2,
+        ))
+        self.assertEqual(
+            [detail.individual_name for detail in self._details(self._records(writer))],
+            list('CFAEDGB') * 2,
+        )
+        with self.assertRaises(ValueError):
+            nacha.sort.SortingWriter(StringIO.StringIO(), keys=['nope'])
+
+    def test_trace_numbers(self):
+        credits = [
+            dict(credit, trace_number=91000010000000 + i)
+            for i, credit in enumerate(self.credits)
+        ]
+        writer = self._write(
+            nacha.sort.SortingWriter(StringIO.StringIO(), run_size=2), credits,
+        )
+        self.assertEqual(
+            [detail.trace_number for detail in self._details(self._records(writer))],
+            [91000010000005, 91000010000001, 91000010000004,
+             91000010000006, 91000010000003, 91000010000002,
+             91000010000000] * 2,
+        )
@@ -0,0 +1,142 @@
+import StringIO
+import threading
+
+import nacha
+import nacha.cli
+import nacha.staging
+
+from . import TestCase, company_batch, credits, file_header
+
+
+class Discard(Exception):
+
+    pass
+
+
+class TestStagingWriter(TestCase):
+
+    descriptions = ['payouts', 'refunds', 'fees', 'rebates', 'bonuses', 'credits']
+
+    def _batch(self, writer, description):
+        return writer.batch(**dict(
+            company_batch, company_entry_description=description,
+        ))
+
+    def _records(self, io):
+        return list(nacha.Reader(StringIO.StringIO(io.getvalue())))
+
+    def test_it(self):
+        io = StringIO.StringIO()
+        writer = nacha.staging.StagingWriter(io)
+        with writer.begin_file(**file_header):
+            batches = [
+                self._batch(writer, description)
+                for description in self.descriptions
+            ]
+
+            def produce(batch):
+                for _ in range(50):
+                    for credit in credits:
+                        batch.entry(**credit)
+                batch.close()
+
+            threads = [
+                threading.Thread(target=produce, args=(batch,))
+                for batch in reversed(batches)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(list(nacha.cli._validate(
+            nacha.Reader(StringIO.StringIO(io.getvalue()))
+        )), [])
+        records = self._records(io)
+        headers = [
+            record for record in records
+            if isinstance(record, nacha.CompanyBatchHeader)
+        ]
+        self.assertEqual(
+            [header.company_entry_description for header in headers],
+            [description.upper() for description in self.descriptions],
+        )
+        self.assertEqual(
+            [header.batch_number for header in headers], range(1, 7),
+        )
+        trace_numbers = [
+            record.trace_number for record in records
+            if isinstance(record, nacha.EntryDetail)
+        ]
+        self.assertEqual(len(trace_numbers), 600)
+        self.assertEqual(trace_numbers, sorted(set(trace_numbers)))
+        self.assertEqual(records[-1].total_file_credit_entry_amount, 12490 * 300)
+
+    def test_commit_order(self):
+        io = StringIO.StringIO()
+        writer = nacha.staging.StagingWriter(io)
+        with writer.begin_file(**file_header):
+            first = self._batch(writer, 'payouts')
+            with self.assertRaises(Discard):
+                with self._batch(writer, 'refunds') as batch:
+                    batch.entry(**credits[0])
+                    raise Discard()
+            with self._batch(writer, 'fees') as batch:
+                for credit in credits:
+                    batch.entry(**credit)
+            self.assertEqual(len(self._records(io)), 1)
+            with first:
+                first.entry(**credits[1])
+            with self.assertRaises(Exception):
+                first.entry(**credits[1])
+            self.assertEqual(len(self._records(io)), 1 + 3 + 4)
+        records = self._records(io)
+        self.assertEqual(records[-1].batch_count, 2)
+        self.assertEqual(
+            [record.company_entry_description for record in records
+             if isinstance(record, nacha.CompanyBatchHeader)],
+            ['PAYOUTS', 'FEES'],
+        )
+
+    def test_single_batch(self):
+        io = StringIO.StringIO()
+        writer = nacha.staging.StagingWriter(io)
+        with writer.begin_file(**file_header):
+            with self._batch(writer, 'payouts') as batch:
+                for credit in credits:
+                    batch.entry(**credit)
+        self.assertEqual(io.getvalue().strip('\n'), self.read_fixture('sample'))
+
+    def test_not_closed(self):
+        writer = nacha.staging.StagingWriter(StringIO.StringIO())
+        with self.assertRaises(Exception):
+            with writer.begin_file(**file_header):
+                self._batch(writer, 'payouts')
+        self.assertEqual(writer._ctxs, [])
+
+    def test_addenda(self):
+        io = StringIO.StringIO()
+        writer = nacha.staging.StagingWriter(io)
+        with writer.begin_file(**file_header):
+            with self._batch(writer, 'payouts') as batch:
+                batch.entry(addenda=['INVOICE 1', {
+                    'payment_related_information': 'INVOICE 2',
+                }], **credits[0])
+                batch.entry(**credits[1])
+        reader = nacha.Reader(StringIO.StringIO(io.getvalue()))
+        reader.file_header()
+        next(reader.company_batches())
+        entries = list(reader.entries())
+        control = reader.company_batch_control()
+        self.assertEqual(control.entry_addenda_count, 4)
+        detail, addenda = entries[0]
+        self.assertEqual(detail.addenda_record_indicator, 1)
+        self.assertEqual(
+            [addendum.payment_related_information for addendum in addenda],
+            ['INVOICE 1', 'INVOICE 2'],
+        )
+        self.assertEqual(
+            [addendum.entry_detail_sequence_number for addendum in addenda],
+            [detail.trace_number % 10 ** 7] * 2,
+        )
+        self.assertEqual(entries[1].addenda, [])
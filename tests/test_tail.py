@@ -0,0 +1,138 @@
+import os
+import shutil
+import tempfile
+
+import nacha
+import nacha.tail
+
+from . import TestCase
+
+
+class TestTailReader(TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_checkpoint(self):
+        path = self.fixture_path('sample_batched_by_descriptor')
+        with open(path, 'rb') as fo:
+            expected = list(nacha.Reader(fo))
+        for stop in [1, 2, 10, 30, len(expected) - 1, len(expected)]:
+            with open(path, 'rb') as fo:
+                reader = nacha.tail.TailReader(fo)
+                records = [next(reader) for _ in range(stop)]
+                raw = reader.checkpoint().dumps()
+            checkpoint = nacha.tail.Checkpoint.loads(raw)
+            self.assertEqual(checkpoint.line_no, stop + 1)
+            with open(path, 'rb') as fo:
+                reader = nacha.tail.TailReader(fo, checkpoint=checkpoint)
+                records.extend(reader)
+            self.assertEqual(records, expected)
+
+    def test_checkpoint_structured(self):
+        path = self.fixture_path('sample_batched_by_descriptor')
+        with open(path, 'rb') as fo:
+            reader = nacha.tail.TailReader(fo)
+            reader.file_header()
+            header = next(reader.company_batches())
+            entries = list(reader.entries())
+            # company batch control is pending retry
+            checkpoint = nacha.tail.Checkpoint.loads(reader.checkpoint().dumps())
+        self.assertEqual(checkpoint.company_batch_header, header)
+        self.assertEqual(checkpoint.file_header.immediate_origin_name, 'BALANCED PAYMENTS')
+        self.assertEqual(checkpoint.batch_totals[0], len(entries))
+        self.assertEqual(
+            checkpoint.batch_totals[2],
+            sum(entry.detail.amount for entry in entries),
+        )
+        with open(path, 'rb') as fo:
+            reader = nacha.tail.TailReader(fo, checkpoint=checkpoint)
+            control = reader.company_batch_control()
+            self.assertEqual(control.batch_number, header.batch_number)
+            for _ in reader.company_batches():
+                list(reader.entries())
+                reader.company_batch_control()
+            file_control = reader.file_control()
+            checkpoint = reader.checkpoint()
+        self.assertEqual(checkpoint.file_totals[0], file_control.batch_count)
+        self.assertEqual(
+            checkpoint.file_totals[3],
+            file_control.total_file_debit_entry_amount,
+        )
+        self.assertEqual(checkpoint.company_batch_header, None)
+
+    def test_malformed(self):
+        lines = list(self.fixture_lines('sample'))
+        lines[2] = lines[2][:29] + 'X' + lines[2][30:]
+        path = os.path.join(self.dir, 'sample')
+        with open(path, 'wb') as fo:
+            fo.writelines(lines)
+
+        with open(path, 'rb') as fo:
+            reader = nacha.tail.TailReader(fo)
+            next(reader)
+            next(reader)
+            with self.assertRaises(nacha.Malformed) as ctx:
+                next(reader)
+            self.assertEqual(ctx.exception.line_num, 3)
+            checkpoint = reader.checkpoint()
+        self.assertEqual(checkpoint.line_no, 3)
+        self.assertEqual(checkpoint.offset, len(lines[0]) + len(lines[1]))
+        self.assertEqual(checkpoint.batch_totals, (0, 0, 0, 0))
+
+        with open(path, 'rb') as fo:
+            expected = list(nacha.Reader(fo, errors=nacha.Errors()))
+        self.assertEqual(len(expected), 5)
+        errors = nacha.Errors()
+        with open(path, 'rb') as fo:
+            reader = nacha.tail.TailReader(fo, errors=errors)
+            self.assertEqual(list(reader), expected)
+            checkpoint = reader.checkpoint()
+        self.assertEqual([error.line_num for error in errors], [3])
+        self.assertEqual(checkpoint.line_no, 7)
+        self.assertEqual(checkpoint.offset, len(''.join(lines)))
+        self.assertEqual(checkpoint.file_totals[0], 1)
+        self.assertEqual(checkpoint.file_totals[1], 1)
+        self.assertEqual(checkpoint.file_totals[4], 145)
+
+    def test_follow(self):
+        raw = self.read_fixture('sample')
+        path = os.path.join(self.dir, 'sample')
+        chunks = [raw[i:i + 50] for i in range(0, len(raw), 50)]
+        with open(path, 'wb') as fo:
+            fo.write(chunks.pop(0))
+
+        class Reader(nacha.tail.TailReader):
+
+            def wait(self):
+                if chunks:
+                    with open(path, 'ab') as fo:
+                        fo.write(chunks.pop(0))
+
+        with open(path, 'rb') as fo:
+            records = list(Reader(fo, follow=True))
+        with self.open_fixture('sample') as fo:
+            self.assertEqual(records, list(nacha.Reader(fo)))
+
+    def test_follow_timeout(self):
+        raw = self.read_fixture('sample')
+        path = os.path.join(self.dir, 'sample')
+        with open(path, 'wb') as fo:
+            fo.write(raw[:len(raw) // 2])
+        with open(path, 'rb') as fo:
+            reader = nacha.tail.TailReader(fo, follow=True, poll=0.01, timeout=0.05)
+            records = list(reader)
+            self.assertFalse(reader.complete)
+            checkpoint = reader.checkpoint()
+        self.assertEqual(len(records), checkpoint.line_no - 1)
+        with open(path, 'wb') as fo:
+            fo.write(raw)
+        with open(path, 'rb') as fo:
+            reader = nacha.tail.TailReader(fo, checkpoint=checkpoint, follow=True)
+            records.extend(reader)
+            self.assertTrue(reader.complete)
+        with self.open_fixture('sample') as fo:
+            self.assertEqual(records, list(nacha.Reader(fo)))
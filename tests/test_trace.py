@@ -0,0 +1,130 @@
+import datetime
+import multiprocessing
+import os
+import shutil
+import StringIO
+import tempfile
+
+import nacha
+import nacha.bulk
+import nacha.trace
+
+from . import TestCase, company_batch, credits, file_header, write
+
+
+on = datetime.date(2013, 1, 16)
+
+
+def _allocate(path):
+    allocator = nacha.trace.Allocator(
+        nacha.trace.SQLiteSequence(path), block_size=10,
+    )
+    return [list(allocator.allocate('12737206', on)) for _ in range(25)]
+
+
+class Database(object):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'trace-numbers.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+
+class TestAllocator(Database, TestCase):
+
+    def test_blocks(self):
+        allocator = nacha.trace.Allocator(block_size=3)
+        self.assertEqual(
+            list(allocator.allocate('12737206', on, 2)),
+            [127372060000001, 127372060000002],
+        )
+        self.assertEqual(
+            list(allocator.allocate('12737206', on, 5)),
+            [127372060000003] + range(127372060000004, 127372060000008),
+        )
+        self.assertEqual(
+            list(allocator.allocate('12737206', on + datetime.timedelta(1))),
+            [127372060000001],
+        )
+        self.assertEqual(
+            allocator.sequence.next_sequences[(12737206, on)], 8,
+        )
+
+    def test_exhausted(self):
+        allocator = nacha.trace.Allocator(block_size=10)
+        allocator.allocate('12737206', on, nacha.trace.MAX_SEQUENCE - 5)
+        allocator.allocate('12737206', on, 5)
+        with self.assertRaises(nacha.trace.Exhausted):
+            allocator.allocate('12737206', on, 2)
+
+    def test_sqlite(self):
+        first = nacha.trace.Allocator(
+            nacha.trace.SQLiteSequence(self.path), block_size=10,
+        )
+        second = nacha.trace.Allocator(
+            nacha.trace.SQLiteSequence(self.path), block_size=10,
+        )
+        self.assertEqual(
+            list(first.allocate('12737206', on)), [127372060000001],
+        )
+        self.assertEqual(
+            list(second.allocate('12737206', on)), [127372060000011],
+        )
+        self.assertEqual(
+            list(first.allocate('12737206', on)), [127372060000002],
+        )
+
+    def test_processes(self):
+        pool = multiprocessing.Pool(4)
+        try:
+            results = pool.map(_allocate, [self.path] * 4)
+        finally:
+            pool.close()
+            pool.join()
+        numbers = [
+            number for result in results for numbers in result for number in numbers
+        ]
+        self.assertEqual(len(numbers), 100)
+        self.assertEqual(len(set(numbers)), 100)
+
+
+class TestWriterTraceNumbers(Database, TestCase):
+
+    def _trace_numbers(self, raw):
+        return [
+            record.trace_number
+            for record in nacha.Reader(StringIO.StringIO(raw))
+            if isinstance(record, nacha.EntryDetail)
+        ]
+
+    def test_across_batches(self):
+        io = StringIO.StringIO()
+        write(nacha.Writer(io), batches=2)
+        self.assertEqual(
+            self._trace_numbers(io.getvalue()),
+            range(127372060000001, 127372060000005),
+        )
+
+    def test_shared(self):
+        trace_numbers = nacha.trace.Allocator(
+            nacha.trace.SQLiteSequence(self.path), block_size=10,
+        )
+        io = StringIO.StringIO()
+        write(nacha.Writer(io, trace_numbers=trace_numbers))
+        bulk_io = StringIO.StringIO()
+        nacha.bulk.write(
+            bulk_io,
+            credits,
+            file_header,
+            company_batch,
+            writer_cls=lambda fo: nacha.bulk.BulkWriter(
+                fo, trace_numbers=trace_numbers,
+            ),
+        )
+        self.assertEqual(
+            self._trace_numbers(io.getvalue()) +
+            self._trace_numbers(bulk_io.getvalue()),
+            range(127372060000001, 127372060000005),
+        )
@@ -0,0 +1,81 @@
+import datetime
+import os
+import shutil
+import StringIO
+import tempfile
+
+import nacha
+import nacha.cli
+import nacha.transform
+
+from . import TestCase
+
+
+class TestTransform(TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def _records(self, raw):
+        return list(nacha.Reader(StringIO.StringIO(raw)))
+
+    def test_mask(self):
+        transform = nacha.transform.Transform().mask().redact_names()
+        for fixture in ['sample', 'sample_with_addenda']:
+            dst = StringIO.StringIO()
+            with self.open_fixture(fixture) as src:
+                transform.apply(src, dst, chunk_size=200)
+            expected = []
+            for record in self._records(self.read_fixture(fixture)):
+                if isinstance(record, nacha.EntryDetail):
+                    record.mask()
+                    record.individual_name = 'REDACTED'
+                expected.append(record)
+            self.assertEqual(self._records(dst.getvalue()), expected)
+            self.assertEqual(
+                len(dst.getvalue()), len(self.read_fixture(fixture)),
+            )
+
+    def test_effective_entry_date(self):
+        date = datetime.date(2013, 2, 1)
+        dst = StringIO.StringIO()
+        with self.open_fixture('sample_batched_by_descriptor') as src:
+            nacha.transform.Transform().effective_entry_date(date).apply(src, dst)
+        headers = [
+            record for record in self._records(dst.getvalue())
+            if isinstance(record, nacha.CompanyBatchHeader)
+        ]
+        self.assertEqual(len(headers), 6)
+        self.assertTrue(all(
+            header.effective_entry_date == date for header in headers
+        ))
+
+    def test_reverse_in_place(self):
+        path = os.path.join(self.dir, 'sample')
+        shutil.copy(self.fixture_path('sample'), path)
+        nacha.transform.Transform().reverse().apply_in_place(path)
+        with open(path, 'rb') as fo:
+            raw = fo.read()
+        self.assertEqual(len(raw), len(self.read_fixture('sample')))
+        records = self._records(raw)
+        self.assertEqual(
+            [record.transaction_code for record in records[2:4]],
+            [nacha.TransactionCodes.CHECKING_DEBIT] * 2,
+        )
+        self.assertEqual(records[4].total_batch_debit_entry_amount, 12490)
+        self.assertEqual(records[4].total_batch_credit_entry_amount, 0)
+        self.assertEqual(records[-1].total_file_debit_entry_amount, 12490)
+        self.assertEqual(records[-1].total_file_credit_entry_amount, 0)
+        with open(path, 'rb') as fo:
+            self.assertEqual(list(nacha.cli._validate(nacha.Reader(fo))), [])
+
+    def test_invalid(self):
+        transform = nacha.transform.Transform().field(
+            nacha.EntryDetail, 'individual_name', lambda raw: raw.strip(),
+        )
+        with self.assertRaises(ValueError):
+            with self.open_fixture('sample') as src:
+                transform.apply(src, StringIO.StringIO())